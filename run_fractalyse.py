@@ -1,74 +1,98 @@
+import argparse
 import os
-import subprocess
 import pandas as pd
-from time import time_ns, sleep
+from tools.catalog import Catalog
+from tools.fractalyse_jobs import dimension_job
+from tools.cost_model import CostModel
+from tools.result_cache import ResultCache
+from tools.results_journal import ResultsJournal, write_csv_atomic
+from tools.scheduler import run_jobs, longest_first
 
-
-def clean():
-    sleep(1)
-    for filename in os.listdir(coastlines_dir):
-        if filename.endswith(".xml") or filename.endswith(".txt"):
-            os.remove(os.path.join(coastlines_dir, filename))
-    sleep(1)
-    for filename in os.listdir(coastlines_dir):
-        if filename.startswith("box_glid"):
-            os.remove(os.path.join(coastlines_dir, filename))
-    sleep(1)
+parser = argparse.ArgumentParser(description="Dimension fractale des contours de pays.")
+parser.add_argument("--resume", action="store_true",
+                    help="Reprend un lot interrompu en sautant les pays déjà dans le journal.")
+args = parser.parse_args()
 
 fractalyse_jar = "fractalyse-3.0-0.9.1.jar"
 coastlines_dir = "coastlines/contour"
 
+# Moteur, lancé dans tous les cas en sous-processus : "java" (jar Fractalyse, référence des
+# résultats publiés) ou "numpy" (python -m tools.boxcounting --json). Les dimensions
+# diffèrent d'un moteur à l'autre (GBR : 1.263 avec Java, 1.30 avec NumPy) : le journal
+# et le CSV ne mélangent pas les moteurs, seuls les pays calculés avec BACKEND sont écrits
+BACKEND = "java"
+
+# Ordonnancement : tâches simultanées, délai par pays (secondes) et relances
+CONCURRENCY = os.cpu_count()
+TIMEOUT = 3600
+RETRIES = 1
+
+# Les pays déjà calculés avec le même fichier et les mêmes paramètres sont lus en cache
+cache = ResultCache()
+
+# Pyramides de simplification (python -m tools.pyramid) : à chaque taille de boîte, le
+# moteur "numpy" utilise la géométrie la plus simplifiée dont l'erreur reste < boîte / 2
+PYRAMID_DIR = None  # "coastlines/pyramid"
+
 # Boxcounting parameters
 min_value = "1E-1"
 max_value = "1.0"
 
 specials = ["ATA", "GRL", "CAN", "USA", "RUS"]
 
-clean()
+# Emprises, tailles et hachages des contours, relus seulement pour les fichiers modifiés
+catalog = Catalog(coastlines_dir).refresh()
 
-pays = []
-dim = []
-durations = []
+# Chaque résultat est ajouté au journal dès que le pays est terminé
+journal = ResultsJournal("results/fractal_dimensions.journal.csv", resume=args.resume)
 
-# Première boucle pour traiter les fichiers .geojson
+# Le modèle de coût, ajusté sur les durées déjà mesurées, ordonne les pays
+cost_model = CostModel(coastlines_dir, catalog).fit()
+
+jobs = []
+countries = set()
 for filename in os.listdir(coastlines_dir):
-    if filename[:3] in specials:
-        continue
-    elif filename.endswith(".geojson"):
-        start = time_ns()
+    if filename.endswith(".geojson") and filename[:3] not in specials:
+        countries.add(filename[:3])
+        if journal.is_done(filename[:3], BACKEND, min_value, max_value):
+            continue
         filepath = os.path.join(coastlines_dir, filename)
-        command = ["java", "-jar", fractalyse_jar, "--boxcounting",
-                   f"min={min_value}", f"max={max_value}", filepath]
-        subprocess.run(command)
-        durations.append(round((time_ns() - start) / 1e9))
+        job = dimension_job(filepath, min_value, max_value, BACKEND, fractalyse_jar,
+                            content_hash=catalog.get(filepath)["sha256"], pyramid_dir=PYRAMID_DIR)
+        job.cost = cost_model.predict(filepath, float(min_value))
+        jobs.append(job)
 
-sleep(1)
 
-# Deuxième boucle pour traiter les fichiers .txt
-for filename in os.listdir(coastlines_dir):
-    if filename[:3] in specials:
-        continue
-    elif filename.endswith(".txt"):
-        filepath = os.path.join(coastlines_dir, filename)
-        with open(filepath) as f:
-            # La dimension fractale est la 6e ligne du fichier
-            fractal_dim = float(f.readlines()[5].split()[2].replace(",", "."))
-        pays.append(filename[:3])
-        dim.append(fractal_dim)
-        print(f"Pays: {filename[:3]}, Dimension fractale: {fractal_dim}")
+
+def record(job, result):
+    if result.ok:
+        journal.append({"Pays": result.name, "Dimension fractale": round(result.value["dimension"], 3),
+                        "durée": round(result.duration), "box_min": min_value, "box_max": max_value,
+                        "backend": BACKEND})
+
+
+# Chaque pays est calculé dans son propre dossier de travail, en parallèle,
+# les plus longs en premier
+run_jobs(longest_first(jobs), concurrency=CONCURRENCY, timeout=TIMEOUT, retries=RETRIES,
+         cache=cache, on_result=record)
+
+pays = []
+dim = []
+durations = []
+for row in journal.results(lambda code: (BACKEND, min_value, max_value) if code in countries else None):
+    pays.append(row["Pays"])
+    dim.append(float(row["Dimension fractale"]))
+    durations.append(int(row["durée"]))
+    print(f"Pays: {row['Pays']}, Dimension fractale: {dim[-1]}")
 
 print(f"{len(pays) = }, {len(dim) = }, {len(durations) = }")
 print("Durée totale :", sum(durations), "secondes")
 print("Durée moyenne :", sum(durations) / len(durations), "secondes")
 
-sleep(1)
-
 # Crée le classement et l'enregistre dans un fichier CSV
 df = pd.DataFrame(
     {"Pays": pays, "Dimension fractale": dim, "durée": durations}
-).sort_values("Dimension fractale", ascending=False).to_csv(
-        "results/fractal_dimensions.csv", index=False)
+).sort_values("Dimension fractale", ascending=False)
+write_csv_atomic(df, "results/fractal_dimensions.csv", index=False)
 
 print("Résultats enregistrés dans fractal_dimensions.csv")
-
-clean()
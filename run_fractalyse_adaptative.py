@@ -1,20 +1,12 @@
+import argparse
 import os
-import subprocess
 import pandas as pd
-from time import time_ns, sleep
-import geopandas as gpd
-
-
-def clean_files():
-    sleep(1)
-    for filename in os.listdir(coastlines_dir):
-        if filename.endswith(".xml") or filename.endswith(".txt"):
-            os.remove(os.path.join(coastlines_dir, filename))
-    sleep(1)
-    for filename in os.listdir("."):
-        if filename.startswith("box_glid"):
-            os.remove(os.path.join(".", filename))
-    sleep(1)
+from tools.catalog import Catalog
+from tools.fractalyse_jobs import dimension_job
+from tools.cost_model import CostModel
+from tools.result_cache import ResultCache
+from tools.results_journal import ResultsJournal, write_csv_atomic
+from tools.scheduler import run_jobs, longest_first
 
 
 def calculate_box_size(belgium_bounds, country_bounds):
@@ -31,43 +23,62 @@ def calculate_box_size(belgium_bounds, country_bounds):
 
 
 def get_country_bounds(filepath):
-    gdf = gpd.read_file(filepath)
-    bounds = gdf.total_bounds  # [x_min, y_min, x_max, y_max]
-    return {
-        'x_min': bounds[0],
-        'y_min': bounds[1],
-        'x_max': bounds[2],
-        'y_max': bounds[3]
-    }
+    # Emprise lue dans le catalogue, sans charger le GeoJSON
+    return catalog.bounds(filepath)
 
 
+parser = argparse.ArgumentParser(description="Dimension fractale des contours de pays, boîtes adaptées à leur taille.")
+parser.add_argument("--resume", action="store_true",
+                    help="Reprend un lot interrompu en sautant les pays déjà dans le journal.")
+args = parser.parse_args()
+
 fractalyse_jar = "fractalyse-3.0-0.9.1.jar"
 coastlines_dir = "coastlines/contour"
 
+# Moteur, lancé dans tous les cas en sous-processus : "java" (jar Fractalyse, référence des
+# résultats publiés) ou "numpy" (python -m tools.boxcounting --json). Les dimensions
+# diffèrent d'un moteur à l'autre (GBR : 1.263 avec Java, 1.30 avec NumPy) : le journal
+# et le CSV ne mélangent pas les moteurs, seuls les pays calculés avec BACKEND sont écrits
+BACKEND = "java"
+
+# Ordonnancement : tâches simultanées, délai par pays (secondes) et relances
+CONCURRENCY = os.cpu_count()
+TIMEOUT = 3600
+RETRIES = 1
+
+# Les pays déjà calculés avec le même fichier et les mêmes paramètres sont lus en cache
+cache = ResultCache()
+
+# Pyramides de simplification (python -m tools.pyramid) : à chaque taille de boîte, le
+# moteur "numpy" utilise la géométrie la plus simplifiée dont l'erreur reste < boîte / 2
+PYRAMID_DIR = None  # "coastlines/pyramid"
+
 # We take the Belgium box size as a reference and scale the others accordingly
 belgium_min_box_size = 5E-3  # PRECISION PARAMETER TO MODIFY
 MIN_MIN = 1E-5
 MAX_MIN = 1E-1
 NBR_BOXES_APPROX = 3
+# Emprises, tailles et hachages des contours, relus seulement pour les fichiers modifiés
+catalog = Catalog(coastlines_dir).refresh()
+
 # Calculate Belgium bounds
 belgium_filepath = os.path.join(coastlines_dir, "BEL_contour.geojson")
 belgium_bounds = get_country_bounds(belgium_filepath)
 
 specials = ["ATA"]
 
-pays = []
-dim = []
-durations = []
-box_min = []
-box_max = []
+# Chaque résultat est ajouté au journal dès que le pays est terminé
+journal = ResultsJournal("results/fractal_dimensions_adaptative.journal.csv", resume=args.resume)
+
+# Le modèle de coût, ajusté sur les durées déjà mesurées, ordonne les pays
+cost_model = CostModel(coastlines_dir, catalog).fit()
 
-clean_files()
-# Première boucle pour traiter les fichiers .geojson
+jobs = []
+box_sizes = {}
 for filename in os.listdir(coastlines_dir):
     if filename[:3] in specials:
         continue
     elif filename.endswith(".geojson"):
-        start = time_ns()
         filepath = os.path.join(coastlines_dir, filename)
 
         if filename[:3] == "BEL":
@@ -79,43 +90,52 @@ for filename in os.listdir(coastlines_dir):
             min_value = str(box_size[0])
             max_value = str(box_size[1])
 
-        command = ["java", "-jar", fractalyse_jar, "--boxcounting",
-                   f"min={min_value}", f"max={max_value}", filepath]
+        box_sizes[filename[:3]] = (f"{float(min_value):.2e}", f"{float(max_value):.2e}")
+        if journal.is_done(filename[:3], BACKEND, *box_sizes[filename[:3]]):
+            continue
+
         print(
             f"Calcul pour : {filename[:3]} avec min_value={float(min_value):.2e} et max_value={float(max_value):.2e}")
-        subprocess.run(command, stdout=subprocess.DEVNULL)
-        durations.append(round((time_ns() - start) / 1e9))
-        box_min.append(f"{float(min_value):.2e}")
-        box_max.append(f"{float(max_value):.2e}")
+        job = dimension_job(filepath, min_value, max_value, BACKEND, fractalyse_jar,
+                            content_hash=catalog.get(filepath)["sha256"], pyramid_dir=PYRAMID_DIR)
+        job.cost = cost_model.predict(filepath, float(min_value))
+        jobs.append(job)
 
-        sleep(1)
 
-# Deuxième boucle pour traiter les fichiers .txt
-for filename in os.listdir(coastlines_dir):
-    if filename[:3] in specials:
-        continue
-    elif filename.endswith(".txt"):
-        filepath = os.path.join(coastlines_dir, filename)
-        with open(filepath) as f:
-            # La dimension fractale est la 6e ligne du fichier
-            fractal_dim = float(f.readlines()[5].split()[2].replace(",", "."))
-        pays.append(filename[:3])
-        dim.append(fractal_dim)
-        print(f"Pays: {filename[:3]}, Dimension fractale: {fractal_dim}")
+def record(job, result):
+    if result.ok:
+        journal.append({"Pays": result.name, "Dimension fractale": round(result.value["dimension"], 3),
+                        "durée": round(result.duration), "box_min": box_sizes[result.name][0],
+                        "box_max": box_sizes[result.name][1], "backend": BACKEND})
+
+
+# Chaque pays est calculé dans son propre dossier de travail, en parallèle,
+# les plus longs en premier
+run_jobs(longest_first(jobs), concurrency=CONCURRENCY, timeout=TIMEOUT, retries=RETRIES,
+         cache=cache, on_result=record)
+
+pays = []
+dim = []
+durations = []
+box_min = []
+box_max = []
+for row in journal.results(lambda code: (BACKEND, *box_sizes[code]) if code in box_sizes else None):
+    pays.append(row["Pays"])
+    dim.append(float(row["Dimension fractale"]))
+    durations.append(int(row["durée"]))
+    box_min.append(row["box_min"])
+    box_max.append(row["box_max"])
+    print(f"Pays: {row['Pays']}, Dimension fractale: {dim[-1]}")
 
 print(f"{len(pays) = }, {len(dim) = }, {len(durations) = } {len(box_min) = }, {len(box_max) = }")
 print("Durée totale :", sum(durations), "secondes")
 print("Durée moyenne :", sum(durations) / len(durations), "secondes")
 
-sleep(1)
-
 # Crée le classement et l'enregistre dans un fichier CSV
 df = pd.DataFrame(
         {"Pays"   : pays, "Dimension fractale": dim, "durée": durations,
          "box_min": box_min, "box_max": box_max}).sort_values(
-    "Dimension fractale", ascending=False).to_csv(
-        "results/fractal_dimensions_adaptative.csv", index=False)
+    "Dimension fractale", ascending=False)
+write_csv_atomic(df, "results/fractal_dimensions_adaptative.csv", index=False)
 
 print("Résultats enregistrés dans fractal_dimensions_adaptative.csv")
-
-clean_files()
@@ -1,6 +1,8 @@
 import os
-import json
-from shapely.geometry import mapping, LineString
+from ifs import CANTOR, CHUNK_SIZE, progress_bar, scaling, write_chunks
+
+UNIT_SEGMENT = [(0, 0), (1, 0)]
+
 
 def cantor(interval, iterations):
     """
@@ -8,47 +10,38 @@ def cantor(interval, iterations):
 
     :param interval: Tuple représentant l'intervalle (x1, x2).
     :param iterations: Nombre d'itérations pour générer l'ensemble.
-    :return: Liste des segments de l'ensemble de Cantor sous forme de tuples [(x1, x2), ...].
+    :return: Tableau (2 ** iterations, 2, 2) des segments [(x1, 0), (x2, 0)], de gauche à droite.
+    """
+    x1, x2 = interval
+    return CANTOR.iterate(UNIT_SEGMENT, iterations, frame=scaling(x2 - x1, 1, (x1, 0)))
+
+
+def cantor_chunks(interval, iterations, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Génère les segments de l'ensemble de Cantor par tranches, en mémoire bornée.
+
+    :param chunk_size: Nombre maximal de segments par tranche.
+    :param progress: Fonction (segments produits, total) appelée après chaque tranche.
+    :return: Générateur de tableaux (n, 2, 2), dans l'ordre de `cantor`.
     """
     x1, x2 = interval
-    if iterations == 0:
-        return [(x1, x2)]
-    else:
-        third = (x2 - x1) / 3
-        left = (x1, x1 + third)
-        right = (x2 - third, x2)
-        return cantor(left, iterations - 1) + cantor(right, iterations - 1)
+    return CANTOR.chunks(UNIT_SEGMENT, iterations, scaling(x2 - x1, 1, (x1, 0)), chunk_size, progress)
 
 # Vérifier ou créer un dossier simpleGEO
 output_folder = "simpleGEO"
 os.makedirs(output_folder, exist_ok=True)
 
 # Chemin complet où le fichier Cantor sera sauvegardé
-geojson_file = os.path.join(output_folder, "cantor.geojson")
+output_format = "geojson"  # "geojson" ou "npy" (tableau binaire (n, 2, 2) des segments)
+output_file = os.path.join(output_folder, f"cantor.{output_format}")
 
 # Générer l'ensemble de Cantor
 iterations = 11
+precision = 10  # Décimales conservées pour les coordonnées
 initial_interval = (0, 1)
-segments = cantor(initial_interval, iterations)
-
-# Construire les entités GeoJSON
-features = []
-for i, (x1, x2) in enumerate(segments, start=1):
-    line = LineString([(x1, 0), (x2, 0)])
-    features.append({
-        "type": "Feature",
-        "geometry": mapping(line),
-        "properties": {"id": i}
-    })
-
-# Structure GeoJSON
-geojson_data = {
-    "type": "FeatureCollection",
-    "features": features
-}
-
-# Écriture dans un fichier GeoJSON
-with open(geojson_file, "w", encoding="utf-8") as f:
-    json.dump(geojson_data, f, ensure_ascii=False, indent=4)
-
-print(f"GeoJSON représentant l'ensemble de Cantor (itérations={iterations}) créé : {geojson_file}")
\ No newline at end of file
+segments = cantor_chunks(initial_interval, iterations, progress=progress_bar("Ensemble de Cantor"))
+
+# Écriture en flux, tranche par tranche
+write_chunks(output_file, segments, "LineString", CANTOR.count(iterations), precision)
+
+print(f"Fichier représentant l'ensemble de Cantor (itérations={iterations}) créé : {output_file}")
@@ -1,50 +1,48 @@
 import os
-import json
-from shapely.geometry import mapping, box  # box est utilisé pour créer des rectangles
+from ifs import CANTOR, CHUNK_SIZE, progress_bar, scaling, write_chunks
+
+# Carré unité, sommets dans l'ordre de shapely.geometry.box
+UNIT_BOX = [(1, 0), (1, 1), (0, 1), (0, 0)]
+
 
 def cantor(interval, iterations):
     """
-    Génère les segments de l'ensemble de Cantor.
+    Génère les bandes de l'ensemble de Cantor, de hauteur 1.
 
     :param interval: Tuple représentant l'intervalle (x1, x2).
     :param iterations: Nombre d'itérations pour générer l'ensemble.
-    :return: Liste des segments de l'ensemble de Cantor sous forme de tuples [(x1, x2), ...].
+    :return: Tableau (2 ** iterations, 4, 2) des rectangles [x1, x2] x [0, 1], de gauche à droite.
+    """
+    x1, x2 = interval
+    return CANTOR.iterate(UNIT_BOX, iterations, frame=scaling(x2 - x1, 1, (x1, 0)))
+
+
+def cantor_chunks(interval, iterations, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Génère les bandes de l'ensemble de Cantor par tranches, en mémoire bornée.
+
+    :param chunk_size: Nombre maximal de rectangles par tranche.
+    :param progress: Fonction (rectangles produits, total) appelée après chaque tranche.
+    :return: Générateur de tableaux (n, 4, 2), dans l'ordre de `cantor`.
     """
     x1, x2 = interval
-    if iterations == 0:
-        return [(x1, x2)]
-    else:
-        third = (x2 - x1) / 3
-        left = (x1, x1 + third)
-        right = (x2 - third, x2)
-        return cantor(left, iterations - 1) + cantor(right, iterations - 1)
+    return CANTOR.chunks(UNIT_BOX, iterations, scaling(x2 - x1, 1, (x1, 0)), chunk_size, progress)
 
 # Vérifier ou créer un dossier simpleGEO
 output_folder = "simpleGEO"
 os.makedirs(output_folder, exist_ok=True)
 
 # Chemin complet où le fichier Cantor sera sauvegardé
-geojson_file = os.path.join(output_folder, "cantor2d.geojson")
+output_format = "geojson"  # "geojson" ou "npy" (tableau binaire (n, 4, 2) des rectangles)
+output_file = os.path.join(output_folder, f"cantor2d.{output_format}")
 
 # Générer l'ensemble de Cantor
 iterations = 14  # Nombre d'itérations
+precision = 10  # Décimales conservées pour les coordonnées
 initial_interval = (0, 1)  # Intervalle initial [0, 1]
-segments = cantor(initial_interval, iterations)  # Liste des segments sous forme [(x1, x2), ...]
-
-# Écriture dans un fichier GeoJSON
-geojson_data = {
-    "type": "FeatureCollection",
-    "features": [
-        {
-            "type": "Feature",
-            "geometry": mapping(box(x1, 0, x2, 1)),
-            "properties": {"id": i}
-        }
-        for i, (x1, x2) in enumerate(segments, start=1)
-    ]
-}
-
-with open(geojson_file, "w", encoding="utf-8") as f:
-    json.dump(geojson_data, f, ensure_ascii=False, indent=4)
-
-print(f"GeoJSON représentant l'ensemble de Cantor (itérations={iterations}) créé : {geojson_file}")
+boxes = cantor_chunks(initial_interval, iterations, progress=progress_bar("Ensemble de Cantor"))
+
+# Écriture en flux, tranche par tranche
+write_chunks(output_file, boxes, "Polygon", CANTOR.count(iterations), precision)
+
+print(f"Fichier représentant l'ensemble de Cantor (itérations={iterations}) créé : {output_file}")
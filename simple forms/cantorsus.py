@@ -1,6 +1,17 @@
 import os
-import json
-from shapely.geometry import mapping, LineString
+import numpy as np
+import repo_root  # noqa: F401 (racine du dépôt dans sys.path, pour `tools`)
+from tools.geojson_writer import write_features
+from ifs import CHUNK_SIZE, features, progress_bar
+
+
+def removed_fraction(remaining, k_values):
+    """Fraction retirée d'un segment auquel il reste `remaining` itérations (3/5 ou 1/3 selon l'étape)."""
+    for i in range(len(k_values) - 1):
+        if k_values[i] < remaining <= k_values[i + 1]:
+            return 3 / 5 if i % 2 == 0 else 1 / 3
+    return 1 / 3
+
 
 def cantor_custom(interval, iterations, k_values, y=0):
     """
@@ -17,13 +28,7 @@ def cantor_custom(interval, iterations, k_values, y=0):
     if iterations == 0:
         return [(x1, x2, y, None)]
 
-    fraction_to_remove = 1 / 3
-    for i in range(len(k_values) - 1):
-        if k_values[i] < iterations <= k_values[i + 1]:
-            fraction_to_remove = 3 / 5 if i % 2 == 0 else 1 / 3
-            break
-
-    fraction = (x2 - x1) * fraction_to_remove
+    fraction = (x2 - x1) * removed_fraction(iterations, k_values)
     left = (x1, x1 + fraction / 2)
     right = (x2 - fraction / 2, x2)
 
@@ -32,6 +37,49 @@ def cantor_custom(interval, iterations, k_values, y=0):
             cantor_custom(right, iterations - 1, k_values, y * 1)
     )
 
+
+def cantor_custom_chunks(interval, iterations, k_values, y=0, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Génère les segments de `cantor_custom` par tranches, en mémoire bornée.
+
+    La fraction retirée change d'une itération à l'autre : ce n'est pas un IFS fixe (voir
+    `ifs.py`), mais le parcours est le même. Les d dernières itérations (2 ** d <= chunk_size
+    segments) sont calculées en bloc avec NumPy, pour chaque intervalle du niveau
+    iterations - d, ces intervalles étant parcourus en profondeur (gauche d'abord).
+
+    :param chunk_size: Nombre maximal de segments par tranche.
+    :param progress: Fonction (segments produits, total) appelée après chaque tranche.
+    :return: Générateur de tableaux (n, 2, 2) des segments [(x1, y), (x2, y)], dans l'ordre de `cantor_custom`.
+    """
+    depth = 0
+    while depth < iterations and 2 ** (depth + 1) <= chunk_size:
+        depth += 1
+    total, done = 2 ** iterations, 0
+
+    def prefixes(x1, x2, remaining):
+        if remaining == depth:
+            yield x1, x2
+            return
+        fraction = (x2 - x1) * removed_fraction(remaining, k_values)
+        yield from prefixes(x1, x1 + fraction / 2, remaining - 1)
+        yield from prefixes(x2 - fraction / 2, x2, remaining - 1)
+
+    for x1, x2 in prefixes(*interval, iterations):
+        ends = np.array([[x1, x2]], dtype=np.float64)
+        for remaining in range(depth, 0, -1):
+            fraction = (ends[:, 1] - ends[:, 0]) * removed_fraction(remaining, k_values)
+            left = np.column_stack([ends[:, 0], ends[:, 0] + fraction / 2])
+            right = np.column_stack([ends[:, 1] - fraction / 2, ends[:, 1]])
+            ends = np.stack([left, right], axis=1).reshape(-1, 2)  # Enfants de chaque segment côte à côte
+        segments = np.empty((len(ends), 2, 2))
+        segments[:, :, 0] = ends
+        segments[:, :, 1] = y
+        done += len(segments)
+        if progress is not None:
+            progress(done, total)
+        yield segments
+
+
 # Vérifier ou créer un dossier simpleGEO
 output_folder = "simpleGEO"
 os.makedirs(output_folder, exist_ok=True)
@@ -45,30 +93,16 @@ k_values = [2**n for n in range(n_max + 1)]
 
 # Générer l'ensemble modifié
 iterations = 8
+precision = 10  # Décimales conservées pour les coordonnées
 initial_interval = (0, .99)
-segments = cantor_custom(initial_interval, iterations, k_values)
-
-# Construire les entités GeoJSON
-features = []
-for i, (x1, x2, y, _) in enumerate(segments, start=1):
-    line = LineString([(x1, y), (x2, y)])
-    features.append({
-        "type": "Feature",
-        "geometry": mapping(line),
-        "properties": {
-            "id": i,
-            "height": y
-        }
-    })
-
-# Structure GeoJSON
-geojson_data = {
-    "type": "FeatureCollection",
-    "features": features
-}
-
-# Écriture dans un fichier GeoJSON
-with open(geojson_file, "w", encoding="utf-8") as f:
-    json.dump(geojson_data, f, ensure_ascii=False, indent=4)
+height = 0  # Hauteur des segments
+segments = cantor_custom_chunks(initial_interval, iterations, k_values, height,
+                                progress=progress_bar("Ensemble de Cantor modifié", unit=" segments"))
+
+# Entités GeoJSON construites et écrites au fur et à mesure, tranche par tranche
+entities = features(segments, "LineString", lambda i: {"id": i, "height": height})
+
+# Écriture dans un fichier GeoJSON compact
+write_features(geojson_file, entities, precision)
 
 print(f"GeoJSON représentant l'ensemble modifié créé : {geojson_file}")
\ No newline at end of file
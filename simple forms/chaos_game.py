@@ -0,0 +1,154 @@
+"""
+Jeu du chaos vectorisé : nuages de points d'un IFS, en aussi grand nombre que voulu.
+
+Au lieu de construire les primitives niveau par niveau (voir `ifs.py`), on fait marcher
+`batch_size` points en parallèle : à chaque pas, chaque point reçoit une transformation
+tirée au hasard (tableau d'indices NumPy, selon `probabilities`) et toutes les images
+sont calculées d'un bloc. Après `burn_in` pas, les points sont sur l'attracteur (à
+2 ** -40 près) et chaque pas fournit une tranche de `batch_size` points, écrite en flux
+(`ifs.write_chunks`, de préférence en `.npy`) : la mémoire reste bornée par une tranche
+quelle que soit la taille de l'échantillon.
+
+Avec la même graine (`seed`) et la même taille de lot, on obtient exactement les mêmes
+points. Ces nuages servent à éprouver les estimateurs de dimension (box-counting de
+`tools.boxcounting` avec `method="morton"`, dimension de corrélation...) à n'importe
+quelle densité.
+"""
+import os
+import time
+from math import ceil, log
+
+import numpy as np
+
+from ifs import CARPET, CHUNK_SIZE, IFS, SIERPINSKI, affine, progress_bar, write_chunks
+
+PRECISION = 2.0 ** -40  # Distance à l'attracteur visée à la fin de la mise en route
+
+
+def map_probabilities(ifs):
+    """
+    Probabilités proportionnelles aux aires |det A_i| des images (densité uniforme pour un
+    attracteur sans recouvrement) ; les transformations dégénérées reçoivent la plus petite
+    aire non nulle, pour que leur image soit aussi échantillonnée.
+    """
+    areas = np.abs(np.linalg.det(ifs.linear))
+    positive = areas[areas > 0]
+    areas = np.where(areas > 0, areas, positive.min() if len(positive) else 1.0)
+    return areas / areas.sum()
+
+
+def burn_in_steps(ifs, precision=PRECISION):
+    """Nombre de pas après lequel une erreur initiale d'ordre 1 est ramenée sous `precision`."""
+    contraction = np.linalg.norm(ifs.linear, ord=2, axis=(1, 2)).max()
+    if contraction >= 1:
+        raise ValueError("Les transformations doivent être contractantes.")
+    return ceil(log(precision) / log(contraction)) if contraction > 0 else 1
+
+
+def chaos_game(ifs, count, probabilities=None, seed=None, batch_size=CHUNK_SIZE, burn_in=None, start=None,
+               progress=None):
+    """
+    Tire `count` points de l'attracteur d'un IFS par le jeu du chaos, par tranches.
+
+    :param ifs: Système de fonctions itérées (voir `ifs.IFS`).
+    :param count: Nombre total de points.
+    :param probabilities: Probabilité de chaque transformation (par défaut `map_probabilities`).
+    :param seed: Graine du générateur aléatoire (None : non reproductible).
+    :param batch_size: Nombre de points qui marchent en parallèle, et donc par tranche.
+    :param burn_in: Pas ignorés au départ (par défaut `burn_in_steps`).
+    :param start: Point de départ de tous les marcheurs (par défaut, tirés dans le carré unité).
+    :param progress: Fonction (points produits, total) appelée après chaque tranche.
+    :return: Générateur de tableaux (n, 2).
+    """
+    rng = np.random.default_rng(seed)
+    probabilities = map_probabilities(ifs) if probabilities is None else np.asarray(probabilities, dtype=np.float64)
+    if len(probabilities) != len(ifs) or np.any(probabilities < 0):
+        raise ValueError("Il faut une probabilité positive par transformation.")
+    cumulative = np.cumsum(probabilities / probabilities.sum())
+    cumulative[-1] = 1.0
+    uniform = np.allclose(probabilities, probabilities[0])
+    burn_in = burn_in_steps(ifs) if burn_in is None else burn_in
+
+    # Partie linéaire commune (Sierpiński, tapis...) : un seul produit matriciel par pas
+    shared = np.allclose(ifs.linear, ifs.linear[0])
+    coefficients = ifs.linear.reshape(len(ifs), 4).T.copy()  # a, b, c, d de chaque transformation
+    translation_x, translation_y = ifs.translation.T.copy()
+
+    def step(points):
+        if uniform:
+            indices = rng.integers(len(ifs), size=len(points))
+        else:
+            indices = np.searchsorted(cumulative, rng.random(len(points)), side="right")
+        if shared:
+            return points @ ifs.linear[0].T + ifs.translation[indices]
+        a, b, c, d = coefficients[:, indices]
+        x, y = points[:, 0], points[:, 1]
+        return np.column_stack([a * x + b * y + translation_x[indices], c * x + d * y + translation_y[indices]])
+
+    batch_size = min(batch_size, count)
+    points = rng.random((batch_size, 2)) if start is None else np.tile(np.asarray(start, dtype=np.float64),
+                                                                       (batch_size, 1))
+    for _ in range(burn_in):
+        points = step(points)
+
+    done = 0
+    while done < count:
+        points = step(points)
+        chunk = points[:count - done]
+        done += len(chunk)
+        if progress is not None:
+            progress(done, count)
+        yield chunk
+
+
+# Fougère de Barnsley : tige, foliole principale, folioles gauche et droite
+BARNSLEY_FERN = IFS([
+    affine(((0.0, 0.0), (0.0, 0.16))),
+    affine(((0.85, 0.04), (-0.04, 0.85)), (0.0, 1.6)),
+    affine(((0.2, -0.26), (0.23, 0.22)), (0.0, 1.6)),
+    affine(((-0.15, 0.28), (0.26, 0.24)), (0.0, 0.44)),
+])
+BARNSLEY_PROBABILITIES = [0.01, 0.85, 0.07, 0.07]
+
+# Nom -> (système, probabilités ; None pour `map_probabilities`) ; SIERPINSKI et CARPET sont ceux de ifs.py
+SYSTEMS = {
+    "sierpinski": (SIERPINSKI, None),
+    "sierpinski_carpet": (CARPET, None),
+    "menger_sponge": (CARPET, None),
+    "barnsley_fern": (BARNSLEY_FERN, BARNSLEY_PROBABILITIES),
+}
+
+
+if __name__ == "__main__":
+    import repo_root  # noqa: F401 (racine du dépôt dans sys.path, pour `tools`)
+    from tools.boxcounting import box_counting_coordinates
+
+    # Vérifier ou créer un dossier simpleGEO
+    output_folder = "simpleGEO"
+    os.makedirs(output_folder, exist_ok=True)
+
+    system = "sierpinski"  # Voir SYSTEMS
+    count = 10_000_000  # Nombre de points
+    seed = 0  # Graine (None : tirage différent à chaque lancement)
+    batch_size = CHUNK_SIZE  # Points calculés en parallèle (et par tranche)
+    precision = 10  # Décimales conservées pour les coordonnées (GeoJSON)
+
+    output_format = "npy"  # "npy" (tableau binaire (n, 2)) ou "geojson" (une entité Point par point, lent)
+    output_file = os.path.join(output_folder, f"{system}_chaos_game.{output_format}")
+
+    # Box-counting du nuage (boîtes contenant un point), entre ces tailles de boîtes
+    estimate_dimension = True
+    min_size, max_size = 2.0 ** -10, 2.0 ** -2
+
+    ifs, probabilities = SYSTEMS[system]
+    start = time.perf_counter()
+    points = chaos_game(ifs, count, probabilities, seed, batch_size,
+                        progress=progress_bar(f"Jeu du chaos ({system})", unit=" points"))
+    write_chunks(output_file, points, "Point", count, precision)
+    print(f"{count} points en {time.perf_counter() - start:.2f} s -> {output_file}")
+
+    if estimate_dimension and output_format == "npy":
+        result = box_counting_coordinates(np.load(output_file, mmap_mode="r"), min_size, max_size, method="morton")
+        for size, boxes in zip(result.sizes, result.counts):
+            print(f"{size:.3e}\t{boxes}")
+        print(f"Dimension fractale : {result.dimension:.3f}")
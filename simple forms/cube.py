@@ -1,6 +1,7 @@
 import os
-import json
 from shapely.geometry import mapping, Polygon
+import repo_root  # noqa: F401 (racine du dépôt dans sys.path, pour `tools`)
+from tools.geojson_writer import write_features
 
 
 def create_cube_shp(output_geojson):
@@ -49,15 +50,8 @@ def create_cube_shp(output_geojson):
             "properties": {"id": i}
         })
 
-    # Structure GeoJSON
-    geojson_data = {
-        "type": "FeatureCollection",
-        "features": features
-    }
-
-    # Écriture dans un fichier GeoJSON
-    with open(output_geojson, "w", encoding="utf-8") as f:
-        json.dump(geojson_data, f, ensure_ascii=False, indent=4)
+    # Écriture dans un fichier GeoJSON compact
+    write_features(output_geojson, features)
 
     print(f"Cube 3D rempli sauvegardé ! Fichier : {output_geojson}")
 
@@ -0,0 +1,302 @@
+"""
+Moteur « temps d'échappement » vectorisé pour les ensembles de Mandelbrot et de Julia.
+
+Pour chaque point de la grille, on itère z -> p(z) + c (p(z) = z² par défaut) et l'on
+note l'itération n à laquelle |z| dépasse le rayon d'échappement (ou `max_iterations`
+si z reste borné), comme la fonction `mandelbrot(c, max_iterations)` d'origine :
+- Mandelbrot : z0 = 0 et c parcourt la grille ;
+- Julia : z0 parcourt la grille et c est fixé (paramètre `julia`) ;
+- autres polynômes : coefficients de p (`coefficients`, du plus haut degré au terme
+  constant, comme `np.polyval`), par exemple (1, 0, 0, 0) pour z³ + c.
+
+La grille est découpée en tuiles carrées ; chaque tuile est itérée d'un bloc avec NumPy,
+en ne gardant à chaque itération que les points encore actifs (non échappés), et les
+tuiles sont réparties sur un pool de processus. Le résultat est un raster (ny, nx) du
+nombre d'itérations, ligne j = ordonnée y_j, colonne i = abscisse x_i.
+
+Pour n'étudier que la frontière de l'ensemble, `mariani_silver` raffine la grille par
+quadtree : seuls les bords des tuiles sont itérés, une tuile dont le bord est entièrement
+intérieur (ou entièrement extérieur) est remplie sans calcul, et seules les tuiles mixtes
+sont subdivisées jusqu'à `min_size` pixels. `boundary_points` et `boundary_lines` en
+tirent la frontière (pixels ou arêtes de pixels), directement utilisable par le
+box-counting (`tools.boxcounting`).
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import shapely
+
+TILE_SIZE = 256
+
+
+def grid(bounds, shape):
+    """
+    Abscisses et ordonnées de la grille, x_i = x_min + (x_max - x_min) * i / nx (bord droit exclu).
+
+    :param bounds: (x_min, x_max, y_min, y_max).
+    :param shape: (ny, nx).
+    """
+    x_min, x_max, y_min, y_max = bounds
+    ny, nx = shape
+    return x_min + (x_max - x_min) * np.arange(nx) / nx, y_min + (y_max - y_min) * np.arange(ny) / ny
+
+
+def escape_counts(z, c, max_iterations, coefficients=None, radius=2.0):
+    """
+    Nombre d'itérations avant échappement de chaque point.
+
+    :param z: Valeurs initiales (tableau complexe).
+    :param c: Constante, scalaire ou tableau de même forme que `z`.
+    :param max_iterations: Valeur donnée aux points restés bornés.
+    :param coefficients: Coefficients du polynôme p (None : z²).
+    :param radius: Rayon d'échappement.
+    :return: Tableau int32 de la forme de `z`.
+    """
+    shape = np.shape(z)
+    z = np.array(z, dtype=np.complex128).ravel()
+    c = np.array(c, dtype=np.complex128)
+    c = c.ravel().copy() if c.ndim else c
+    counts = np.full(z.size, max_iterations, dtype=np.int32)
+    active = np.arange(z.size)
+    for n in range(max_iterations):
+        if coefficients is None:
+            np.multiply(z, z, out=z)
+        else:
+            z = np.polyval(coefficients, z)
+        z += c
+        escaped = np.abs(z) > radius
+        if escaped.any():
+            # Les points échappés sont retirés : les itérations suivantes ne portent que sur les actifs
+            counts[active[escaped]] = n
+            keep = ~escaped
+            active, z = active[keep], z[keep]
+            if c.ndim:
+                c = c[keep]
+            if active.size == 0:
+                break
+    return counts.reshape(shape)
+
+
+def tiles(shape, tile_size=TILE_SIZE):
+    """Découpage (j0, j1, i0, i1) du raster en tuiles, ligne par ligne."""
+    ny, nx = shape
+    return [(j, min(j + tile_size, ny), i, min(i + tile_size, nx))
+            for j in range(0, ny, tile_size) for i in range(0, nx, tile_size)]
+
+
+def _compute_tile(args):
+    (j0, j1, i0, i1), x_values, y_values, max_iterations, julia, coefficients, radius = args
+    points = x_values[None, i0:i1] + 1j * y_values[j0:j1, None]
+    if julia is None:
+        counts = escape_counts(np.zeros_like(points), points, max_iterations, coefficients, radius)
+    else:
+        counts = escape_counts(points, julia, max_iterations, coefficients, radius)
+    return (j0, j1, i0, i1), counts
+
+
+def escape_time_raster(bounds, shape, max_iterations, julia=None, coefficients=None, radius=2.0,
+                       tile_size=TILE_SIZE, workers=None, progress=None):
+    """
+    Raster du nombre d'itérations sur une grille, calculé par tuiles en parallèle.
+
+    :param bounds: (x_min, x_max, y_min, y_max).
+    :param shape: (ny, nx).
+    :param julia: Constante c d'un ensemble de Julia (None : ensemble de Mandelbrot).
+    :param coefficients: Coefficients du polynôme p (None : z²).
+    :param workers: Nombre de processus (None : un par cœur ; 1 : dans le processus courant).
+    :param progress: Fonction (tuiles calculées, total) appelée après chaque tuile.
+    :return: Tableau int32 (ny, nx).
+    """
+    x_values, y_values = grid(bounds, shape)
+    raster = np.empty(shape, dtype=np.int32)
+    tasks = [(tile, x_values, y_values, max_iterations, julia, coefficients, radius)
+             for tile in tiles(shape, tile_size)]
+    workers = workers or os.cpu_count()
+    if workers == 1:
+        results = map(_compute_tile, tasks)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(_compute_tile, tasks)
+    try:
+        for done, ((j0, j1, i0, i1), counts) in enumerate(results, start=1):
+            raster[j0:j1, i0:i1] = counts
+            if progress is not None:
+                progress(done, len(tasks))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return raster
+
+
+def save_raster(path, raster, bounds, max_iterations, julia=None):
+    """Enregistre le raster et ses paramètres dans un fichier `.npz`."""
+    np.savez_compressed(path, iterations=raster, bounds=np.asarray(bounds, dtype=np.float64),
+                        max_iterations=max_iterations, julia=np.complex128(np.nan if julia is None else julia))
+
+
+def load_raster(path):
+    """Relit un raster : (raster, bounds, max_iterations, julia ou None)."""
+    with np.load(path) as data:
+        julia = complex(data["julia"])
+        return (data["iterations"], tuple(float(v) for v in data["bounds"]), int(data["max_iterations"]),
+                None if np.isnan(julia.real) else julia)
+
+
+def interior_points(raster, bounds, max_iterations):
+    """
+    Points restés bornés (nombre d'itérations égal à `max_iterations`).
+
+    :return: Tableau (n, 2) des (x, y), triés par abscisse puis par ordonnée.
+    """
+    x_values, y_values = grid(bounds, raster.shape)
+    i, j = np.nonzero(raster.T == max_iterations)
+    return np.column_stack([x_values[i], y_values[j]])
+
+
+def _ragged_arange(starts, lengths, step=1):
+    # Concaténation des suites starts[k], starts[k] + step, ... de longueurs lengths[k]
+    lengths = np.asarray(lengths)
+    offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.repeat(starts, lengths) + step * (np.arange(lengths.sum()) - offsets)
+
+
+def _borders(tiles_array, nx):
+    # Indices à plat des bords des tuiles (ligne du haut, du bas, colonnes gauche et droite)
+    # et numéro de la tuile de chaque pixel
+    j0, j1, i0, i1 = tiles_array.T
+    width, inner = i1 - i0, np.maximum(j1 - j0 - 2, 0)
+    groups = [(j0 * nx + i0, width, 1), ((j1 - 1) * nx + i0, width, 1),
+              ((j0 + 1) * nx + i0, inner, nx), ((j0 + 1) * nx + i1 - 1, inner, nx)]
+    flat = np.concatenate([_ragged_arange(starts, lengths, step) for starts, lengths, step in groups])
+    owner = np.concatenate([np.repeat(np.arange(len(tiles_array)), lengths) for _, lengths, _ in groups])
+    return flat, owner
+
+
+def _interiors(tiles_array, nx):
+    # Indices à plat des pixels intérieurs des tuiles, ligne par ligne
+    j0, j1, i0, i1 = tiles_array.T
+    rows = _ragged_arange(j0 + 1, j1 - j0 - 2)
+    tile = np.repeat(np.arange(len(tiles_array)), j1 - j0 - 2)
+    return _ragged_arange(rows * nx + i0[tile] + 1, (i1 - i0 - 2)[tile])
+
+
+def mariani_silver(bounds, shape, max_iterations, julia=None, coefficients=None, radius=2.0, tile_size=64,
+                   min_size=8):
+    """
+    Appartenance des points de la grille à l'ensemble, par raffinement des seules tuiles frontières.
+
+    Les tuiles d'un même niveau du quadtree sont traitées ensemble : les pixels de leurs
+    bords sont itérés en un seul appel à `escape_counts`. Le remplissage d'une tuile
+    suppose que l'ensemble ne traverse pas son intérieur sans toucher son bord ; c'est le
+    cas de l'ensemble de Mandelbrot (connexe et sans trou) tant que les tuiles initiales
+    (`tile_size`) sont petites devant lui, aux filaments plus fins qu'un pixel près.
+
+    :param bounds: (x_min, x_max, y_min, y_max).
+    :param shape: (ny, nx).
+    :param tile_size: Côté (pixels) des tuiles initiales.
+    :param min_size: En dessous de ce côté, une tuile mixte est itérée entièrement.
+    :return: Tuple (inside, iterated) : raster booléen (ny, nx) des points restés bornés
+             et nombre de points effectivement itérés.
+    """
+    ny, nx = shape
+    x_values, y_values = grid(bounds, shape)
+    known = np.zeros(ny * nx, dtype=bool)
+    inside = np.zeros(ny * nx, dtype=bool)
+    claim = np.zeros(ny * nx, dtype=np.int64)
+    iterated = 0
+
+    def evaluate(flat):
+        # Itère les pixels pas encore connus, une seule fois chacun (bords partagés entre tuiles)
+        nonlocal iterated
+        flat = flat[~known[flat]]
+        claim[flat] = np.arange(len(flat))
+        flat = flat[claim[flat] == np.arange(len(flat))]
+        j, i = np.divmod(flat, nx)
+        points = x_values[i] + 1j * y_values[j]
+        if julia is None:
+            counts = escape_counts(np.zeros_like(points), points, max_iterations, coefficients, radius)
+        else:
+            counts = escape_counts(points, julia, max_iterations, coefficients, radius)
+        inside[flat] = counts == max_iterations
+        known[flat] = True
+        iterated += len(flat)
+
+    pending = np.array(tiles(shape, tile_size), dtype=np.int64).reshape(-1, 4)
+    while len(pending):
+        flat, owner = _borders(pending, nx)
+        evaluate(flat)
+        n_inside = np.bincount(owner, weights=inside[flat], minlength=len(pending))
+        n_border = np.bincount(owner, minlength=len(pending))
+        height, width = pending[:, 1] - pending[:, 0], pending[:, 3] - pending[:, 2]
+        has_interior = (height > 2) & (width > 2)
+        uniform = has_interior & ((n_inside == 0) | (n_inside == n_border))
+        mixed = has_interior & ~uniform
+        small = mixed & ((height <= min_size) | (width <= min_size))
+
+        # Tuiles uniformes : intérieur rempli sans calcul
+        interior = _interiors(pending[uniform], nx)
+        inside[interior] = np.repeat(n_inside[uniform] > 0, (height[uniform] - 2) * (width[uniform] - 2))
+        known[interior] = True
+        # Petites tuiles mixtes : intérieur itéré
+        evaluate(_interiors(pending[small], nx))
+        # Autres tuiles mixtes : quatre sous-tuiles partageant leurs bords (déjà calculés)
+        j0, j1, i0, i1 = pending[mixed & ~small].T
+        jm, im = (j0 + j1) // 2, (i0 + i1) // 2
+        pending = np.concatenate([np.column_stack(tile) for tile in
+                                  ((j0, jm + 1, i0, im + 1), (j0, jm + 1, im, i1),
+                                   (jm, j1, i0, im + 1), (jm, j1, im, i1))])
+    return inside.reshape(shape), iterated
+
+
+def boundary_mask(inside):
+    """Pixels intérieurs ayant au moins un voisin (4-connexité) extérieur."""
+    padded = np.pad(inside, 1, mode="edge")
+    outside_neighbour = ~(padded[:-2, 1:-1] & padded[2:, 1:-1] & padded[1:-1, :-2] & padded[1:-1, 2:])
+    return inside & outside_neighbour
+
+
+def boundary_points(inside, bounds):
+    """
+    Frontière sous forme de nuage de points (voir `boundary_mask`).
+
+    :return: Tableau (n, 2) des (x, y), triés par abscisse puis par ordonnée.
+    """
+    x_values, y_values = grid(bounds, inside.shape)
+    i, j = np.nonzero(boundary_mask(inside).T)
+    return np.column_stack([x_values[i], y_values[j]])
+
+
+def boundary_segments(inside, bounds):
+    """
+    Arêtes séparant un pixel intérieur d'un pixel extérieur, chaque pixel étant centré sur son point.
+
+    :return: Tableau (m, 2, 2) de segments.
+    """
+    x_min, x_max, y_min, y_max = bounds
+    ny, nx = inside.shape
+    # Abscisses et ordonnées des arêtes de pixels, communes à tous les segments
+    x_edges = x_min + (x_max - x_min) * (np.arange(nx + 1) - 0.5) / nx
+    y_edges = y_min + (y_max - y_min) * (np.arange(ny + 1) - 0.5) / ny
+
+    j, i = np.nonzero(inside[:, :-1] != inside[:, 1:])  # arêtes verticales entre i et i + 1
+    vertical = np.stack([np.column_stack([x_edges[i + 1], y_edges[j]]),
+                         np.column_stack([x_edges[i + 1], y_edges[j + 1]])], axis=1)
+    j, i = np.nonzero(inside[:-1] != inside[1:])  # arêtes horizontales entre j et j + 1
+    horizontal = np.stack([np.column_stack([x_edges[i], y_edges[j + 1]]),
+                           np.column_stack([x_edges[i + 1], y_edges[j + 1]])], axis=1)
+    return np.concatenate([vertical, horizontal])
+
+
+def boundary_lines(inside, bounds):
+    """
+    Frontière sous forme de polylignes : arêtes de `boundary_segments` fusionnées par `shapely.line_merge`.
+
+    :return: Liste de tableaux (k, 2).
+    """
+    segments = boundary_segments(inside, bounds)
+    if len(segments) == 0:
+        return []
+    merged = shapely.line_merge(shapely.multilinestrings(shapely.linestrings(segments)))
+    return [shapely.get_coordinates(line) for line in shapely.get_parts(merged)]
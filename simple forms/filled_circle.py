@@ -3,8 +3,9 @@ import shapely.geometry as geometry
 from shapely.geometry.polygon import Polygon
 from shapely.geometry import Point
 import numpy as np
-import json
 from shapely.geometry import mapping, Point
+import repo_root  # noqa: F401 (racine du dépôt dans sys.path, pour `tools`)
+from tools.geojson_writer import write_features
 
 def create_filled_circle_geojson(center, radius, num_points, output_file):
     """
@@ -30,15 +31,8 @@ def create_filled_circle_geojson(center, radius, num_points, output_file):
         "properties": {"radius": radius}
     }
 
-    # Structure GeoJSON
-    geojson_data = {
-        "type": "FeatureCollection",
-        "features": [feature]
-    }
-
-    # Écriture dans un fichier GeoJSON
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(geojson_data, f, ensure_ascii=False, indent=4)
+    # Écriture dans un fichier GeoJSON compact
+    write_features(output_file, [feature])
 
     print(f"GeoJSON créé : {output_file}")
 
@@ -1,6 +1,7 @@
 import os
-import json
 from shapely.geometry import mapping, Polygon
+import repo_root  # noqa: F401 (racine du dépôt dans sys.path, pour `tools`)
+from tools.geojson_writer import write_features
 
 # Vérifier ou créer un dossier simpleGEO
 output_folder = "simpleGEO"
@@ -18,25 +19,21 @@ square_filled = Polygon([
 outer_square = [(0, 0), (0, 10), (10, 10), (10, 0), (0, 0)]  # Contour externe
 square_empty = Polygon(shell=outer_square)
 
-# Créer une collection de fonctionnalités GeoJSON
-geojson_data = {
-    "type": "FeatureCollection",
-    "features": [
-        {
-            "type": "Feature",
-            "geometry": mapping(square_filled),
-            "properties": {"id": 1}
-        },
-        {
-            "type": "Feature",
-            "geometry": mapping(square_empty),
-            "properties": {"id": 2}
-        }
-    ]
-}
+# Créer les entités GeoJSON
+features = [
+    {
+        "type": "Feature",
+        "geometry": mapping(square_filled),
+        "properties": {"id": 1}
+    },
+    {
+        "type": "Feature",
+        "geometry": mapping(square_empty),
+        "properties": {"id": 2}
+    }
+]
 
-# Écriture dans un fichier GeoJSON
-with open(geojson_file, 'w') as f:
-    json.dump(geojson_data, f)
+# Écriture dans un fichier GeoJSON compact
+write_features(geojson_file, features)
 
 print(f"GeoJSON créé dans le dossier : {geojson_file}")
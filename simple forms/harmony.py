@@ -1,6 +1,7 @@
 import os
-import json
 from shapely.geometry import mapping, Point
+import repo_root  # noqa: F401 (racine du dépôt dans sys.path, pour `tools`)
+from tools.geojson_writer import write_features
 
 # Vérifier ou créer un dossier simpleGEO
 output_folder = "simpleGEO"
@@ -21,14 +22,7 @@ for i, point in enumerate(points, start=1):
         'properties': {'id': i, 'value': 1 / i},
     })
 
-# Définir la structure GeoJSON
-geojson = {
-    'type': 'FeatureCollection',
-    'features': features,
-}
-
-# Écriture dans un fichier GeoJSON
-with open(geojson_file, 'w') as f:
-    json.dump(geojson, f)
+# Écriture dans un fichier GeoJSON compact
+write_features(geojson_file, features)
 
 print(f"GeoJSON contenant les points 1/n (0 <= n <= 1000) créé : {geojson_file}")
@@ -0,0 +1,233 @@
+"""
+Moteur de systèmes de fonctions itérées (IFS) vectorisé avec NumPy.
+
+Un IFS est une liste de transformations affines f_i(p) = A_i p + t_i. Un niveau est un
+tableau (n, k, 2) de n primitives (segment, triangle, carré...) de k sommets ; le niveau
+suivant applique toutes les transformations à toutes les primitives en une seule opération
+(`np.einsum`), au lieu de concaténer récursivement des listes de tuples.
+
+L'indice de la transformation est l'axe extérieur : la primitive n° (i * n + j) du niveau
+suivant est f_i(primitive j). On obtient donc exactement l'ordre des anciennes fonctions
+récursives, où la première subdivision est la plus significative :
+f_i1 ∘ f_i2 ∘ ... ∘ f_ik (primitive), par ordre lexicographique de (i1, ..., ik).
+
+Les transformations sont définies pour une primitive unité ; `frame` place le résultat
+dans le repère voulu (segment ou carré initial quelconque), ce qui revient à conjuguer
+chaque transformation par ce repère. `IFS.iterate` matérialise tout le niveau
+(len(ifs) ** iterations * k * 16 octets) ; `IFS.chunks` le parcourt en profondeur, par
+tranches, avec une mémoire bornée par la taille d'une tranche, et `write_chunks` écrit
+ces tranches en flux (GeoJSON ou tableau binaire `.npy`).
+
+Les systèmes classiques (`CANTOR`, `SIERPINSKI`, `CARPET`) sont définis ici une seule
+fois, pour les générateurs, `ifs_boxcounting.py` et `chaos_game.py` ; ce module ne fait
+qu'importer et définir, sans rien écrire.
+"""
+from itertools import product
+from math import sqrt
+
+import numpy as np
+from numpy.lib.format import open_memmap
+from tqdm import tqdm
+
+import repo_root  # noqa: F401 (racine du dépôt dans sys.path, pour `tools`)
+from tools.geojson_writer import write_features
+
+CHUNK_SIZE = 1 << 16
+
+
+def affine(linear=((1.0, 0.0), (0.0, 1.0)), translation=(0.0, 0.0)):
+    """Transformation affine p -> linear @ p + translation, sous forme de tuple de tableaux."""
+    return np.asarray(linear, dtype=np.float64), np.asarray(translation, dtype=np.float64)
+
+
+def scaling(sx, sy=None, translation=(0.0, 0.0)):
+    """Homothétie (ou affinité si `sy` diffère de `sx`) suivie d'une translation."""
+    return affine(((sx, 0.0), (0.0, sx if sy is None else sy)), translation)
+
+
+def similarity(scale, angle=0.0, translation=(0.0, 0.0)):
+    """Similitude : rotation de `angle` radians, homothétie de rapport `scale`, puis translation."""
+    c, s = scale * np.cos(angle), scale * np.sin(angle)
+    return affine(((c, -s), (s, c)), translation)
+
+
+def compose(outer, inner):
+    """Transformation outer ∘ inner."""
+    return outer[0] @ inner[0], outer[0] @ inner[1] + outer[1]
+
+
+def transform(points, transformation):
+    """Applique une transformation affine à un tableau (..., 2) de points."""
+    linear, translation = transformation
+    return points @ linear.T + translation
+
+
+def segment_frame(start, end):
+    """Repère envoyant le segment unité (0, 0)-(1, 0) sur `start`-`end` (similitude directe)."""
+    (x1, y1), (x2, y2) = start, end
+    dx, dy = x2 - x1, y2 - y1
+    return affine(((dx, -dy), (dy, dx)), (x1, y1))
+
+
+class IFS:
+    """Système de fonctions itérées défini par une liste de transformations affines."""
+
+    def __init__(self, maps):
+        """
+        :param maps: Liste de transformations (linear, translation), voir `affine`,
+                     `scaling` et `similarity`. Leur ordre fixe l'ordre des primitives.
+        """
+        self.linear = np.array([linear for linear, _ in maps], dtype=np.float64)
+        self.translation = np.array([translation for _, translation in maps], dtype=np.float64)
+
+    def __len__(self):
+        return len(self.linear)
+
+    def count(self, iterations):
+        """Nombre de primitives après `iterations` itérations."""
+        return len(self) ** iterations
+
+    def word(self, word):
+        """Transformation f_i1 ∘ f_i2 ∘ ... ∘ f_ip d'un mot (i1, ..., ip)."""
+        transformation = affine()
+        for i in word:
+            transformation = compose(transformation, (self.linear[i], self.translation[i]))
+        return transformation
+
+    def step(self, primitives):
+        """Niveau suivant : (n, k, 2) -> (len(self) * n, k, 2), transformation en axe extérieur."""
+        images = np.einsum("mij,nkj->mnki", self.linear, primitives, optimize=True)
+        images += self.translation[:, None, None, :]
+        return images.reshape(-1, *primitives.shape[1:])
+
+    def iterate(self, primitive, iterations, frame=None):
+        """
+        Applique `iterations` fois le système à une primitive.
+
+        :param primitive: Sommets (k, 2) de la primitive, dans le repère unité des transformations.
+        :param iterations: Profondeur.
+        :param frame: Transformation finale (voir `segment_frame`, `scaling`), ou None.
+        :return: Tableau (len(self) ** iterations, k, 2).
+        """
+        level = np.asarray(primitive, dtype=np.float64)[None]
+        for _ in range(iterations):
+            level = self.step(level)
+        return level if frame is None else transform(level, frame)
+
+    def chunks(self, primitive, iterations, frame=None, chunk_size=CHUNK_SIZE, progress=None):
+        """
+        Parcourt le niveau `iterations` en profondeur, par tranches, sans le matérialiser.
+
+        Les d dernières itérations (len(self) ** d <= chunk_size primitives) sont calculées
+        une fois ; chaque tranche est l'image de ce bloc par la transformation composée d'un
+        préfixe (i1, ..., ip), les préfixes étant parcourus dans l'ordre lexicographique.
+        La concaténation des tranches est donc le résultat de `iterate`, dans le même ordre.
+
+        :param chunk_size: Nombre maximal de primitives par tranche.
+        :param progress: Fonction (primitives produites, total) appelée après chaque tranche.
+        :return: Générateur de tableaux (n, k, 2).
+        """
+        depth = 0
+        while depth < iterations and self.count(depth + 1) <= chunk_size:
+            depth += 1
+        block = self.iterate(primitive, depth)
+        frame = frame if frame is not None else affine()
+        total, done = self.count(iterations), 0
+        for prefix in product(range(len(self)), repeat=iterations - depth):
+            chunk = transform(block, compose(frame, self.word(prefix)))
+            done += len(chunk)
+            if progress is not None:
+                progress(done, total)
+            yield chunk
+
+
+def sierpinski_ifs(vertices):
+    """
+    Système du triangle de Sierpiński : les homothéties de rapport 1/2 centrées sur chaque
+    sommet, qui envoient le triangle sur ses sous-triangles quel que soit le triangle de base.
+    """
+    return IFS([scaling(1 / 2, translation=(x / 2, y / 2)) for x, y in vertices])
+
+
+# Ensemble de Cantor : tiers gauche et tiers droit de l'intervalle unité (y inchangé)
+CANTOR = IFS([scaling(1 / 3, 1, (0, 0)), scaling(1 / 3, 1, (2 / 3, 0))])
+# Triangle équilatéral de base de sierpinski.py et son système
+SIERPINSKI_TRIANGLE = [(0, 0), (1, 0), (.5, sqrt(3) / 2)]
+SIERPINSKI = sierpinski_ifs(SIERPINSKI_TRIANGLE)
+# Tapis de Sierpiński (et éponge de Menger 2D) : huit sous-carrés de la grille 3x3
+# (dx puis dy), sans le carré central
+CARPET = IFS([scaling(1 / 3, translation=(dx / 3, dy / 3))
+              for dx, dy in product(range(3), repeat=2) if (dx, dy) != (1, 1)])
+
+
+def closed(level):
+    """Ajoute le premier sommet à la fin de chaque primitive (anneaux de polygones)."""
+    return np.concatenate([level, level[:, :1]], axis=1)
+
+
+def features(chunks, geometry_type, properties=None):
+    """
+    Entités GeoJSON d'un niveau ou d'une suite de tranches, à passer à `write_features`.
+
+    :param chunks: Tableau (n, k, 2) ou itérable de tels tableaux (voir `IFS.chunks`).
+    :param geometry_type: "LineString" (primitive telle quelle) ou "Polygon" (primitive fermée).
+    :param properties: Fonction i -> propriétés (par défaut {"id": i}), i commençant à 1.
+    :return: Générateur d'entités, les coordonnées restant des tableaux NumPy.
+    """
+    properties = properties or (lambda i: {"id": i})
+    if isinstance(chunks, np.ndarray):
+        chunks = [chunks]
+    i = 0
+    for chunk in chunks:
+        if geometry_type == "Polygon":
+            geometries = ({"type": "Polygon", "coordinates": [ring]} for ring in closed(chunk))
+        else:
+            geometries = ({"type": geometry_type, "coordinates": primitive} for primitive in chunk)
+        for geometry in geometries:
+            i += 1
+            yield {"type": "Feature", "geometry": geometry, "properties": properties(i)}
+
+
+def write_npy(path, chunks, count):
+    """
+    Écrit des tranches dans un tableau `.npy` (count, k, 2) projeté en mémoire, lisible
+    ensuite avec `np.load(path, mmap_mode="r")`.
+
+    :return: Nombre de primitives écrites.
+    """
+    array, start = None, 0
+    for chunk in chunks:
+        if array is None:
+            array = open_memmap(path, mode="w+", dtype=np.float64, shape=(count, *chunk.shape[1:]))
+        array[start:start + len(chunk)] = chunk
+        start += len(chunk)
+    if array is not None:
+        array.flush()
+    return start
+
+
+def write_chunks(path, chunks, geometry_type, count, precision=None):
+    """
+    Écrit des tranches en flux : tableau binaire si `path` finit par `.npy`, GeoJSON sinon.
+
+    :param count: Nombre total de primitives (voir `IFS.count`), pour le fichier `.npy`.
+    :param precision: Décimales conservées dans le GeoJSON.
+    :return: Nombre de primitives écrites.
+    """
+    if path.endswith(".npy"):
+        return write_npy(path, chunks, count)
+    return write_features(path, features(chunks, geometry_type), precision)
+
+
+def progress_bar(desc, unit=" primitives"):
+    """Fonction de progression (fait, total) pour `IFS.chunks`, affichant une barre tqdm."""
+    bar = None
+
+    def progress(done, total):
+        nonlocal bar
+        if bar is None:
+            bar = tqdm(total=total, desc=desc, unit=unit)
+        bar.update(done - bar.n)
+        if done == total:
+            bar.close()
+    return progress
@@ -0,0 +1,250 @@
+"""
+Comptage exact des boîtes des IFS « sur grille », sans générer aucune primitive.
+
+Dans un repère bien choisi (`frame`), les transformations d'un tel système sont
+x -> (x + d_i) / b, de même base entière b sur chaque axe contracté et de « chiffres »
+d_i entiers (Cantor : b = 3, d = 0 ou 2 ; tapis et éponge de Menger 2D : b = 3, huit
+chiffres ; Sierpiński, dans le repère du triangle : b = 2, d = (0, 0), (1, 0), (0, 1)).
+Les cellules du niveau k sont alors les cellules p_w = somme des d_i b^(k - j) de la
+grille de pas b^-k, et deux comptages ont une forme close :
+
+- intérieur (`closed=False`) : boîtes dont l'intérieur rencontre l'ensemble, soit les
+  cellules distinctes du niveau k (len(ifs) ** k si les chiffres sont distincts) ;
+- fermé (`closed=True`, le box-counting usuel) : boîtes fermées touchées par
+  l'attracteur A, bords compris. A touche la cellule c du niveau k si et seulement si
+  c - p_w appartient, pour un mot w, à l'ensemble E des cellules unité touchées par A
+  (`touch_offsets`, plus grand point fixe d'une récurrence sur les sous-cellules).
+
+Le nombre de cellules c telles que c - s soit une cellule du niveau k pour un s d'un
+ensemble S se calcule chiffre par chiffre, du moins significatif au plus significatif :
+en écrivant c = b c' + r, la condition devient c' - s' du niveau k - 1, pour
+s' = (s + d - r) / b entier. Les ensembles S ainsi atteints sont peu nombreux ; on
+propage le nombre de cellules par ensemble (entiers Python exacts), sans jamais énumérer
+les len(ifs) ** k cellules : la profondeur 30 du tapis (8 ** 30 carrés) prend quelques
+millisecondes. `materialized_box_counts` compte les mêmes boîtes sur des primitives
+effectivement générées, pour la validation aux petites profondeurs
+(tests/test_ifs_boxcounting.py).
+
+Les boîtes sont celles de la grille du repère `frame`. Sans repère (Cantor, tapis), ce
+sont les carrés de `tools.boxcounting` et les comptages sont comparables. Pour Sierpiński,
+le repère du triangle est oblique : les « boîtes » sont des parallélogrammes (losanges de
+côté b^-k), pas des carrés alignés sur les axes ; la dimension limite est la même, mais
+les comptages N(k) ne sont pas comparables à ceux de `tools.boxcounting`.
+"""
+from collections import defaultdict
+from fractions import Fraction
+from itertools import product
+from math import ceil, floor
+
+import numpy as np
+
+import repo_root  # noqa: F401 (racine du dépôt dans sys.path, pour `tools`)
+from tools.boxcounting import fit_dimension
+from ifs import CANTOR, CARPET, SIERPINSKI, SIERPINSKI_TRIANGLE, affine, compose, transform
+
+
+def inverse(transformation):
+    """Transformation affine réciproque."""
+    linear, translation = transformation
+    inverse_linear = np.linalg.inv(linear)
+    return inverse_linear, -inverse_linear @ translation
+
+
+def triangle_frame(vertices):
+    """Repère envoyant le triangle unité (0, 0), (1, 0), (0, 1) sur `vertices`."""
+    (x0, y0), (x1, y1), (x2, y2) = vertices
+    return affine(((x1 - x0, x2 - x0), (y1 - y0, y2 - y0)), (x0, y0))
+
+
+def lattice(ifs, frame=None, tolerance=1e-9):
+    """
+    Base et chiffres d'un IFS sur grille, exprimé dans le repère `frame`.
+
+    :param frame: Repère dans lequel les transformations sont x -> (x + d_i) / b (None : identité).
+    :return: Tuple (base, axes, digits) : base b, indices des axes contractés (les autres
+             axes sont conservés tels quels et ignorés par le comptage) et tableau entier
+             (len(ifs), len(axes)) des chiffres.
+    :raises ValueError: Si le système n'est pas sur grille dans ce repère.
+    """
+    frame = frame if frame is not None else affine()
+    to_lattice = inverse(frame)
+    maps = [compose(to_lattice, compose((linear, translation), frame))
+            for linear, translation in zip(ifs.linear, ifs.translation)]
+    linear = np.array([linear for linear, _ in maps])
+    translation = np.array([translation for _, translation in maps])
+    if not np.allclose(linear, linear[0], atol=tolerance) or abs(linear[0, 0, 1]) > tolerance \
+            or abs(linear[0, 1, 0]) > tolerance:
+        raise ValueError("Les transformations ne sont pas une même affinité diagonale dans ce repère.")
+
+    scales = np.diag(linear[0])
+    axes = tuple(int(axis) for axis in np.flatnonzero(np.abs(scales - 1) > tolerance))
+    if not axes:
+        raise ValueError("Aucun axe n'est contracté.")
+    bases = {round(1 / scales[axis]) for axis in axes}
+    if len(bases) > 1 or any(abs(scales[axis] * round(1 / scales[axis]) - 1) > tolerance for axis in axes):
+        raise ValueError(f"Rapports {scales} : il faut une même base entière sur les axes contractés "
+                         "(les systèmes auto-affins ne sont pas pris en charge).")
+    base = bases.pop()
+    if base < 2:
+        raise ValueError("La base doit être au moins 2.")
+
+    fixed = [axis for axis in range(2) if axis not in axes]
+    if fixed and np.abs(translation[:, fixed]).max() > tolerance:
+        raise ValueError("Les axes non contractés ne doivent pas être translatés.")
+    digits = translation[:, axes] * base
+    if np.abs(digits - np.round(digits)).max() > tolerance * base:
+        raise ValueError("Les translations ne sont pas sur la grille de pas 1/base.")
+    return base, axes, np.round(digits).astype(np.int64)
+
+
+def touch_offsets(base, digits):
+    """
+    Cellules unité fermées touchées par l'attracteur A des chiffres `digits`.
+
+    e en fait partie si l'une des sous-cellules b e + r est touchée par une copie d + A,
+    c'est-à-dire si b e + r - d en fait partie : on part des cellules qui touchent la
+    boîte englobante de A et on retire celles qui ne vérifient pas la condition, jusqu'au
+    point fixe (le plus grand, qui est le bon pour des cellules fermées, par compacité).
+
+    :return: Ensemble de tuples d'entiers.
+    """
+    ranges = []
+    for column in np.asarray(digits).T:
+        low, high = Fraction(int(column.min()), base - 1), Fraction(int(column.max()), base - 1)
+        ranges.append(range(ceil(low) - 1, floor(high) + 1))
+    cells = set(product(*ranges))
+    residues = list(product(range(base), repeat=len(ranges)))
+    digits = [tuple(int(x) for x in digit) for digit in digits]
+    while True:
+        kept = {cell for cell in cells
+                if any(tuple(base * c + r - d for c, r, d in zip(cell, residue, digit)) in cells
+                       for residue in residues for digit in digits)}
+        if kept == cells:
+            return cells
+        cells = kept
+
+
+def _transitions(state, base, digits, residues):
+    """Ensembles S' = {(s + d - r) / b entiers} pour chaque reste r (les ensembles vides sont omis)."""
+    successors = []
+    for residue in residues:
+        offsets = frozenset(
+            tuple((s + d - r) // base for s, d, r in zip(offset, digit, residue))
+            for offset in state for digit in digits
+            if all((s + d - r) % base == 0 for s, d, r in zip(offset, digit, residue))
+        )
+        if offsets:
+            successors.append(offsets)
+    return successors
+
+
+def box_counts(ifs, iterations, frame=None, closed=True):
+    """
+    Nombre exact de boîtes de la grille b^-k (dans le repère `frame`) occupées par l'ensemble.
+
+    Avec un repère oblique (Sierpiński), les boîtes sont des parallélogrammes : les
+    comptages ne sont alors pas ceux de boîtes carrées (voir l'en-tête du module).
+
+    :param iterations: Profondeur maximale k.
+    :param frame: Repère dans lequel le système est sur grille, voir `lattice`.
+    :param closed: True : boîtes fermées touchées par l'attracteur ; False : boîtes dont
+                   l'intérieur le rencontre (cellules distinctes du niveau k).
+    :return: Liste des comptages N(0), ..., N(iterations), entiers exacts.
+    """
+    base, axes, digits = lattice(ifs, frame)
+    start = touch_offsets(base, digits) if closed else {(0,) * len(axes)}
+    digits = [tuple(int(x) for x in digit) for digit in digits]
+    residues = list(product(range(base), repeat=len(axes)))
+    transitions = {}
+
+    counts, distribution = [], {frozenset(start): 1}
+    for k in range(iterations + 1):
+        counts.append(sum(count * len(state) for state, count in distribution.items()))
+        if k == iterations:
+            break
+        following = defaultdict(int)
+        for state, count in distribution.items():
+            if state not in transitions:
+                transitions[state] = _transitions(state, base, digits, residues)
+            for successor in transitions[state]:
+                following[successor] += count
+        distribution = following
+    return counts
+
+
+def materialized_box_counts(level, ifs, iterations, frame=None, closed=True):
+    """
+    Mêmes comptages que `box_counts`, sur des primitives générées (validation).
+
+    Les primitives du niveau `iterations` sont ramenées sur la grille entière de pas b^-iterations. Chacune tient dans une cellule
+    unité : elle ne peut toucher une autre boîte que par un point du bord de cette cellule,
+    donc par un sommet ou une arête entre sommets situés sur une ligne de la grille, et il
+    suffit de compter les boîtes fermées qui contiennent ses sommets. Ce comptage est celui
+    de l'union des primitives : il coïncide avec celui de l'attracteur quand les points de
+    chaque primitive situés sur le bord de sa cellule appartiennent à l'attracteur
+    (extrémités des segments de Cantor, bords des triangles de Sierpiński et des carrés du
+    tapis), mais pas pour une croix de Vicsek, dont les carrés touchent des coins absents
+    de l'attracteur.
+
+    :param level: Tableau (n, k, 2) des primitives, dans les coordonnées de `ifs` (sortie de
+                  `ifs.iterate(primitive, iterations)`, sans repère final).
+    :return: Liste des comptages N(0), ..., N(iterations).
+    """
+    base, axes, _ = lattice(ifs, frame)
+    frame = frame if frame is not None else affine()
+    points = transform(np.asarray(level, dtype=np.float64), inverse(frame))[..., axes] * base ** iterations
+    vertices = np.round(points).astype(np.int64)
+    if np.abs(points - vertices).max() > 1e-6:
+        raise ValueError("Les sommets ne sont pas sur la grille du niveau.")
+    if (vertices.max(axis=1) - vertices.min(axis=1)).max() > 1:
+        raise ValueError("Les primitives doivent tenir dans une cellule de la grille du niveau.")
+
+    counts = []
+    for k in range(iterations + 1):
+        size = base ** (iterations - k)
+        if closed:
+            # Un sommet sur une ligne de la grille appartient aux deux boîtes voisines
+            cells, remainders = np.divmod(vertices.reshape(-1, len(axes)), size)
+            candidates = []
+            for shift in product((0, 1), repeat=len(axes)):
+                shift = np.array(shift)
+                on_line = np.all((shift == 0) | (remainders == 0), axis=1)
+                candidates.append(cells[on_line] - shift)
+            cells = np.concatenate(candidates)
+        else:
+            cells = vertices.min(axis=1) // size
+        counts.append(len(np.unique(cells, axis=0)))
+    return counts
+
+
+def dimension(counts, base, first=1):
+    """Dimension de box-counting ajustée sur N(first), ..., N(k) (voir `tools.boxcounting.fit_dimension`)."""
+    sizes = float(base) ** -np.arange(first, len(counts))
+    return fit_dimension(sizes, [float(count) for count in counts[first:]])
+
+
+# Systèmes partagés de ifs.py (cantor.py, sierpinski.py, sierpinski_carpet.py et menger.py) :
+# nom -> (système, primitive, repère)
+FRACTALS = {
+    "cantor": (CANTOR, [(0, 0), (1, 0)], None),
+    # Repère oblique du triangle : boîtes en parallélogrammes, comptages non comparables
+    # à ceux de tools.boxcounting (seule la dimension l'est)
+    "sierpinski": (SIERPINSKI, SIERPINSKI_TRIANGLE, triangle_frame(SIERPINSKI_TRIANGLE)),
+    "sierpinski_carpet": (CARPET, [(0, 0), (1, 0), (1, 1), (0, 1)], None),
+}
+FRACTALS["menger_sponge"] = FRACTALS["sierpinski_carpet"]  # Éponge de Menger 2D : même système
+
+
+if __name__ == "__main__":
+    import time
+
+    iterations = 30  # Profondeur du comptage analytique (validation : tests/test_ifs_boxcounting.py)
+
+    for name, (ifs, primitive, frame) in FRACTALS.items():
+        base = lattice(ifs, frame)[0]
+        start = time.perf_counter()
+        counts = box_counts(ifs, iterations, frame)
+        duration = time.perf_counter() - start
+        cells = "parallélogrammes" if frame is not None else "boîtes fermées"
+        print(f"{name} : N({iterations}) = {counts[-1]} {cells} de côté {base}^-{iterations} "
+              f"en {duration * 1000:.1f} ms, dimension {dimension(counts, base, first=iterations // 2):.6f}")
@@ -1,7 +1,16 @@
 import os
-import json
-from shapely.geometry import mapping, LineString
-from math import sqrt
+from math import pi, sqrt
+from ifs import CHUNK_SIZE, IFS, progress_bar, segment_frame, similarity, write_chunks
+
+# Les quatre segments de la courbe de Koch, sur le segment unité (0, 0)-(1, 0) :
+# premier tiers, montée vers le pic (1/2, sqrt(3)/6), descente, dernier tiers
+KOCH = IFS([
+    similarity(1 / 3),
+    similarity(1 / 3, pi / 3, (1 / 3, 0)),
+    similarity(1 / 3, -pi / 3, (1 / 2, sqrt(3) / 6)),
+    similarity(1 / 3, 0, (2 / 3, 0)),
+])
+UNIT_SEGMENT = [(0, 0), (1, 0)]
 
 
 def koch(segment, iterations):
@@ -10,36 +19,20 @@ def koch(segment, iterations):
 
     :param segment: Tuple représentant le segment (Point1, Point2) comme ((x1, y1), (x2, y2)).
     :param iterations: Nombre d'itérations pour générer la courbe de Koch.
-    :return: Liste des segments de la courbe de Koch sous forme de tuples [((x1, y1), (x2, y2)), ...].
+    :return: Tableau (4 ** iterations, 2, 2) des segments, dans l'ordre de la courbe.
     """
-    if iterations == 0:
-        return [segment]
-    else:
-        (x1, y1), (x2, y2) = segment
-
-        # Points définissant les divisions du segment
-        dx, dy = x2 - x1, y2 - y1
+    return KOCH.iterate(UNIT_SEGMENT, iterations, frame=segment_frame(*segment))
 
-        # Premier tiers
-        p1 = (x1, y1)
-        p2 = (x1 + dx / 3, y1 + dy / 3)
 
-        # Point du "pic" du triangle équilatéral
-        px = (x1 + dx / 2 - sqrt(3) * dy / 6)
-        py = (y1 + dy / 2 + sqrt(3) * dx / 6)
-        p3 = (px, py)
-
-        # Dernier tiers
-        p4 = (x1 + 2 * dx / 3, y1 + 2 * dy / 3)
-        p5 = (x2, y2)
+def koch_chunks(segment, iterations, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Génère les segments de la courbe de Koch par tranches, en mémoire bornée.
 
-        # Répéter la construction pour chaque segment
-        return (
-            koch((p1, p2), iterations - 1)
-            + koch((p2, p3), iterations - 1)
-            + koch((p3, p4), iterations - 1)
-            + koch((p4, p5), iterations - 1)
-        )
+    :param chunk_size: Nombre maximal de segments par tranche.
+    :param progress: Fonction (segments produits, total) appelée après chaque tranche.
+    :return: Générateur de tableaux (n, 2, 2), dans l'ordre de `koch`.
+    """
+    return KOCH.chunks(UNIT_SEGMENT, iterations, segment_frame(*segment), chunk_size, progress)
 
 
 # Vérifier ou créer un dossier simpleGEO
@@ -47,31 +40,16 @@ output_folder = "simpleGEO"
 os.makedirs(output_folder, exist_ok=True)
 
 # Chemin complet où le fichier Koch sera sauvegardé
-geojson_file = os.path.join(output_folder, "koch.geojson")
+output_format = "geojson"  # "geojson" ou "npy" (tableau binaire (n, 2, 2) des segments)
+output_file = os.path.join(output_folder, f"koch.{output_format}")
 
 # Générer la courbe de Koch
 iterations = 4  # Nombre d'itérations
+precision = 10  # Décimales conservées pour les coordonnées
 initial_segment = ((0, 0), (1, 0))  # Segment initial entre les points (0, 0) et (1, 0)
-segments = koch(initial_segment, iterations)  # Liste des segments sous forme [((x1, y1), (x2, y2)), ...]
-
-# Construire les entités GeoJSON
-features = []
-for i, ((x1, y1), (x2, y2)) in enumerate(segments, start=1):
-    line = LineString([(x1, y1), (x2, y2)])  # Créer un segment
-    features.append({
-        "type": "Feature",
-        "geometry": mapping(line),
-        "properties": {"id": i}
-    })
-
-# Structure GeoJSON
-geojson_data = {
-    "type": "FeatureCollection",
-    "features": features
-}
+segments = koch_chunks(initial_segment, iterations, progress=progress_bar("Courbe de Koch"))
 
-# Écriture dans un fichier GeoJSON
-with open(geojson_file, "w", encoding="utf-8") as f:
-    json.dump(geojson_data, f, ensure_ascii=False, indent=4)
+# Écriture en flux, tranche par tranche
+write_chunks(output_file, segments, "LineString", KOCH.count(iterations), precision)
 
-print(f"GeoJSON représentant la courbe de Koch (itérations={iterations}) créé : {geojson_file}")
+print(f"Fichier représentant la courbe de Koch (itérations={iterations}) créé : {output_file}")
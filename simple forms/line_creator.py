@@ -1,6 +1,7 @@
 import os
-import json
 from shapely.geometry import mapping, LineString
+import repo_root  # noqa: F401 (racine du dépôt dans sys.path, pour `tools`)
+from tools.geojson_writer import write_features
 
 # Vérifier ou créer un dossier simpleGEO
 output_folder = "simpleGEO"
@@ -21,14 +22,7 @@ feature = {
     "properties": {"id": 1}
 }
 
-# Structure GeoJSON
-geojson_data = {
-    "type": "FeatureCollection",
-    "features": [feature]
-}
-
-# Écriture dans un fichier GeoJSON
-with open(geojson_file, "w", encoding="utf-8") as f:
-    json.dump(geojson_data, f, ensure_ascii=False, indent=4)
+# Écriture dans un fichier GeoJSON compact
+write_features(geojson_file, [feature])
 
 print(f"GeoJSON de la ligne créé dans le dossier : {geojson_file}")
@@ -0,0 +1,174 @@
+"""
+Courbes de L-systèmes (Koch, Peano, Hilbert, dragon) calculées d'un bloc avec NumPy.
+
+Le programme n'est pas développé en chaîne de caractères : c'est un tableau de jetons
+int32, un par symbole autre que '+' et '-', qui portent le code ASCII du symbole (octet
+de poids faible) et le virage qui le précède ('+' : +1, '-' : -1, en nombre d'angles),
+plus le virage final. Chaque règle de production est compilée de la même façon, dans une
+table (256, longueur maximale) complétée par des zéros : une itération est
+`np.take(table, symboles)`, où le premier jeton de chaque remplacement reçoit le virage
+du symbole remplacé et le virage final du remplacement précédent, suivie du retrait des
+zéros, sans boucle Python sur les symboles.
+
+Les symboles de `draw` font avancer la tortue d'un pas, les autres (variables X, Y, A,
+B...) sont ignorés. Le cap de chaque pas est la somme cumulée (`np.cumsum`) des virages ;
+la direction correspondante est lue dans une table de vecteurs unitaires quand 360 est un
+multiple de l'angle (aucun cos/sin par segment), et les sommets sont la somme cumulée des
+directions. Les crochets (branches) ne sont pas pris en charge.
+"""
+import os
+import time
+
+import numpy as np
+
+_TURNS = {"+": 1, "-": -1}
+
+
+def _compile(text):
+    """Symboles (uint8), virage avant chaque symbole (int32) et virage final d'une chaîne."""
+    symbols, turns, turn = [], [], 0
+    for char in text:
+        if char in _TURNS:
+            turn += _TURNS[char]
+        else:
+            symbols.append(ord(char))
+            turns.append(turn)
+            turn = 0
+    return np.array(symbols, dtype=np.uint8), np.array(turns, dtype=np.int32), turn
+
+
+def _pack(symbols, turns):
+    return (np.asarray(turns, dtype=np.int32) << 8) | symbols
+
+
+class LSystem:
+    """L-système sans branches, interprété par une tortue."""
+
+    def __init__(self, axiom, rules, angle, draw="F", heading=0.0):
+        """
+        :param axiom: Chaîne initiale.
+        :param rules: Dictionnaire symbole -> remplacement (au moins un symbole autre que '+' et '-').
+        :param angle: Angle d'un virage, en degrés.
+        :param draw: Symboles qui font avancer la tortue d'un pas.
+        :param heading: Cap initial, en degrés (0 : vers les x croissants).
+        """
+        self.axiom = axiom
+        self.rules = rules
+        self.angle = angle
+        self.draw = draw
+        self.heading = heading
+
+        # Table de réécriture : ligne b = remplacement du symbole b, complété par des zéros.
+        # Un jeton est un int32 virage * 256 + symbole : une seule indexation par itération.
+        compiled = {ord(symbol): _compile(replacement) for symbol, replacement in rules.items()}
+        if any(len(symbols) == 0 for symbols, _, _ in compiled.values()):
+            raise ValueError("Chaque remplacement doit contenir au moins un symbole autre que '+' et '-'.")
+        width = max([1] + [len(symbols) for symbols, _, _ in compiled.values()])
+        self._table = np.zeros((256, width), dtype=np.int32)
+        self._table[1:, 0] = np.arange(1, 256)
+        self._tails = np.zeros(256, dtype=np.int32)
+        for code, (symbols, turns, tail) in compiled.items():
+            self._table[code] = 0
+            self._table[code, :len(symbols)] = _pack(symbols, turns)
+            self._tails[code] = tail << 8
+        self._drawn = np.zeros(256, dtype=bool)
+        self._drawn[[ord(symbol) for symbol in draw]] = True
+
+    def program(self, iterations):
+        """
+        Programme après `iterations` applications des règles.
+
+        :return: Tuple (symboles, virages, virage final) : codes ASCII (uint8), virage
+                 précédant chaque symbole (int32, en nombre d'angles) et virage final.
+        """
+        symbols, turns, tail = _compile(self.axiom)
+        tokens = _pack(symbols, turns)
+        for _ in range(iterations):
+            codes = tokens & 255
+            expanded = np.take(self._table, codes, axis=0)
+            # Le premier symbole de chaque remplacement hérite du virage du symbole remplacé
+            # et du virage final du remplacement précédent
+            expanded[:, 0] += tokens - codes
+            expanded[1:, 0] += self._tails[codes[:-1]]
+            tail += int(self._tails[codes[-1]]) >> 8
+            tokens = expanded.ravel()
+            tokens = tokens[tokens != 0]
+        return (tokens & 255).astype(np.uint8), tokens >> 8, tail
+
+    def expand(self, iterations):
+        """Programme sous forme de chaîne (pour l'affichage ; les virages consécutifs sont regroupés)."""
+        symbols, turns, tail = self.program(iterations)
+        turn = lambda t: ("+" if t > 0 else "-") * abs(int(t))
+        return "".join(turn(t) + chr(s) for s, t in zip(symbols, turns)) + turn(tail)
+
+    def headings(self, iterations):
+        """Cap de chaque pas, en nombre entier d'angles à partir du cap initial (tableau int32)."""
+        symbols, turns, _ = self.program(iterations)
+        return np.cumsum(turns, dtype=np.int32)[self._drawn[symbols]]
+
+    def directions(self, headings):
+        """Vecteurs unitaires (n, 2) des caps."""
+        k = 360 / self.angle
+        if float(k).is_integer():
+            # Table des k directions possibles, zéros exacts pour les courbes à angles droits
+            angles = np.radians(self.heading + self.angle * np.arange(int(k)))
+            table = np.column_stack([np.cos(angles), np.sin(angles)])
+            table[np.abs(table) < 1e-15] = 0.0
+            return table[headings % int(k)]
+        angles = np.radians(self.heading + self.angle * headings)
+        return np.column_stack([np.cos(angles), np.sin(angles)])
+
+    def vertices(self, iterations, step=1.0, start=(0.0, 0.0)):
+        """
+        Sommets de la courbe.
+
+        :param step: Longueur d'un pas.
+        :param start: Point de départ.
+        :return: Tableau (pas + 1, 2) de float64.
+        """
+        directions = self.directions(self.headings(iterations))
+        vertices = np.empty((len(directions) + 1, 2))
+        vertices[0] = 0.0
+        np.cumsum(directions, axis=0, out=vertices[1:])
+        return np.asarray(start, dtype=np.float64) + step * vertices
+
+
+# Flocon de Koch : triangle parcouru dans le sens horaire à partir de (0, 0), vers (1/2, sqrt(3)/2)
+KOCH_SNOWFLAKE = LSystem("F--F--F", {"F": "F+F--F+F"}, 60, heading=60)
+# Courbe de Peano dans [0, 1]², de (0, 0) à (1, 1)
+PEANO = LSystem("X", {"X": "XFYFX-F-YFXFY+F+XFYFX", "Y": "YFXFY+F+XFYFX-F-YFXFY"}, 90, heading=90)
+# Courbe de Hilbert dans [0, 1]², de (0, 0) à (1, 0)
+HILBERT = LSystem("A", {"A": "+BF-AFA-FB+", "B": "-AF+BFB+FA-"}, 90)
+# Courbe du dragon (Heighway)
+DRAGON = LSystem("FX", {"X": "X+YF+", "Y": "-FX-Y"}, 90)
+
+# Longueur d'un pas pour que chaque courbe tienne dans le carré (ou le segment) unité
+STEPS = {
+    "koch_snowflake": lambda n: 3.0 ** -n,
+    "peano": lambda n: 1 / (3 ** n - 1),
+    "hilbert": lambda n: 1 / (2 ** n - 1),
+    "dragon": lambda n: 2 ** (-n / 2),
+}
+CURVES = {"koch_snowflake": KOCH_SNOWFLAKE, "peano": PEANO, "hilbert": HILBERT, "dragon": DRAGON}
+
+
+if __name__ == "__main__":
+    import repo_root  # noqa: F401 (racine du dépôt dans sys.path, pour `tools`)
+    from tools.geojson_writer import write_features
+
+    # Vérifier ou créer un dossier simpleGEO
+    output_folder = "simpleGEO"
+    os.makedirs(output_folder, exist_ok=True)
+
+    # Nombre d'itérations de chaque courbe (environ un million de sommets chacune)
+    iterations = {"koch_snowflake": 9, "peano": 6, "hilbert": 10, "dragon": 20}
+    precision = 10  # Décimales conservées pour les coordonnées
+
+    for name, n in iterations.items():
+        start = time.perf_counter()
+        vertices = CURVES[name].vertices(n, STEPS[name](n))
+        duration = time.perf_counter() - start
+        geojson_file = os.path.join(output_folder, f"{name}_lsystem.geojson")
+        write_features(geojson_file, [{"type": "Feature", "geometry": {"type": "LineString", "coordinates": vertices},
+                                       "properties": {"id": 1, "iterations": n}}], precision)
+        print(f"{name} (itérations={n}) : {len(vertices)} sommets en {duration * 1000:.0f} ms -> {geojson_file}")
@@ -1,67 +1,72 @@
 import os
-import json
-from shapely.geometry import mapping, Point
-from tqdm import tqdm
+import time
+import repo_root  # noqa: F401 (racine du dépôt dans sys.path, pour `tools`)
+from tools.geojson_writer import write_features
+from escape_time import boundary_lines, boundary_points, escape_time_raster, interior_points, mariani_silver, save_raster
+from ifs import progress_bar
 
 
-def mandelbrot(c, max_iterations):
-    """
-    Calcule si un point c appartient à l'ensemble de Mandelbrot à l'aide d'une itération.
+if __name__ == "__main__":
+    # Créer un dossier pour le fichier de sortie
+    output_folder = "simpleGEO"
+    os.makedirs(output_folder, exist_ok=True)
 
-    :param c: Nombre complexe représentant le point c (dans le plan complexe).
-    :param max_iterations: Nombre maximal d'itérations pour déterminer si c reste borné.
-    :return: Le nombre d'itérations avant que c échappe (ou max_iterations si c est dans l'ensemble).
-    """
-    z = 0  # Initialisation de z à 0
-    for n in range(max_iterations):
-        z = z * z + c
-        if abs(z) > 2:  # Si la valeur de |z| dépasse 2, c n'est pas dans l'ensemble
-            return n
-    return max_iterations  # Si la valeur est restée bornée pendant toutes les itérations, c est considéré dans l'ensemble
+    # Chemins où le raster et (optionnellement) les points seront sauvegardés
+    raster_file = os.path.join(output_folder, "mandelbrot_iterations.npz")
+    geojson_file = os.path.join(output_folder, "mandelbrot.geojson")
+    export_geojson = True  # Exporte aussi les points intérieurs en GeoJSON (lent pour de grandes résolutions)
 
+    # Définir les limites du plan complexe à explorer et la résolution
+    x_min, x_max = -3, 2.0  # Limites pour les parties réelles
+    y_min, y_max = -1.25, 1.25  # Limites pour les parties imaginaires
+    resolution = 1_000  # Nombre de points par axe (plus grand = plus de détails)
 
-# Créer un dossier pour le fichier de sortie
-output_folder = "simpleGEO"
-os.makedirs(output_folder, exist_ok=True)
+    # Définir le nombre maximal d'itérations
+    max_iterations = 100
+    precision = 10  # Décimales conservées pour les coordonnées
 
-# Chemin où le fichier de Mandelbrot sera sauvegardé
-geojson_file = os.path.join(output_folder, "mandelbrot.geojson")
+    # Ensemble de Julia : constante c (None pour l'ensemble de Mandelbrot), ex. complex(-0.8, 0.156)
+    julia = None
+    workers = None  # Nombre de processus (None : un par cœur)
 
-# Définir les limites du plan complexe à explorer et la résolution
-x_min, x_max = -3, 2.0  # Limites pour les parties réelles
-y_min, y_max = -1.25, 1.25  # Limites pour les parties imaginaires
-resolution = 1_000  # Nombre de points par axe (plus grand = plus de détails)
+    # "grid" : raster complet ; "boundary" : raffinement Mariani–Silver de la seule frontière
+    mode = "grid"
+    boundary_format = "lines"  # "points" (pixels frontières) ou "lines" (arêtes de pixels fusionnées)
+    boundary_file = os.path.join(output_folder, "mandelbrot_boundary.geojson")
 
-# Définir le nombre maximal d'itérations
-max_iterations = 100
+    bounds = (x_min, x_max, y_min, y_max)
+    start = time.perf_counter()
+    if mode == "boundary":
+        # Seules les tuiles traversées par la frontière sont subdivisées et itérées
+        inside, iterated = mariani_silver(bounds, (resolution, resolution), max_iterations, julia=julia)
+        print(f"{iterated} points itérés sur {resolution * resolution} en {time.perf_counter() - start:.2f} s")
+        if boundary_format == "points":
+            geometry = {"type": "MultiPoint", "coordinates": boundary_points(inside, bounds)}
+        else:
+            geometry = {"type": "MultiLineString", "coordinates": boundary_lines(inside, bounds)}
+        write_features(boundary_file, [{"type": "Feature", "geometry": geometry, "properties": {"id": 1}}], precision)
+        print(f"GeoJSON de la frontière créé : {boundary_file}")
+        print(f"Box-counting : python -m tools.boxcounting \"{boundary_file}\" 1E-3 1E-1")
+    else:
+        # Calculer le raster du nombre d'itérations, tuile par tuile
+        raster = escape_time_raster(bounds, (resolution, resolution), max_iterations, julia=julia, workers=workers,
+                                    progress=progress_bar("Calcul de l'ensemble de Mandelbrot", unit=" tuiles"))
+        print(f"{resolution * resolution} points calculés en {time.perf_counter() - start:.2f} s")
+        save_raster(raster_file, raster, bounds, max_iterations, julia)
+        print(f"Raster du nombre d'itérations créé : {raster_file}")
 
-# Créer une grille de points dans le plan complexe
-x_values = [x_min + (x_max - x_min) * i / resolution for i in range(resolution)]
-y_values = [y_min + (y_max - y_min) * i / resolution for i in range(resolution)]
+        if export_geojson:
+            # Ajouter uniquement les points qui appartiennent (approximativement) à l'ensemble
+            features = (
+                {
+                    "type": "Feature",
+                    "geometry": {"type": "Point", "coordinates": point},
+                    "properties": {"iterations": max_iterations}
+                }
+                for point in interior_points(raster, bounds, max_iterations)
+            )
 
-# Construire les entités GeoJSON
-features = []
-for x in tqdm(x_values, desc="Calcul de l'ensemble de Mandelbrot"):
-    for y in y_values:
-        c = complex(x, y)  # Les coordonnées dans le plan complexe
-        iterations = mandelbrot(c, max_iterations)  # Calculer le nombre d'itérations
-        if iterations == max_iterations:
-            # Ajouter le point uniquement s'il appartient (approximativement) à l'ensemble de Mandelbrot
-            point = Point(x, y)
-            features.append({
-                "type": "Feature",
-                "geometry": mapping(point),
-                "properties": {"iterations": iterations}
-            })
+            # Écriture dans un fichier GeoJSON compact
+            write_features(geojson_file, features, precision)
 
-# Structure GeoJSON
-geojson_data = {
-    "type": "FeatureCollection",
-    "features": features
-}
-
-# Écriture dans un fichier GeoJSON
-with open(geojson_file, "w", encoding="utf-8") as f:
-    json.dump(geojson_data, f, ensure_ascii=False, indent=4)
-
-print(f"GeoJSON représentant l'ensemble de Mandelbrot créé : {geojson_file}")
+            print(f"GeoJSON représentant l'ensemble de Mandelbrot créé : {geojson_file}")
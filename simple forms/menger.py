@@ -1,7 +1,11 @@
 import os
-import json
-from shapely.geometry import Polygon, mapping
-from itertools import product
+from ifs import CARPET, CHUNK_SIZE, progress_bar, scaling, write_chunks
+
+# Éponge de Menger 2D : sous-carrés de la grille 3x3, sauf le carré central (même système que le tapis)
+MENGER = CARPET
+
+# Carré unité : coins inférieur-gauche, inférieur-droit, supérieur-droit, supérieur-gauche
+UNIT_SQUARE = [(0, 0), (1, 0), (1, 1), (0, 1)]
 
 
 def menger_sponge_2d(coords, size, iterations):
@@ -11,44 +15,20 @@ def menger_sponge_2d(coords, size, iterations):
     :param coords: Tuple (x, y) des coordonnées du coin inférieur-gauche du carré.
     :param size: Taille (longueur d'un côté) du carré.
     :param iterations: Nombre d'itérations pour la génération de l'éponge.
-    :return: Liste de carrés restants sous forme de [(x, y, size), ...].
+    :return: Tableau (8 ** iterations, 4, 2) des sommets des carrés restants.
     """
-    if iterations == 0:
-        return [(*coords, size)]
-
-    x, y = coords
-    next_size = size / 3  # Taille des sous-carrés dans cette étape
-    squares = []
-
-    # Parcourir chaque sous-carré dans une grille 3x3
-    for dx, dy in product(range(3), repeat=2):
-        sub_x, sub_y = x + dx * next_size, y + dy * next_size
-
-        # Exclure le carré central (1,1) dans la grille 3x3
-        if dx == 1 and dy == 1:
-            continue
+    return MENGER.iterate(UNIT_SQUARE, iterations, frame=scaling(size, translation=coords))
 
-        # Répéter pour les itérations restantes
-        squares.extend(menger_sponge_2d((sub_x, sub_y), next_size, iterations - 1))
-    return squares
 
-
-def square_to_polygon(x, y, size):
+def menger_sponge_2d_chunks(coords, size, iterations, chunk_size=CHUNK_SIZE, progress=None):
     """
-    Convertit un carré en sa représentation polygonale.
+    Génère les carrés restants de l'éponge de Menger par tranches, en mémoire bornée.
 
-    :param x: Coordonnée X du coin inférieur gauche.
-    :param y: Coordonnée Y du coin inférieur gauche.
-    :param size: Taille d'un côté du carré.
-    :return: Un objet `Polygon` représentant le carré.
+    :param chunk_size: Nombre maximal de carrés par tranche.
+    :param progress: Fonction (carrés produits, total) appelée après chaque tranche.
+    :return: Générateur de tableaux (n, 4, 2), dans l'ordre de `menger_sponge_2d`.
     """
-    return Polygon([
-        (x, y),  # Coin inférieur-gauche
-        (x + size, y),  # Coin inférieur-droit
-        (x + size, y + size),  # Coin supérieur-droit
-        (x, y + size),  # Coin supérieur-gauche
-        (x, y),  # Retour au point initial pour fermer le polygone
-    ])
+    return MENGER.chunks(UNIT_SQUARE, iterations, scaling(size, translation=coords), chunk_size, progress)
 
 
 # Vérifier ou créer un dossier simpleGEO
@@ -56,38 +36,19 @@ output_folder = "simpleGEO"
 os.makedirs(output_folder, exist_ok=True)
 
 # Chemin pour le fichier généré
-geojson_file = os.path.join(output_folder, "menger_sponge.geojson")
+output_format = "geojson"  # "geojson" ou "npy" (tableau binaire (n, 4, 2) des carrés)
+output_file = os.path.join(output_folder, f"menger_sponge.{output_format}")
 
 # Paramètres initiaux : taille, itérations, coordonnées de départ
 iterations = 6  # Attention, la croissance est exponentielle !
 initial_size = 1  # Taille initiale du carré
 initial_square = (0, 0)  # Coordonnées du coin inférieur-gauche initial
+precision = 10  # Décimales conservées pour les coordonnées
 
-# Générer les carrés de l'éponge de Menger
-squares = menger_sponge_2d(initial_square, initial_size, iterations)
-
-# Préparer les données GeoJSON
-features = []
-polygon_id = 0
-for square in squares:
-    x, y, size = square
-
-    # Créer un polygone pour ce carré
-    poly = square_to_polygon(x, y, size)
-    polygon_id += 1
-    features.append({
-        'type': 'Feature',
-        'geometry': mapping(poly),  # Transformation en format compatible GeoJSON
-        'properties': {'id': polygon_id},  # Un ID unique pour chaque carré
-    })
-
-geojson_data = {
-    'type': 'FeatureCollection',
-    'features': features,
-}
+# Générer les carrés de l'éponge de Menger, par tranches
+squares = menger_sponge_2d_chunks(initial_square, initial_size, iterations, progress=progress_bar("Éponge de Menger"))
 
-# Écriture dans un fichier GeoJSON
-with open(geojson_file, 'w') as f:
-    json.dump(geojson_data, f)
+# Écriture en flux, un polygone fermé par carré
+write_chunks(output_file, squares, "Polygon", MENGER.count(iterations), precision)
 
-print(f"GeoJSON représentant l'éponge de Menger en 2D (itérations={iterations}) créé : {geojson_file}")
+print(f"Fichier représentant l'éponge de Menger en 2D (itérations={iterations}) créé : {output_file}")
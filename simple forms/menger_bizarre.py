@@ -1,7 +1,14 @@
 import os
-import json
-from shapely.geometry import Polygon, mapping
 from itertools import product
+from ifs import CHUNK_SIZE, IFS, progress_bar, scaling, write_chunks
+
+# Sous-rectangles de largeur 1/3 et de hauteur 1/5, aux lignes dy = 0 et dy = 5 de la grille
+# (le rectangle « central » dx == 1, dy == 2 n'en fait pas partie : rien n'est exclu)
+MENGER = IFS([scaling(1 / 3, 1 / 5, (dx / 3, dy / 5))
+              for dx, dy in product(range(3), [0, 5]) if (dx, dy) != (1, 2)])
+
+# Rectangle unité : coins inférieur-gauche, inférieur-droit, supérieur-droit, supérieur-gauche
+UNIT_RECTANGLE = [(0, 0), (1, 0), (1, 1), (0, 1)]
 
 
 def menger_sponge_2d(coords, width, height, iterations):
@@ -12,46 +19,20 @@ def menger_sponge_2d(coords, width, height, iterations):
     :param width: Largeur de la forme initiale.
     :param height: Hauteur de la forme initiale.
     :param iterations: Nombre d'itérations pour la génération de l'éponge.
-    :return: Liste de rectangles restants sous la forme [(x, y, width, height), ...].
+    :return: Tableau (6 ** iterations, 4, 2) des sommets des rectangles restants.
     """
-    if iterations == 0:
-        return [(*coords, width, height)]
-
-    x, y = coords
-    next_width = width / 3   # Largeur des sous-rectangles
-    next_height = height / 5  # Hauteur des sous-rectangles
-    rectangles = []
-
-    # Parcourir chaque sous-rectangle dans une grille 3x5
-    for dx, dy in product(range(3), [0, 5]):
-        sub_x, sub_y = x + dx * next_width, y + dy * next_height
+    return MENGER.iterate(UNIT_RECTANGLE, iterations, frame=scaling(width, height, coords))
 
-        # Exclure le rectangle central dans une disposition 3x5
-        if dx == 1 and dy == 2:  # Le "centre" de la grille 3x5
-            continue
 
-        # Répéter pour les itérations restantes
-        rectangles.extend(menger_sponge_2d((sub_x, sub_y), next_width, next_height, iterations - 1))
-    return rectangles
-
-
-def rectangle_to_polygon(x, y, width, height):
+def menger_sponge_2d_chunks(coords, width, height, iterations, chunk_size=CHUNK_SIZE, progress=None):
     """
-    Convertit un rectangle en sa représentation polygonale.
+    Génère les rectangles restants par tranches, en mémoire bornée.
 
-    :param x: Coordonnée X du coin inférieur-gauche.
-    :param y: Coordonnée Y du coin inférieur-gauche.
-    :param width: Largeur du rectangle.
-    :param height: Hauteur du rectangle.
-    :return: Un objet `Polygon` représentant le rectangle.
+    :param chunk_size: Nombre maximal de rectangles par tranche.
+    :param progress: Fonction (rectangles produits, total) appelée après chaque tranche.
+    :return: Générateur de tableaux (n, 4, 2), dans l'ordre de `menger_sponge_2d`.
     """
-    return Polygon([
-        (x, y),  # Coin inférieur-gauche
-        (x + width, y),  # Coin inférieur-droit
-        (x + width, y + height),  # Coin supérieur-droit
-        (x, y + height),  # Coin supérieur-gauche
-        (x, y),  # Retour au point initial pour fermer le polygone
-    ])
+    return MENGER.chunks(UNIT_RECTANGLE, iterations, scaling(width, height, coords), chunk_size, progress)
 
 
 # Vérifier ou créer un dossier simpleGEO
@@ -59,36 +40,21 @@ output_folder = "simpleGEO"
 os.makedirs(output_folder, exist_ok=True)
 
 # Chemin pour le fichier généré
-geojson_file = os.path.join(output_folder, "menger_sponge_rectangular.geojson")
+output_format = "geojson"  # "geojson" ou "npy" (tableau binaire (n, 4, 2) des rectangles)
+output_file = os.path.join(output_folder, f"menger_sponge_rectangular.{output_format}")
 
 # Paramètres initiaux : taille, itérations, coordonnées de départ
 iterations = 1  # Attention, la croissance est exponentielle !
 initial_width = 1  # Largeur initiale
 initial_height = 1  # Hauteur initiale
 initial_coords = (0, 0)  # Coordonnées du coin inférieur-gauche initial
+precision = 10  # Décimales conservées pour les coordonnées
 
-# Générer les rectangles de l'éponge de Menger adaptée
-rectangles = menger_sponge_2d(initial_coords, initial_width, initial_height, iterations)
-
-# Construire les entités GeoJSON
-features = []
-for i, rectangle in enumerate(rectangles, start=1):
-    x, y, width, height = rectangle
-    poly = rectangle_to_polygon(x, y, width, height)
-    features.append({
-        "type": "Feature",
-        "geometry": mapping(poly),
-        "properties": {"id": i}
-    })
-
-# Structure GeoJSON
-geojson_data = {
-    "type": "FeatureCollection",
-    "features": features
-}
+# Générer les rectangles de l'éponge de Menger adaptée, par tranches
+rectangles = menger_sponge_2d_chunks(initial_coords, initial_width, initial_height, iterations,
+                                     progress=progress_bar("Éponge de Menger 3x5"))
 
-# Écriture dans un fichier GeoJSON
-with open(geojson_file, "w", encoding="utf-8") as f:
-    json.dump(geojson_data, f, ensure_ascii=False, indent=4)
+# Écriture en flux, un polygone fermé par rectangle
+write_chunks(output_file, rectangles, "Polygon", MENGER.count(iterations), precision)
 
-print(f"GeoJSON représentant l'éponge de Menger en 2D avec division 3x5 (itérations={iterations}) créé : {geojson_file}")
+print(f"Fichier représentant l'éponge de Menger en 2D avec division 3x5 (itérations={iterations}) créé : {output_file}")
@@ -1,101 +1,33 @@
-import shapely.geometry as geometry
-from shapely.ops import unary_union
 import geopandas as gpd
-import numpy as np
-from shapely import is_valid, make_valid  # correction ici
-import re
-from shapely.wkt import loads
-from shapely import simplify
 import matplotlib.pyplot as plt
+from ifs import IFS, scaling
+from postprocess import geometries, postprocess
+
+# Les 9 sous-carrés dans l'ordre de la courbe de Peano : lignes parcourues en serpentin
+PEANO = IFS([scaling(1 / 3, translation=(x / 3, y / 3))
+             for x, y in [(0, 0), (1, 0), (2, 0), (2, 1), (1, 1), (0, 1), (0, 2), (1, 2), (2, 2)]])
+
+# Segment de base de la courbe de Peano dans le carré unité
+BASE_SEGMENT = [(0, 0), (0, 1), (1/2, 1), (1/2, 0), (1, 0), (1, 1)]
+UNIT_SQUARE = [(0, 0), (1, 0), (1, 1), (0, 1)]
+
 
 def peano_curve(iterations, size=1):
     """
     Génère une approximation de la courbe de Peano sous forme de polygones.
 
+    Chacun des 9 ** iterations sous-carrés reçoit le segment de base ; tous les polygones
+    sont construits d'un bloc (`IFS.iterate`, puis `shapely.polygons`).
+
     Args:
         iterations: Le nombre d'itérations de la courbe. Plus le nombre est élevé, plus l'approximation est fine.
         size: La taille du carré dans lequel la courbe est dessinée.
 
     Returns:
-        Une liste d'objets Polygon représentant la courbe de Peano.
+        Un tableau NumPy d'objets Polygon représentant la courbe de Peano.
     """
-
-    def create_base_segment(offset_x=0, offset_y=0, scale=1):
-        """Crée un segment de base de la courbe de Peano, transformé par un offset et une échelle."""
-        points = [
-            (0, 0), (0, 1), (1/2, 1), (1/2, 0), (1, 0), (1, 1)
-        ]
-
-        # Appliquer la mise à l'échelle et le décalage
-        scaled_points = [(x * scale + offset_x, y * scale + offset_y) for x, y in points]
-        return geometry.Polygon(scaled_points)
-
-    polygons = [geometry.Polygon([(0,0), (size,0), (size, size), (0, size)])] # Carré initial
-
-    def subdivide(polygons, iteration):
-
-        if iteration == 0:
-            return polygons
-
-        new_polygons = []
-
-        for polygon in polygons:
-            minx, miny, maxx, maxy = polygon.bounds
-            width = maxx - minx
-            height = maxy - miny
-
-            sub_size_x = width / 3
-            sub_size_y = height / 3
-
-            # Créer 9 sous-carrés et les ajouter à la liste
-            # L'ordre est celui de la courbe de Peano
-
-            # Première ligne
-            new_polygons.append(create_base_segment(minx, miny, sub_size_x))
-            new_polygons.append(create_base_segment(minx + sub_size_x, miny, sub_size_x))
-            new_polygons.append(create_base_segment(minx + 2*sub_size_x, miny, sub_size_x))
-            # Deuxième ligne
-            new_polygons.append(create_base_segment(minx + 2*sub_size_x, miny + sub_size_y, sub_size_x))
-            new_polygons.append(create_base_segment(minx + sub_size_x, miny + sub_size_y, sub_size_x))
-            new_polygons.append(create_base_segment(minx, miny + sub_size_y, sub_size_x))
-
-            # Troisième ligne
-            new_polygons.append(create_base_segment(minx, miny + 2*sub_size_y, sub_size_x))
-            new_polygons.append(create_base_segment(minx + sub_size_x, miny + 2*sub_size_y, sub_size_x))
-            new_polygons.append(create_base_segment(minx + 2*sub_size_x, miny + 2*sub_size_y, sub_size_x))
-
-        return subdivide(new_polygons, iteration - 1)
-
-    return subdivide(polygons, iterations)
-
-
-def make_geometries_valid(geometries):
-    valid_geometries = []
-    for geom in geometries:
-        if not is_valid(geom):  # Correction ici
-            valid_geom = geom.buffer(0)  # Une petite mise en mémoire tampon résout souvent les problèmes
-            if not is_valid(valid_geom):  # Correction ici
-                print("Impossible de corriger complètement une géométrie.  Vérifier manuellement.")
-            valid_geometries.append(valid_geom)
-        else:
-            valid_geometries.append(geom)
-    return valid_geometries
-
-def simplify_geometries(geometries, tolerance=0.00001):
-    simplified_geometries = [simplify(geom, tolerance, preserve_topology=False) for geom in geometries]
-    return simplified_geometries
-
-def round_coordinates(geometries, precision=6):
-    rounded_geometries = []
-    for geom in geometries:
-        # Convertir la géométrie en WKT (Well-Known Text)
-        wkt = geom.wkt
-        # Arrondir les coordonnées dans la chaîne WKT
-        rounded_wkt = re.sub(r"(\d+\.\d+)", lambda m: f"{float(m.group(0)):.{precision}f}", wkt)
-        # Reconstruire la géométrie à partir du WKT arrondi
-        rounded_geom = loads(rounded_wkt)
-        rounded_geometries.append(rounded_geom)
-    return rounded_geometries
+    primitive = BASE_SEGMENT if iterations > 0 else UNIT_SQUARE  # Carré initial
+    return geometries(PEANO.iterate(primitive, iterations, frame=scaling(size)), "Polygon")
 
 
 def create_peano_shapefile(iterations, output_file, size=1):
@@ -111,12 +43,8 @@ def create_peano_shapefile(iterations, output_file, size=1):
     # Générer la courbe de Peano
     polygons = peano_curve(iterations, size)
 
-    # Appliquer les corrections de géométrie
-    polygons = round_coordinates(polygons, precision=6)
-    polygons = simplify_geometries(polygons, tolerance=0.00001)
-    polygons = make_geometries_valid(polygons)
-
-
+    # Appliquer les corrections de géométrie (arrondi, simplification, buffer(0) des invalides)
+    polygons = postprocess(polygons, precision=6, tolerance=0.00001, method="buffer")
 
     # Créer un GeoDataFrame
     gdf = gpd.GeoDataFrame(geometry=polygons)
@@ -141,4 +69,3 @@ if __name__ == "__main__":
     plt.title("Courbe de Peano")
     plt.axis('off')
     plt.show()
-
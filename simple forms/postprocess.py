@@ -0,0 +1,204 @@
+"""
+Post-traitement vectorisé de géométries (shapely 2) : arrondi, simplification, correction.
+
+Chaque étape est une fonction universelle de shapely 2 appliquée à tout un tableau de
+géométries en un seul appel (boucle en C dans GEOS), au lieu d'une boucle Python par
+géométrie :
+
+- `round_coordinates` : `shapely.set_precision` en mode "pointwise" (arrondi de chaque
+  coordonnée sur la grille 10 ** -precision, sans aller-retour par le WKT) ;
+- `simplify_geometries` : `shapely.simplify` ;
+- `make_geometries_valid` : `shapely.is_valid`, puis `buffer(0)` (comportement
+  historique) ou `shapely.make_valid` sur les seules géométries invalides.
+
+`postprocess` enchaîne les trois étapes ; `geometries` convertit la sortie des
+générateurs (tableau (n, k, 2) de primitives, voir `ifs.py`) en tableau de géométries.
+Les anciennes versions, géométrie par géométrie, sont conservées (`*_loop`) pour
+`compare_timings`, qui mesure les deux chemins sur les mêmes données.
+"""
+import os
+import re
+import sys
+import time
+
+import numpy as np
+import shapely
+from shapely.wkt import loads
+
+
+def geometries(primitives, geometry_type="Polygon"):
+    """
+    Tableau de géométries shapely à partir d'un tableau (n, k, 2) de primitives.
+
+    :param geometry_type: "Polygon" (anneau fermé automatiquement), "LineString" ou "MultiPoint".
+    :return: Tableau NumPy (n,) d'objets géométriques.
+    """
+    primitives = np.asarray(primitives, dtype=np.float64)
+    if geometry_type == "Polygon":
+        return shapely.polygons(primitives)
+    if geometry_type == "LineString":
+        return shapely.linestrings(primitives)
+    if geometry_type == "MultiPoint":
+        return shapely.multipoints(primitives)
+    raise ValueError(f"Type de géométrie non pris en charge : {geometry_type}")
+
+
+def round_coordinates(geometries, precision=6):
+    """
+    Arrondit les coordonnées à `precision` décimales.
+
+    GEOS conserve la grille de précision avec les géométries : les étapes suivantes
+    (simplification, `buffer(0)`) placent aussi leurs nouveaux sommets sur la grille, là où
+    l'ancien chemin WKT pouvait produire des sommets hors grille (ex. 0.0061735000405022).
+    Les valeurs à égale distance de deux pas de grille sont arrondies en s'éloignant de
+    zéro (0.0078125 -> 0.007813), et non au pair comme le formatage Python (0.007812).
+
+    :param geometries: Séquence ou tableau de géométries.
+    :return: Tableau de géométries.
+    """
+    return shapely.set_precision(np.asarray(geometries), 10.0 ** -precision, mode="pointwise")
+
+
+def simplify_geometries(geometries, tolerance=0.00001, preserve_topology=False):
+    """Simplifie les géométries (Douglas–Peucker), en un appel sur tout le tableau."""
+    return shapely.simplify(np.asarray(geometries), tolerance, preserve_topology=preserve_topology)
+
+
+def make_geometries_valid(geometries, method="buffer"):
+    """
+    Corrige les géométries invalides, et elles seules.
+
+    :param method: "buffer" (`buffer(0)`, qui peut perdre les parties d'un polygone
+                   auto-intersecté) ou "make_valid" (conserve toutes les parties, quitte
+                   à renvoyer des MultiPolygon ou des collections).
+    :return: Tableau de géométries.
+    """
+    geometries = np.array(geometries, dtype=object)
+    invalid = ~shapely.is_valid(geometries)
+    if invalid.any():
+        if method == "buffer":
+            geometries[invalid] = shapely.buffer(geometries[invalid], 0)
+        elif method == "make_valid":
+            geometries[invalid] = shapely.make_valid(geometries[invalid])
+        else:
+            raise ValueError(f"Méthode de correction inconnue : {method}")
+        remaining = int(np.count_nonzero(~shapely.is_valid(geometries[invalid])))
+        if remaining:
+            print(f"Impossible de corriger complètement {remaining} géométrie(s). Vérifier manuellement.")
+    return geometries
+
+
+def postprocess(geometries, precision=6, tolerance=0.00001, method="buffer"):
+    """
+    Étape de post-traitement complète : arrondi, simplification puis correction.
+
+    :param precision: Décimales conservées (None pour ne pas arrondir).
+    :param tolerance: Tolérance de simplification (None pour ne pas simplifier).
+    :param method: Correction des géométries invalides, voir `make_geometries_valid` (None pour ne pas corriger).
+    :return: Tableau de géométries.
+    """
+    geometries = np.asarray(geometries)
+    if precision is not None:
+        geometries = round_coordinates(geometries, precision)
+    if tolerance is not None:
+        geometries = simplify_geometries(geometries, tolerance)
+    if method is not None:
+        geometries = make_geometries_valid(geometries, method)
+    return geometries
+
+
+def round_coordinates_loop(geometries, precision=6):
+    """Ancienne version : aller-retour WKT et expression régulière par géométrie."""
+    rounded_geometries = []
+    for geom in geometries:
+        rounded_wkt = re.sub(r"(\d+\.\d+)", lambda m: f"{float(m.group(0)):.{precision}f}", geom.wkt)
+        rounded_geometries.append(loads(rounded_wkt))
+    return rounded_geometries
+
+
+def simplify_geometries_loop(geometries, tolerance=0.00001):
+    """Ancienne version : un appel à `simplify` par géométrie."""
+    return [shapely.simplify(geom, tolerance, preserve_topology=False) for geom in geometries]
+
+
+def make_geometries_valid_loop(geometries):
+    """Ancienne version : `is_valid` et `buffer(0)` par géométrie."""
+    valid_geometries = []
+    for geom in geometries:
+        if not shapely.is_valid(geom):
+            valid_geom = geom.buffer(0)
+            if not shapely.is_valid(valid_geom):
+                print("Impossible de corriger complètement une géométrie.  Vérifier manuellement.")
+            valid_geometries.append(valid_geom)
+        else:
+            valid_geometries.append(geom)
+    return valid_geometries
+
+
+def compare_timings(geometries, precision=6, tolerance=0.00001):
+    """
+    Mesure chaque étape par l'ancien chemin (boucles Python) et par le nouveau (tableaux).
+
+    :return: Dictionnaire étape -> (durée boucle, durée vectorisée), en secondes, avec
+             l'étape "total" ; les deux résultats sont aussi comparés (`equal`, nombre de
+             géométries égales à un pas de grille près : les arrondis des valeurs à égale
+             distance de deux pas diffèrent, voir `round_coordinates`).
+    """
+    old_steps = [
+        ("round_coordinates", lambda g: round_coordinates_loop(g, precision)),
+        ("simplify_geometries", lambda g: simplify_geometries_loop(g, tolerance)),
+        ("make_geometries_valid", make_geometries_valid_loop),
+    ]
+    new_steps = [
+        ("round_coordinates", lambda g: round_coordinates(g, precision)),
+        ("simplify_geometries", lambda g: simplify_geometries(g, tolerance)),
+        ("make_geometries_valid", make_geometries_valid),
+    ]
+    timings = {}
+    old, new = list(geometries), np.asarray(geometries)
+    for (name, old_step), (_, new_step) in zip(old_steps, new_steps):
+        start = time.perf_counter()
+        old = old_step(old)
+        middle = time.perf_counter()
+        new = new_step(new)
+        timings[name] = (middle - start, time.perf_counter() - middle)
+    timings["total"] = tuple(sum(durations) for durations in zip(*timings.values()))
+    timings["equal"] = int(np.count_nonzero(shapely.equals_exact(np.array(old, dtype=object), new,
+                                                                 tolerance=1.5 * 10.0 ** -precision)))
+    return timings
+
+
+def print_timings(timings, count):
+    """Affiche le tableau de `compare_timings`."""
+    print(f"{'étape':<24}{'boucle':>10}{'tableaux':>10}{'gain':>8}")
+    for name, (loop, vectorized) in ((k, v) for k, v in timings.items() if k != "equal"):
+        print(f"{name:<24}{loop:>9.3f}s{vectorized:>9.3f}s{loop / max(vectorized, 1e-9):>7.1f}x")
+    print(f"{timings['equal']} géométries égales (à un pas de grille près) sur {count}")
+
+
+if __name__ == "__main__":
+    import repo_root  # noqa: F401 (racine du dépôt dans sys.path, pour `tools`)
+    from tools.geojson_writer import feature, write_features
+
+    # Sortie binaire d'un générateur (`output_format = "npy"`), ex. sierpinski.py ou menger.py
+    input_file = os.path.join("simpleGEO", "sierpinski.npy")
+    geometry_type = "Polygon"  # "Polygon", "LineString" ou "MultiPoint"
+    output_file = os.path.join("simpleGEO", "postprocessed.geojson")
+
+    precision = 6  # Décimales conservées
+    tolerance = 0.00001  # Tolérance de simplification
+    method = "buffer"  # "buffer" ou "make_valid"
+    compare = True  # Mesure aussi l'ancien chemin, géométrie par géométrie
+
+    if not os.path.exists(input_file):
+        sys.exit(f"{input_file} introuvable : lancer d'abord le générateur avec output_format = \"npy\".")
+
+    geoms = geometries(np.load(input_file, mmap_mode="r"), geometry_type)
+    if compare:
+        print_timings(compare_timings(geoms, precision, tolerance), len(geoms))
+
+    start = time.perf_counter()
+    geoms = postprocess(geoms, precision, tolerance, method)
+    print(f"{len(geoms)} géométries post-traitées en {time.perf_counter() - start:.3f} s")
+    write_features(output_file, (feature(geom, {"id": i}) for i, geom in enumerate(geoms, start=1)), precision)
+    print(f"GeoJSON post-traité créé : {output_file}")
@@ -0,0 +1,12 @@
+"""
+Ajoute la racine du dépôt à `sys.path`, pour importer `tools` depuis les scripts de ce dossier.
+
+Les scripts se lancent depuis `simple forms/` (python cube.py) : il suffit d'importer ce
+module avant `tools` (import repo_root).
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
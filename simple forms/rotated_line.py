@@ -1,7 +1,8 @@
 import os
-import json
 from shapely.geometry import mapping, LineString
 from math import sqrt
+import repo_root  # noqa: F401 (racine du dépôt dans sys.path, pour `tools`)
+from tools.geojson_writer import write_features
 
 # Vérifier ou créer un dossier simpleGEO
 output_folder = "simpleGEO"
@@ -15,20 +16,14 @@ line = LineString([
     (0, 0), (sqrt(2)/2, sqrt(2)/2)  # Points qui définissent la ligne
 ])
 
-# Définir la structure GeoJSON
-geojson_data = {
-    "type": "FeatureCollection",
-    "features": [
-        {
-            "type": "Feature",
-            "geometry": mapping(line),  # Transformation en format compatible GeoJSON
-            "properties": {"id": 1}  # Ajouter un attribut ID
-        }
-    ]
+# Définir l'entité GeoJSON
+feature = {
+    "type": "Feature",
+    "geometry": mapping(line),  # Transformation en format compatible GeoJSON
+    "properties": {"id": 1}  # Ajouter un attribut ID
 }
 
-# Écriture dans un fichier GeoJSON
-with open(geojson_file, 'w') as f:
-    json.dump(geojson_data, f)
+# Écriture dans un fichier GeoJSON compact
+write_features(geojson_file, [feature])
 
 print(f"GeoJSON de la ligne créé dans le dossier : {geojson_file}")
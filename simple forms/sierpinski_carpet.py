@@ -1,7 +1,7 @@
 import os
-import json
-from shapely.geometry import mapping, Polygon
-from math import sqrt
+from ifs import CARPET, CHUNK_SIZE, progress_bar, scaling, write_chunks
+
+UNIT_SQUARE = [(0, 0), (1, 0), (1, 1), (0, 1)]
 
 
 def sierpinski_carpet(x, y, size, iterations):
@@ -12,20 +12,20 @@ def sierpinski_carpet(x, y, size, iterations):
     :param y: Coordonnée y du coin inférieur gauche du carré de base.
     :param size: Taille du côté du carré de base.
     :param iterations: Nombre d'itérations pour générer le tapis de Sierpiński.
-    :return: Liste des carrés restants sous forme de listes de sommets [[(x1, y1), (x2, y2), (x3, y3), (x4, y4)], ...].
+    :return: Tableau (8 ** iterations, 4, 2) des carrés restants [(x1, y1), (x2, y2), (x3, y3), (x4, y4)].
     """
-    if iterations == 0:
-        return [[(x, y), (x + size, y), (x + size, y + size), (x, y + size)]]
+    return CARPET.iterate(UNIT_SQUARE, iterations, frame=scaling(size, translation=(x, y)))
 
-    new_size = size / 3
-    carpets = []
 
-    for dx in range(3):
-        for dy in range(3):
-            if dx != 1 or dy != 1:  # Ne pas remplir le carré central
-                carpets.extend(sierpinski_carpet(x + dx * new_size, y + dy * new_size, new_size, iterations - 1))
+def sierpinski_carpet_chunks(x, y, size, iterations, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Génère les carrés du tapis de Sierpiński par tranches, en mémoire bornée.
 
-    return carpets
+    :param chunk_size: Nombre maximal de carrés par tranche.
+    :param progress: Fonction (carrés produits, total) appelée après chaque tranche.
+    :return: Générateur de tableaux (n, 4, 2), dans l'ordre de `sierpinski_carpet`.
+    """
+    return CARPET.chunks(UNIT_SQUARE, iterations, scaling(size, translation=(x, y)), chunk_size, progress)
 
 
 # Vérifier ou créer un dossier simpleGEO
@@ -33,19 +33,18 @@ output_folder = "simpleGEO"
 os.makedirs(output_folder, exist_ok=True)
 
 # Chemin complet où le fichier de Sierpiński sera sauvegardé
-geojson_file = os.path.join(output_folder, "sierpinski_carpet.geojson")
+output_format = "geojson"  # "geojson" ou "npy" (tableau binaire (n, 4, 2) des carrés)
+output_file = os.path.join(output_folder, f"sierpinski_carpet.{output_format}")
 
 # Générer le tapis de Sierpiński
 iterations = 4  # Nombre d'itérations
 initial_x, initial_y, initial_size = 0, 0, 1  # Carré de base
+precision = 10  # Décimales conservées pour les coordonnées
 
-carpets = sierpinski_carpet(initial_x, initial_y, initial_size, iterations)  # Liste des carrés restants
-
-# Écriture dans un fichier GeoJSON
-features = [{"type": "Feature", "geometry": mapping(Polygon(carpet)), "properties": {"id": i}} for i, carpet in enumerate(carpets, start=1)]
-geojson_obj = {"type": "FeatureCollection", "features": features}  # PAS de json.dumps() ici !
+carpets = sierpinski_carpet_chunks(initial_x, initial_y, initial_size, iterations,
+                                   progress=progress_bar("Tapis de Sierpiński"))
 
-with open(geojson_file, 'w', encoding="utf-8") as f:
-    json.dump(geojson_obj, f, indent=2)
+# Écriture en flux, tranche par tranche
+write_chunks(output_file, carpets, "Polygon", CARPET.count(iterations), precision)
 
-print(f"GeoJSON représentant le tapis de Sierpiński (itérations={iterations}) créé : {geojson_file}")
\ No newline at end of file
+print(f"Fichier représentant le tapis de Sierpiński (itérations={iterations}) créé : {output_file}")
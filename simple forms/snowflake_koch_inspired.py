@@ -1,7 +1,8 @@
 import os
-import json
 from shapely.geometry import mapping, Polygon, LineString
 from math import sqrt
+import repo_root  # noqa: F401 (racine du dépôt dans sys.path, pour `tools`)
+from tools.geojson_writer import write_features
 
 
 def koch_snowflake(start, end, iterations):
@@ -64,6 +65,7 @@ geojson_file = os.path.join(output_folder, "koch_snowflake2.geojson")
 # Paramètres initiaux pour le flocon de Koch
 iterations = 5  # Nombre d'itérations
 triangle = [(0, 0), (1, 0), (0.5, sqrt(3) / 2)]  # Triangle équilatéral de base
+precision = 10  # Décimales conservées pour les coordonnées
 
 # Construction du flocon en connectant les côtés du triangle de départ
 points = (
@@ -73,20 +75,10 @@ points = (
 )
 points = close_snowflake(points)  # Ferme le flocon pour former un polygone complet
 
-# Écriture dans un fichier GeoJSON
+# Écriture dans un fichier GeoJSON compact. Le flocon est un seul polygone : pas de tranches
+# d'entités (voir `ifs.write_chunks`) ; le rédacteur écrit déjà ses sommets par blocs, et
+# koch2d.py (L-système vectorisé) sert pour les grandes profondeurs
 polygon = Polygon(points)
-geojson_obj = {
-    "type": "FeatureCollection",
-    "features": [
-        {
-            "type": "Feature",
-            "geometry": mapping(polygon),
-            "properties": {"id": 1}
-        }
-    ]
-}
-
-with open(geojson_file, 'w') as f:
-    json.dump(geojson_obj, f)
+write_features(geojson_file, [{"type": "Feature", "geometry": mapping(polygon), "properties": {"id": 1}}], precision)
 
 print(f"GeoJSON représentant le flocon de Koch (itérations={iterations}) créé : {geojson_file}")
@@ -1,6 +1,7 @@
 import os
-import json
 from shapely.geometry import mapping, LineString
+import repo_root  # noqa: F401 (racine du dépôt dans sys.path, pour `tools`)
+from tools.geojson_writer import write_features
 
 # Vérifier ou créer le dossier simpleGEO
 output_folder = "simpleGEO"
@@ -18,11 +19,8 @@ borders = [
     LineString([(10, 0), (0, 0)])  # Bordure du bas
 ]
 
-# Écriture des bordures dans un fichier GeoJSON
-features = [json.dumps({"type": "Feature", "geometry": mapping(border), "properties": {"id": i}}) for i, border in enumerate(borders, start=1)]
-geojson_obj = {"type": "FeatureCollection", "features": features}
-
-with open(geojson_file, 'w') as f:
-    json.dump(geojson_obj, f)
+# Écriture des bordures dans un fichier GeoJSON compact
+features = [{"type": "Feature", "geometry": mapping(border), "properties": {"id": i}} for i, border in enumerate(borders, start=1)]
+write_features(geojson_file, features)
 
 print(f"GeoJSON des bordures du carré créé dans : {geojson_file}")
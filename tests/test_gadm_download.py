@@ -0,0 +1,157 @@
+"""
+Tests de `tools.gadm_download` contre un serveur HTTP local (`http.server`).
+
+Le serveur sert des fichiers en mémoire avec `ETag`, répond 304 aux requêtes
+conditionnelles, 206 aux requêtes `Range` dont `If-Range` correspond, et peut ignorer
+`Range` (réponse 200 complète) ou compresser le corps en gzip malgré la demande du client.
+
+Depuis la racine du dépôt : python -m pytest tests
+"""
+import gzip
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from tools.gadm_download import download, make_session
+
+
+class StandInServer:
+    """Serveur GADM de substitution : fichiers `code -> (contenu, etag)` servis sur localhost."""
+
+    def __init__(self):
+        self.files = {}
+        self.requests = []
+        self.ignore_range = False
+        self.force_gzip = False
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server.requests.append(dict(self.headers))
+                code = self.path.strip("/").split(".")[0]
+                if code not in server.files:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                content, etag = server.files[code]
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+
+                gzipped = server.force_gzip or "gzip" in self.headers.get("Accept-Encoding", "")
+                body = gzip.compress(content, mtime=0) if gzipped else content
+                start = 0
+                range_header = self.headers.get("Range")
+                if range_header and not server.ignore_range and self.headers.get("If-Range") == etag:
+                    start = int(range_header.split("=")[1].split("-")[0])
+                self.send_response(206 if start else 200)
+                self.send_header("ETag", etag)
+                if gzipped:
+                    self.send_header("Content-Encoding", "gzip")
+                if start:
+                    self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+                self.send_header("Content-Length", str(len(body) - start))
+                self.end_headers()
+                self.wfile.write(body[start:])
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url_template = f"http://127.0.0.1:{self._server.server_port}/{{code}}.json"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class DownloadTest(unittest.TestCase):
+    content = json.dumps({"type": "FeatureCollection", "features": ["x" * 50_000]}).encode()
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "FRA.geojson")
+        self.server = StandInServer().__enter__()
+        self.server.files["FRA"] = (self.content, '"v1"')
+        self.session = make_session(2)
+
+    def tearDown(self):
+        self.session.close()
+        self.server.__exit__()
+        self.directory.cleanup()
+
+    def download(self):
+        return download(self.session, "FRA", self.path, self.server.url_template, timeout=10)
+
+    def read(self):
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def seed_part(self, size, etag):
+        """Fichier partiel laissé par un téléchargement interrompu."""
+        with open(f"{self.path}.part", "wb") as f:
+            f.write(self.content[:size])
+        with open(f"{self.path}.part.meta.json", "w", encoding="utf-8") as f:
+            json.dump({"etag": etag}, f)
+
+    def test_download_uncompressed(self):
+        self.assertEqual(self.download(), "téléchargé")
+        self.assertEqual(self.read(), self.content)
+        self.assertEqual(self.server.requests[-1]["Accept-Encoding"], "identity")
+        self.assertFalse(os.path.exists(f"{self.path}.part"))
+
+    def test_resume(self):
+        self.seed_part(20_000, '"v1"')
+        self.assertEqual(self.download(), "téléchargé")
+        self.assertEqual(self.server.requests[-1]["Range"], "bytes=20000-")
+        self.assertEqual(self.read(), self.content)
+
+    def test_range_answered_with_200(self):
+        self.server.ignore_range = True
+        self.seed_part(20_000, '"v1"')
+        self.assertEqual(self.download(), "téléchargé")
+        self.assertEqual(self.read(), self.content)
+
+    def test_not_modified(self):
+        self.download()
+        self.assertEqual(self.download(), "inchangé")
+        self.assertEqual(self.server.requests[-1]["If-None-Match"], '"v1"')
+        self.assertEqual(self.read(), self.content)
+
+    def test_changed_etag(self):
+        self.download()
+        new_content = self.content.replace(b"x", b"y")
+        self.server.files["FRA"] = (new_content, '"v2"')
+        self.assertEqual(self.download(), "téléchargé")
+        self.assertEqual(self.read(), new_content)
+
+    def test_partial_file_of_old_version(self):
+        # If-Range ne correspond plus : le serveur renvoie le nouveau fichier en entier
+        self.seed_part(20_000, '"v0"')
+        self.assertEqual(self.download(), "téléchargé")
+        self.assertEqual(self.read(), self.content)
+
+    def test_gzip_despite_identity(self):
+        self.server.force_gzip = True
+        self.assertEqual(self.download(), "téléchargé")
+        self.assertEqual(self.read(), self.content)
+        with open(f"{self.path}.meta.json", encoding="utf-8") as f:
+            self.assertNotIn("encoding", json.load(f))
+
+    def test_missing(self):
+        self.assertEqual(download(self.session, "XXX", self.path, self.server.url_template), "absent")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+"""
+Tests du comptage exact des boîtes des IFS sur grille (`simple forms/ifs_boxcounting.py`).
+
+Les comptages analytiques (`box_counts`) sont comparés, à petite profondeur, aux boîtes
+effectivement occupées par les primitives générées (`materialized_box_counts`), y compris
+pour Sierpiński, compté dans le repère oblique du triangle (cellules en parallélogrammes).
+
+Depuis la racine du dépôt : python -m pytest tests
+"""
+import os
+import sys
+import unittest
+from math import log
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "simple forms"))
+
+from ifs_boxcounting import FRACTALS, box_counts, dimension, lattice, materialized_box_counts  # noqa: E402
+
+DEPTH = 5
+
+
+class BoxCountsTest(unittest.TestCase):
+    def test_analytic_counts_match_materialized_counts(self):
+        for name, (ifs, primitive, frame) in FRACTALS.items():
+            level = ifs.iterate(primitive, DEPTH)
+            for closed in (True, False):
+                with self.subTest(name=name, closed=closed):
+                    self.assertEqual(box_counts(ifs, DEPTH, frame, closed),
+                                     materialized_box_counts(level, ifs, DEPTH, frame, closed))
+
+    def test_known_counts(self):
+        ifs, _, frame = FRACTALS["cantor"]
+        self.assertEqual(box_counts(ifs, DEPTH, frame), [3, 5, 10, 20, 40, 80])
+        ifs, _, frame = FRACTALS["sierpinski"]
+        self.assertEqual(box_counts(ifs, DEPTH, frame, closed=False), [3 ** k for k in range(DEPTH + 1)])
+        self.assertEqual(box_counts(ifs, DEPTH, frame), [8, 13, 26, 64, 178, 520])
+
+    def test_sierpinski_needs_its_triangle_frame(self):
+        ifs, _, frame = FRACTALS["sierpinski"]
+        self.assertEqual(lattice(ifs, frame)[0], 2)
+        with self.assertRaises(ValueError):
+            lattice(ifs)  # Pas sur grille dans le repère des axes (boîtes carrées)
+
+    def test_dimension(self):
+        for name, expected in [("cantor", log(2) / log(3)), ("sierpinski", log(3) / log(2)),
+                               ("sierpinski_carpet", log(8) / log(3))]:
+            with self.subTest(name=name):
+                ifs, _, frame = FRACTALS[name]
+                counts = box_counts(ifs, 20, frame)
+                self.assertAlmostEqual(dimension(counts, lattice(ifs, frame)[0], first=10), expected, places=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
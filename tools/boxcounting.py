@@ -0,0 +1,333 @@
+"""
+Box-counting en mémoire (NumPy) pour les fichiers de contours GeoJSON.
+
+Remplace l'appel `java -jar fractalyse-3.0-0.9.1.jar --boxcounting` : on lit
+le même fichier de `coastlines/contour`, on utilise les mêmes tailles de boîtes
+min/max et on renvoie directement les comptages par échelle ainsi que la
+dimension ajustée, sans fichier `.txt` intermédiaire.
+
+Utilisation en ligne de commande (depuis la racine du dépôt) :
+    python -m tools.boxcounting coastlines/contour/BEL_contour.geojson 5E-3 4E-2
+"""
+import argparse
+import json
+import os
+from dataclasses import dataclass, asdict
+
+import numpy as np
+
+from tools.geojson_stream import read_coordinates
+
+
+@dataclass(frozen=True)
+class BoxCountingResult:
+    """Résultat d'un box-counting : tailles de boîtes, comptages et dimension."""
+    sizes: tuple
+    counts: tuple
+    dimension: float
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def load_coordinates(filepath):
+    """
+    Lit toutes les coordonnées d'un fichier GeoJSON, en flux (voir `tools.geojson_stream`).
+
+    :param filepath: Chemin du fichier GeoJSON (FeatureCollection, Feature ou géométrie).
+    :return: Tuple (coords, offsets) où `coords` est un tableau (n, 2) de float64 et
+             `offsets` les indices de début de chaque partie (LineString, anneau...),
+             terminés par n.
+    """
+    return read_coordinates(filepath)
+
+
+def box_sizes(min_size, max_size, factor=2):
+    """
+    Échelle géométrique des tailles de boîtes : min_size * factor**k <= max_size.
+
+    :return: Tableau croissant des tailles de boîtes.
+    """
+    if min_size <= 0 or max_size < min_size:
+        raise ValueError("Il faut 0 < min_size <= max_size.")
+    # La tolérance évite de perdre max_size à cause des arrondis (ex. 5E-3 * 2**3)
+    n_scales = int(np.floor(np.log(max_size / min_size) / np.log(factor) + 1e-9)) + 1
+    return min_size * factor ** np.arange(n_scales, dtype=np.float64)
+
+
+def count_boxes(coords, size, origin=None):
+    """
+    Compte les boîtes de côté `size` contenant au moins un sommet.
+
+    :param coords: Tableau (n, 2) des coordonnées.
+    :param size: Taille de boîte.
+    :param origin: Origine de la grille, par défaut le coin inférieur gauche de l'emprise.
+    :return: Nombre de boîtes occupées.
+    """
+    if len(coords) == 0:
+        return 0
+    if origin is None:
+        origin = coords.min(axis=0)
+    cells = np.floor((coords - origin) / size).astype(np.int64)
+    keys = cells[:, 0] * (cells[:, 1].max() + 1) + cells[:, 1]
+    return len(np.unique(keys))
+
+
+def morton_encode(ix, iy):
+    """
+    Entrelace les bits de deux entiers (< 2**32) en clés de Morton (ordre Z).
+
+    :param ix: Tableau d'indices de colonne.
+    :param iy: Tableau d'indices de ligne.
+    :return: Tableau de clés uint64, le bit de x étant le bit de poids faible.
+    """
+    return _spread_bits(ix) | (_spread_bits(iy) << np.uint64(1))
+
+
+def _spread_bits(values):
+    """Intercale un bit nul entre chaque bit des 32 bits de poids faible."""
+    v = np.asarray(values).astype(np.uint64) & np.uint64(0xFFFFFFFF)
+    for shift, mask in ((16, 0x0000FFFF0000FFFF), (8, 0x00FF00FF00FF00FF),
+                        (4, 0x0F0F0F0F0F0F0F0F), (2, 0x3333333333333333),
+                        (1, 0x5555555555555555)):
+        v = (v | (v << np.uint64(shift))) & np.uint64(mask)
+    return v
+
+
+def quantize(coords, size, origin):
+    """Indices entiers (colonne, ligne) des boîtes de côté `size` contenant chaque point."""
+    cells = np.floor((coords - origin) / size)
+    if len(cells) and cells.max() >= 2 ** 32:
+        raise ValueError("Grille trop fine : plus de 2**32 boîtes par axe.")
+    return cells.astype(np.int64)
+
+
+def morton_box_counts(coords, min_size, n_scales, origin=None):
+    """
+    Comptages pour toute l'échelle dyadique min_size * 2**k (k < n_scales) en une passe.
+
+    Chaque sommet est quantifié une seule fois sur la grille la plus fine puis codé
+    en clé de Morton ; la boîte d'échelle 2**k s'obtient par un décalage de 2k bits.
+    Le décalage préservant l'ordre, un seul tri suffit pour toutes les échelles.
+
+    :param coords: Tableau (n, 2) des coordonnées.
+    :param min_size: Taille de boîte la plus fine.
+    :param n_scales: Nombre de tailles de boîtes.
+    :param origin: Origine de la grille, par défaut le coin inférieur gauche de l'emprise.
+    :return: Liste des comptages, de la plus petite à la plus grande boîte.
+    """
+    if len(coords) == 0:
+        return [0] * n_scales
+    if origin is None:
+        origin = coords.min(axis=0)
+    cells = quantize(coords, min_size, origin)
+    keys = np.sort(morton_encode(cells[:, 0], cells[:, 1]))
+    return sorted_key_counts(keys, n_scales)
+
+
+def sorted_key_counts(keys, n_scales):
+    """Nombre de clés de Morton distinctes (triées) après décalage de 2k bits, pour k < n_scales."""
+    counts = []
+    for k in range(n_scales):
+        shifted = keys >> np.uint64(2 * k)
+        counts.append(int(np.count_nonzero(shifted[1:] != shifted[:-1])) + 1 if len(keys) else 0)
+    return counts
+
+
+def segment_indices(n_points, offsets=None):
+    """
+    Indices de départ des segments d'un ensemble de parties concaténées.
+
+    :param n_points: Nombre total de sommets.
+    :param offsets: Débuts des parties terminés par n_points (une seule partie si None).
+    :return: Tableau des indices i tels que (i, i + 1) est un segment.
+    """
+    valid = np.ones(max(n_points - 1, 0), dtype=bool)
+    if offsets is not None:
+        ends = np.asarray(offsets[1:-1]) - 1
+        valid[ends[(ends >= 0) & (ends < len(valid))]] = False
+    return np.flatnonzero(valid)
+
+
+def supercover_cells(coords, size, origin, offsets=None, max_cells=2 ** 22):
+    """
+    Parcours exact (à la Amanatides–Woo) des boîtes traversées par chaque segment.
+
+    Pour chaque segment, on calcule les paramètres t de ses croisements avec les lignes
+    verticales et horizontales de la grille ; triés par t, chaque croisement fait avancer
+    la boîte courante d'un pas en x ou en y. Tout est vectorisé sur des lots de segments
+    dont le nombre total de boîtes ne dépasse pas `max_cells`, ce qui borne la mémoire
+    même aux échelles très fines sans densifier la géométrie.
+
+    :param coords: Tableau (n, 2) des sommets.
+    :param size: Taille de boîte.
+    :param origin: Origine de la grille.
+    :param offsets: Débuts des parties (aucun segment ne relie deux parties).
+    :param max_cells: Nombre indicatif de boîtes par lot.
+    :return: Générateur de tableaux (k, 2) d'indices entiers de boîtes (avec doublons).
+    """
+    if len(coords) == 0:
+        return
+    grid = (coords - origin) / size
+    cells = quantize(coords, size, origin)
+    # Les sommets eux-mêmes (utile pour les parties réduites à un point)
+    yield cells
+
+    starts = segment_indices(len(coords), offsets)
+    n_steps = np.abs(cells[starts + 1] - cells[starts]).sum(axis=1)
+    cumulative = np.cumsum(n_steps + 1)
+    bounds = np.searchsorted(cumulative, np.arange(max_cells, cumulative[-1] if len(cumulative) else 0, max_cells))
+    for batch in np.split(starts, bounds):
+        if len(batch):
+            yield _traverse_segments(grid[batch], grid[batch + 1], cells[batch], cells[batch + 1])
+
+
+def _traverse_segments(p0, p1, c0, c1):
+    """Boîtes traversées par les segments [p0, p1] (coordonnées en unités de grille)."""
+    delta = p1 - p0
+    direction = np.sign(c1 - c0)
+    n_cross = np.abs(c1 - c0)
+
+    seg_ids, t_values, steps = [], [], []
+    for axis in (0, 1):
+        count = n_cross[:, axis]
+        total = int(count.sum())
+        seg = np.repeat(np.arange(len(p0)), count)
+        local = np.arange(total) - np.repeat(np.cumsum(count) - count, count)
+        # Lignes de grille franchies : c0+1, c0+2... en avançant ; c0, c0-1... en reculant
+        boundary = c0[seg, axis] + np.where(direction[seg, axis] > 0, local + 1, -local)
+        seg_ids.append(seg)
+        t_values.append((boundary - p0[seg, axis]) / delta[seg, axis])
+        step = np.zeros((total, 2), dtype=np.int64)
+        step[:, axis] = direction[seg, axis]
+        steps.append(step)
+
+    seg = np.concatenate(seg_ids)
+    order = np.lexsort((np.concatenate(t_values), seg))
+    seg = seg[order]
+    step = np.concatenate(steps)[order]
+
+    # Position courante = boîte de départ + somme des pas déjà faits dans le segment
+    walked = np.cumsum(step, axis=0)
+    first = np.searchsorted(seg, np.arange(len(p0)))
+    before = np.vstack([np.zeros((1, 2), dtype=np.int64), walked])[first]
+    crossed = c0[seg] + walked - before[seg]
+    return np.concatenate([c0, crossed])
+
+
+def supercover_box_counts(coords, min_size, n_scales, origin=None, offsets=None):
+    """
+    Comptages exacts des boîtes traversées par les lignes, pour l'échelle dyadique.
+
+    Les boîtes de la grille la plus fine sont obtenues par `supercover_cells` puis codées
+    en clés de Morton ; les échelles plus grossières s'en déduisent par décalage de bits.
+
+    :return: Liste des comptages, de la plus petite à la plus grande boîte.
+    """
+    if len(coords) == 0:
+        return [0] * n_scales
+    if origin is None:
+        origin = coords.min(axis=0)
+    keys = [np.unique(morton_encode(cells[:, 0], cells[:, 1]))
+            for cells in supercover_cells(coords, min_size, origin, offsets)]
+    return sorted_key_counts(np.unique(np.concatenate(keys)), n_scales)
+
+
+def fit_dimension(sizes, counts):
+    """
+    Pente de log(N) en fonction de log(1/taille), par moindres carrés.
+
+    Les échelles sans aucune boîte occupée (log(0) = -inf) sont écartées de l'ajustement.
+
+    :raises ValueError: S'il reste moins de deux échelles avec des boîtes occupées.
+    """
+    sizes = np.asarray(sizes, dtype=np.float64)
+    counts = np.asarray(counts, dtype=np.float64)
+    occupied = counts > 0
+    sizes, counts = sizes[occupied], counts[occupied]
+    if len(sizes) < 2:
+        raise ValueError(f"Il faut au moins deux tailles de boîtes avec des boîtes occupées pour ajuster une "
+                         f"dimension ({np.count_nonzero(~occupied)} échelle(s) sans boîte écartée(s)).")
+    slope, _ = np.polyfit(np.log(1 / sizes), np.log(counts), 1)
+    return float(slope)
+
+
+def box_counting_coordinates(coords, min_size, max_size, factor=2, method="supercover", offsets=None, origin=None):
+    """
+    Box-counting sur un tableau de coordonnées déjà chargé.
+
+    :param method: "supercover" (boîtes traversées par les segments, exact pour des lignes),
+                   "morton" (boîtes contenant un sommet, une passe pour toutes les échelles)
+                   ou "grid" (boîtes contenant un sommet, une quantification par taille).
+                   Les deux premières nécessitent `factor=2`.
+    :param offsets: Débuts des parties, pour ne pas relier deux lignes distinctes.
+    :param origin: Coin de la grille (par défaut, le minimum des coordonnées).
+    :return: Un `BoxCountingResult`.
+    """
+    sizes = box_sizes(min_size, max_size, factor)
+    if origin is None and len(coords):
+        origin = coords.min(axis=0)
+    if method in ("supercover", "morton") and factor != 2:
+        raise ValueError(f"La méthode '{method}' nécessite une échelle dyadique (factor=2).")
+    if method == "supercover":
+        counts = supercover_box_counts(coords, min_size, len(sizes), origin, offsets)
+    elif method == "morton":
+        counts = morton_box_counts(coords, min_size, len(sizes), origin)
+    elif method == "grid":
+        counts = [count_boxes(coords, size, origin) for size in sizes]
+    else:
+        raise ValueError(f"Méthode de comptage inconnue : {method}")
+    return BoxCountingResult(tuple(sizes.tolist()), tuple(counts), fit_dimension(sizes, counts))
+
+
+def box_counting(filepath, min_size, max_size, factor=2, method="supercover"):
+    """
+    Box-counting d'un fichier de contour, équivalent en mémoire de Fractalyse.
+
+    :param filepath: Fichier GeoJSON de `coastlines/contour`.
+    :param min_size: Plus petite taille de boîte (`min=` de Fractalyse).
+    :param max_size: Plus grande taille de boîte (`max=` de Fractalyse).
+    :param factor: Rapport entre deux tailles de boîtes successives.
+    :param method: Méthode de comptage, voir `box_counting_coordinates`.
+    :return: Un `BoxCountingResult`.
+    """
+    coords, offsets = load_coordinates(filepath)
+    return box_counting_coordinates(coords, min_size, max_size, factor, method, offsets)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Box-counting NumPy d'un fichier GeoJSON.")
+    parser.add_argument("filepath")
+    parser.add_argument("min_size", type=float)
+    parser.add_argument("max_size", type=float)
+    parser.add_argument("--factor", type=float, default=2)
+    parser.add_argument("--method", choices=["supercover", "morton", "grid"], default="supercover")
+    parser.add_argument("--json", action="store_true", help="Affiche le résultat complet en JSON.")
+    parser.add_argument("--store", help="Fichier binaire (tools.coastline_store) où lire le pays "
+                                        "désigné par les 3 premières lettres de filepath.")
+    parser.add_argument("--pyramid", help="Dossier des pyramides de simplification (tools.pyramid) ; "
+                                          "ignoré si la pyramide du pays manque ou n'est plus à jour.")
+    args = parser.parse_args()
+
+    pyramid = None
+    if args.pyramid:
+        from tools.pyramid import load_pyramid
+        pyramid = load_pyramid(args.filepath, args.pyramid)
+    if pyramid is not None:
+        result = pyramid.box_counting(args.min_size, args.max_size, args.factor, args.method)
+    elif args.store:
+        from tools.coastline_store import CoastlineStore
+        coords, offsets = CoastlineStore(args.store).load(os.path.basename(args.filepath)[:3])
+        result = box_counting_coordinates(coords, args.min_size, args.max_size, args.factor, args.method, offsets)
+    else:
+        result = box_counting(args.filepath, args.min_size, args.max_size, args.factor, args.method)
+    if args.json:
+        print(json.dumps(result.to_dict()))
+    else:
+        for size, count in zip(result.sizes, result.counts):
+            print(f"{size:.3e}\t{count}")
+        print(f"Dimension fractale : {result.dimension:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Catalogue des fichiers de contours : emprise, nombre de sommets et de segments,
+longueur et hachage de chaque fichier de `coastlines/contour`.
+
+Le catalogue est construit une fois puis rafraîchi de façon incrémentale : un fichier
+dont la taille et la date de modification n'ont pas changé n'est pas relu, et un fichier
+seulement « touché » (même hachage) n'est pas re-parsé. Les scripts peuvent ainsi
+obtenir l'emprise d'un pays (`calculate_box_size`), ses variables de coût ou filtrer les
+pays sans charger le GeoJSON. Le fichier du catalogue est un cache local (dates de
+modification propres à la machine) : il n'est pas suivi par git et se reconstruit au
+premier lancement.
+
+Utilisation en ligne de commande (depuis la racine du dépôt) :
+    python -m tools.catalog
+"""
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from tools.boxcounting import load_coordinates
+from tools.result_cache import file_hash
+
+DEFAULT_CATALOG = "coastlines/contour_catalog.json"
+
+
+def contour_features(filepath):
+    """
+    Variables géométriques d'un fichier de contour.
+
+    :return: Dictionnaire avec n_vertices, n_segments, length et bounds (x_min, y_min, x_max, y_max).
+    """
+    coords, offsets = load_coordinates(filepath)
+    if len(coords) == 0:
+        return {"n_vertices": 0, "n_segments": 0, "length": 0.0, "bounds": (0.0, 0.0, 0.0, 0.0)}
+    lengths = np.hypot(*np.diff(coords, axis=0).T)
+    # Les segments qui relient deux parties différentes ne comptent pas
+    lengths[np.asarray(offsets[1:-1]) - 1] = 0
+    return {
+        "n_vertices": int(len(coords)),
+        "n_segments": int(len(coords) - (len(offsets) - 1)),
+        "length": float(lengths.sum()),
+        "bounds": tuple(float(v) for v in (*coords.min(axis=0), *coords.max(axis=0))),
+    }
+
+
+class Catalog:
+    """Catalogue persistant (JSON) des fichiers GeoJSON d'un dossier, indexé par nom de fichier."""
+
+    def __init__(self, directory="coastlines/contour", path=DEFAULT_CATALOG):
+        self.directory = directory
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def refresh(self):
+        """Met à jour les entrées des fichiers ajoutés, modifiés ou supprimés, puis sauvegarde."""
+        changed = False
+        filenames = sorted(name for name in os.listdir(self.directory) if name.endswith(".geojson"))
+        for filename in filenames:
+            filepath = os.path.join(self.directory, filename)
+            stat = os.stat(filepath)
+            entry = self.entries.get(filename)
+            if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+                continue
+            content_hash = file_hash(filepath)
+            if not entry or entry["sha256"] != content_hash:
+                entry = {"sha256": content_hash, **contour_features(filepath)}
+            entry.update(size=stat.st_size, mtime=stat.st_mtime)
+            self.entries[filename] = entry
+            changed = True
+        for filename in set(self.entries) - set(filenames):
+            del self.entries[filename]
+            changed = True
+        if changed:
+            self.save()
+        return self
+
+    def save(self):
+        directory = os.path.dirname(self.path) or "."
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, self.path)
+
+    def get(self, key):
+        """Entrée d'un fichier, désigné par son chemin, son nom ou son code ISO."""
+        filename = os.path.basename(key)
+        if filename not in self.entries:
+            filename = f"{key}_contour.geojson"
+        return self.entries[filename]
+
+    def bounds(self, key):
+        """Emprise au format de `get_country_bounds` : {'x_min', 'y_min', 'x_max', 'y_max'}."""
+        x_min, y_min, x_max, y_max = self.get(key)["bounds"]
+        return {'x_min': x_min, 'y_min': y_min, 'x_max': x_max, 'y_max': y_max}
+
+    def query(self, predicate=lambda entry: True):
+        """Codes ISO des fichiers dont l'entrée vérifie `predicate`, par ordre alphabétique."""
+        return [filename[:3] for filename, entry in sorted(self.entries.items()) if predicate(entry)]
+
+
+if __name__ == "__main__":
+    catalog = Catalog().refresh()
+    print(f"{len(catalog.entries)} fichiers catalogués dans {catalog.path}")
@@ -0,0 +1,201 @@
+"""
+Stockage binaire compact des contours, lu par projection mémoire (memmap).
+
+Tous les contours sont rangés dans un seul fichier :
+- 8 octets magiques, puis la longueur (uint64) d'un en-tête JSON ;
+- l'en-tête JSON : type des coordonnées et index par code ISO (positions en octets) ;
+- pour chaque pays, les coordonnées (n, 2) puis les débuts de parties (int64, n_parts + 1),
+  chaque bloc aligné sur 64 octets.
+
+Les coordonnées sont en float64, ou en int32 quantifiés (x = origin + scale * q, pas
+`scale` propre à chaque pays) pour diviser la taille par deux. `CoastlineStore` renvoie des vues NumPy sans copie ni
+analyse de JSON.
+
+Utilisation en ligne de commande (depuis la racine du dépôt) :
+    python -m tools.coastline_store coastlines/contour coastlines/contour.coast [--int32] [--check]
+"""
+import argparse
+import json
+import os
+import shutil
+import struct
+
+import numpy as np
+
+from tools.boxcounting import load_coordinates
+
+MAGIC = b"COAST\x00v1"
+ALIGNMENT = 64
+
+
+def _align(position):
+    return -(-position // ALIGNMENT) * ALIGNMENT
+
+
+def quantize(coords, scale=1e-7):
+    """
+    Quantifie des coordonnées en int32 : x = origin + step * q.
+
+    Le pas est `scale`, ou plus grand si l'emprise ne tient pas sur 2**31 - 1 pas
+    (pays à cheval sur l'antiméridien : FJI, KIR, NZL, UMI...).
+
+    :return: Tuple (q, origin, step).
+    """
+    origin = coords.min(axis=0) if len(coords) else np.zeros(2)
+    extent = float((coords.max(axis=0) - origin).max()) if len(coords) else 0.0
+    step = max(scale, extent / (2 ** 31 - 1))
+    quantized = np.rint((coords - origin) / step).astype(np.int32)
+    # Aller-retour : l'erreur doit rester inférieure à un demi-pas (aux arrondis flottants près)
+    error = np.abs(origin + quantized * step - coords).max() if len(coords) else 0.0
+    if error > step * (0.5 + 1e-6):
+        raise ValueError(f"Quantification incorrecte : erreur {error} pour un pas de {step}.")
+    return quantized, origin, step
+
+
+def build_store(directory, output, dtype="float64", scale=1e-7):
+    """
+    Convertit les GeoJSON d'un dossier en un fichier binaire unique.
+
+    Les blocs sont écrits au fil de l'eau dans un fichier temporaire (un seul pays en
+    mémoire à la fois), puis recopiés derrière l'en-tête, dont la taille n'est connue
+    qu'à la fin.
+
+    :param directory: Dossier des fichiers `XXX_contour.geojson`.
+    :param output: Chemin du fichier binaire à créer.
+    :param dtype: "float64" ou "int32" (coordonnées quantifiées, voir `quantize`).
+    :param scale: Pas de quantification minimal en degrés pour "int32" (1e-7° ≈ 1 cm).
+    :return: Nombre de pays écrits.
+    """
+    if dtype not in ("float64", "int32"):
+        raise ValueError("dtype doit valoir 'float64' ou 'int32'.")
+
+    index = {}
+    position = 0
+    data_path, tmp_path = f"{output}.data.tmp", f"{output}.tmp"
+    try:
+        with open(data_path, "wb") as data:
+            for filename in sorted(os.listdir(directory)):
+                if not filename.endswith(".geojson"):
+                    continue
+                coords, offsets = load_coordinates(os.path.join(directory, filename))
+                entry = {"n_vertices": len(coords), "n_parts": len(offsets) - 1}
+                if dtype == "int32":
+                    coords, origin, step = quantize(coords, scale)
+                    entry.update(origin=origin.tolist(), scale=step)
+                for name, array in (("coords", np.ascontiguousarray(coords, dtype=dtype)),
+                                    ("parts", offsets.astype(np.int64))):
+                    position = _align(position)
+                    entry[f"{name}_offset"] = position
+                    data.seek(position)
+                    data.write(array.tobytes())
+                    position += array.nbytes
+                index[filename[:3]] = entry
+            data.truncate(position)
+
+        header = json.dumps({"dtype": dtype, "countries": index}).encode("utf-8")
+        data_start = _align(len(MAGIC) + 8 + len(header))
+        with open(tmp_path, "wb") as f, open(data_path, "rb") as data:
+            f.write(MAGIC + struct.pack("<Q", len(header)) + header)
+            f.write(b"\0" * (data_start - f.tell()))
+            shutil.copyfileobj(data, f, 1 << 22)
+        os.replace(tmp_path, output)
+    finally:
+        for path in (data_path, tmp_path):
+            if os.path.exists(path):
+                os.remove(path)
+    return len(index)
+
+
+def check_store(directory, path):
+    """
+    Relit chaque pays du fichier binaire et le compare au GeoJSON d'origine : égalité
+    exacte en float64, erreur d'au plus un demi-pas en int32.
+
+    :return: Liste des codes ISO en erreur (vide si tout est conforme).
+    """
+    store = CoastlineStore(path)
+    errors = []
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(".geojson"):
+            continue
+        iso = filename[:3]
+        coords, offsets = load_coordinates(os.path.join(directory, filename))
+        stored, stored_offsets = store.load(iso)
+        if store.dtype == np.int32:
+            tolerance = store.index[iso]["scale"] * (0.5 + 1e-6)
+            same = stored.shape == coords.shape and (len(coords) == 0 or np.abs(stored - coords).max() <= tolerance)
+        else:
+            same = np.array_equal(stored, coords)
+        if not (same and np.array_equal(stored_offsets, offsets)):
+            errors.append(iso)
+    return errors
+
+
+class CoastlineStore:
+    """Lecture d'un fichier créé par `build_store`, par projection mémoire."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} n'est pas un fichier de contours binaire.")
+            (header_length,) = struct.unpack("<Q", f.read(8))
+            header = json.loads(f.read(header_length))
+        self.dtype = np.dtype(header["dtype"])
+        self.index = header["countries"]
+        self._data_start = _align(len(MAGIC) + 8 + header_length)
+        self._buffer = np.memmap(path, dtype=np.uint8, mode="r")
+
+    def __contains__(self, iso):
+        return iso in self.index
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def _view(self, offset, dtype, shape):
+        return np.ndarray(shape, dtype=dtype, buffer=self._buffer, offset=self._data_start + offset)
+
+    def raw_coords(self, iso):
+        """Vue (n, 2) des coordonnées telles que stockées (float64 ou int32 quantifiés)."""
+        entry = self.index[iso]
+        return self._view(entry["coords_offset"], self.dtype, (entry["n_vertices"], 2))
+
+    def coords(self, iso):
+        """Coordonnées (n, 2) en float64 : vue sans copie, ou déquantifiées pour int32."""
+        raw = self.raw_coords(iso)
+        if self.dtype == np.int32:
+            entry = self.index[iso]
+            return np.asarray(entry["origin"]) + raw * entry["scale"]
+        return raw
+
+    def offsets(self, iso):
+        """Débuts des parties, terminés par le nombre de sommets (comme `load_coordinates`)."""
+        entry = self.index[iso]
+        return self._view(entry["parts_offset"], np.int64, (entry["n_parts"] + 1,))
+
+    def load(self, iso):
+        """Tuple (coords, offsets), interchangeable avec `load_coordinates`."""
+        return self.coords(iso), self.offsets(iso)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convertit les contours GeoJSON en fichier binaire.")
+    parser.add_argument("directory")
+    parser.add_argument("output")
+    parser.add_argument("--int32", action="store_true", help="Quantifie les coordonnées en int32.")
+    parser.add_argument("--scale", type=float, default=1e-7,
+                        help="Pas de quantification minimal (degrés), élargi pour les pays trop étendus.")
+    parser.add_argument("--check", action="store_true", help="Relit le fichier et le compare aux GeoJSON.")
+    args = parser.parse_args()
+
+    count = build_store(args.directory, args.output, "int32" if args.int32 else "float64", args.scale)
+    print(f"{count} contours écrits dans {args.output} ({os.path.getsize(args.output) / 2 ** 20:.1f} Mo)")
+    if args.check:
+        errors = check_store(args.directory, args.output)
+        print("Aller-retour conforme." if not errors else f"Aller-retour en erreur : {', '.join(errors)}")
+        if errors:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Conversion en lot de `coastlines/full` vers `coastlines/contour`, sur plusieurs processus.
+
+Chaque fichier est converti par `download_and_unfill.process_geojson` (fusion des
+polygones puis extraction des contours extérieurs), dans un processus séparé : le
+résultat est donc identique à celui de la fonction appelée en série. Le fichier de
+sortie est écrit sous un nom temporaire puis renommé, si bien qu'un lot interrompu ne
+laisse jamais de contour à moitié écrit.
+
+Un fichier est sauté s'il est à jour : contour plus récent que le fichier complet, ou
+fichier complet inchangé (même hachage que lors de la dernière conversion, enregistré
+à côté du dossier, dans `coastlines/full_hashes.json` : cache local, non suivi par git).
+
+Utilisation en ligne de commande (depuis la racine du dépôt) :
+    python -m tools.convert_contours [--workers N] [--force]
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from time import perf_counter
+
+from tools.download_and_unfill import process_geojson
+from tools.result_cache import file_hash
+
+
+def contour_path(full_path, contour_dir):
+    """Chemin du contour correspondant à `XXX.geojson` : `XXX_contour.geojson`."""
+    country_code = os.path.basename(full_path).split(".")[0]
+    return os.path.join(contour_dir, f"{country_code}_contour.geojson")
+
+
+def default_hashes_path(full_dir):
+    """Fichier des hachages d'un dossier de fichiers complets : `<full_dir>_hashes.json`."""
+    return f"{os.path.normpath(full_dir)}_hashes.json"
+
+
+def load_hashes(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_hashes(path, hashes):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(hashes, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def is_up_to_date(full_path, output_path, hashes):
+    """
+    Vrai si le contour n'a pas besoin d'être recalculé.
+
+    :param hashes: Hachages des fichiers complets lors de leur dernière conversion.
+    :return: Tuple (à jour, hachage du fichier complet ou None s'il n'a pas été calculé).
+    """
+    if not os.path.exists(output_path):
+        return False, None
+    if os.path.getmtime(output_path) >= os.path.getmtime(full_path):
+        return True, None
+    content_hash = file_hash(full_path)
+    return hashes.get(os.path.basename(full_path)) == content_hash, content_hash
+
+
+def _convert(full_path, output_path):
+    country_code = os.path.basename(full_path).split(".")[0]
+    tmp_path = f"{output_path}.tmp"
+    start = perf_counter()
+    try:
+        process_geojson(full_path, tmp_path, country_code)
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return perf_counter() - start
+
+
+def convert_all(full_dir="coastlines/full", contour_dir="coastlines/contour", workers=None, force=False,
+                hashes_path=None):
+    """
+    Convertit tous les fichiers complets d'un dossier en contours.
+
+    :param full_dir: Dossier des fichiers `XXX.geojson` (polygones GADM).
+    :param contour_dir: Dossier de sortie des `XXX_contour.geojson`.
+    :param workers: Nombre de processus (par défaut, le nombre de cœurs).
+    :param force: Reconvertit aussi les fichiers à jour.
+    :param hashes_path: Fichier JSON des hachages des fichiers complets déjà convertis
+                        (par défaut `<full_dir>_hashes.json`).
+    :return: Dictionnaire code ISO -> durée en secondes, "à jour" ou message d'erreur.
+    """
+    hashes_path = hashes_path or default_hashes_path(full_dir)
+    hashes = load_hashes(hashes_path)
+    os.makedirs(contour_dir, exist_ok=True)
+
+    report = {}
+    to_convert = []
+    for filename in sorted(os.listdir(full_dir)):
+        if not filename.endswith(".geojson"):
+            continue
+        full_path = os.path.join(full_dir, filename)
+        output_path = contour_path(full_path, contour_dir)
+        up_to_date, content_hash = (False, None) if force else is_up_to_date(full_path, output_path, hashes)
+        if up_to_date:
+            report[filename.split(".")[0]] = "à jour"
+            if content_hash is not None:
+                os.utime(output_path)  # fichier seulement « touché » : inutile de rehacher la prochaine fois
+        else:
+            to_convert.append((full_path, output_path))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_convert, full_path, output_path): full_path
+                   for full_path, output_path in to_convert}
+        for future in as_completed(futures):
+            full_path = futures[future]
+            filename = os.path.basename(full_path)
+            country_code = filename.split(".")[0]
+            try:
+                report[country_code] = future.result()
+                hashes[filename] = file_hash(full_path)
+                print(f"{country_code} : {report[country_code]:.2f} s")
+            except Exception as e:
+                report[country_code] = f"erreur : {e}"
+                print(f"{country_code} : {report[country_code]}")
+
+    if to_convert:
+        save_hashes(hashes_path, hashes)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convertit coastlines/full en coastlines/contour en parallèle.")
+    parser.add_argument("--full-dir", default="coastlines/full")
+    parser.add_argument("--contour-dir", default="coastlines/contour")
+    parser.add_argument("--workers", type=int, default=None, help="Nombre de processus (défaut : nombre de cœurs).")
+    parser.add_argument("--force", action="store_true", help="Reconvertit aussi les fichiers à jour.")
+    args = parser.parse_args()
+
+    start = perf_counter()
+    report = convert_all(args.full_dir, args.contour_dir, args.workers, args.force)
+    durations = {code: value for code, value in report.items() if isinstance(value, float)}
+    errors = [code for code, value in report.items() if isinstance(value, str) and value.startswith("erreur")]
+    print(f"{len(durations)} convertis, {len(report) - len(durations) - len(errors)} à jour, {len(errors)} erreurs")
+    if durations:
+        slowest = sorted(durations, key=durations.get, reverse=True)[:5]
+        print("Plus longs :", ", ".join(f"{code} ({durations[code]:.2f} s)" for code in slowest))
+        print(f"Durée cumulée : {sum(durations.values()):.1f} s, durée réelle : {perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
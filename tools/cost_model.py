@@ -0,0 +1,78 @@
+"""
+Modèle de coût : prédit la durée du calcul de dimension d'un pays.
+
+Les variables sont peu coûteuses à obtenir depuis le fichier de contour ou, mieux,
+depuis `tools.catalog` (nombre de sommets, longueur totale, emprise) et dépendent de la plus petite taille de boîte.
+Le modèle est une régression linéaire en log-log ajustée sur les durées déjà mesurées
+dans `results/fractal_dimensions*.csv` ; sans historique, on se rabat sur un coût
+relatif proportionnel au nombre de boîtes traversées.
+"""
+import csv
+import os
+
+import numpy as np
+
+from tools.catalog import contour_features
+
+HISTORY_FILES = ["results/fractal_dimensions.csv", "results/fractal_dimensions_adaptative.csv"]
+# Taille minimale utilisée par run_fractalyse.py, dont le CSV n'a pas de colonne box_min
+DEFAULT_BOX_MIN = 1E-1
+
+
+def _design_row(features, min_size):
+    x_min, y_min, x_max, y_max = features["bounds"]
+    area = max((x_max - x_min) * (y_max - y_min), min_size ** 2)
+    return [1.0,
+            np.log1p(features["n_vertices"]),
+            np.log1p(features["length"] / min_size),
+            np.log(area / min_size ** 2)]
+
+
+class CostModel:
+    """Prédiction de la durée (en secondes si un historique est disponible)."""
+
+    def __init__(self, coastlines_dir="coastlines/contour", catalog=None):
+        self.coastlines_dir = coastlines_dir
+        self.catalog = catalog
+        self.coefficients = None
+        self._features = {}
+
+    def features(self, filepath):
+        if self.catalog is not None:
+            try:
+                return self.catalog.get(filepath)
+            except KeyError:
+                pass
+        if filepath not in self._features:
+            self._features[filepath] = contour_features(filepath)
+        return self._features[filepath]
+
+    def fit(self, history_files=HISTORY_FILES, min_samples=8):
+        """
+        Ajuste le modèle sur les durées des CSV de résultats existants.
+
+        :return: self, avec `coefficients` à None si l'historique est insuffisant.
+        """
+        rows, targets = [], []
+        for history_file in history_files:
+            if not os.path.exists(history_file):
+                continue
+            with open(history_file, newline="", encoding="utf-8") as f:
+                for record in csv.DictReader(f):
+                    filepath = os.path.join(self.coastlines_dir, f"{record['Pays']}_contour.geojson")
+                    if not os.path.exists(filepath):
+                        continue
+                    min_size = float(record.get("box_min") or DEFAULT_BOX_MIN)
+                    rows.append(_design_row(self.features(filepath), min_size))
+                    targets.append(np.log1p(float(record["durée"])))
+        if len(rows) >= min_samples:
+            self.coefficients, *_ = np.linalg.lstsq(np.array(rows), np.array(targets), rcond=None)
+        return self
+
+    def predict(self, filepath, min_size):
+        """Durée prédite du calcul pour ce fichier et cette plus petite taille de boîte."""
+        features = self.features(filepath)
+        if self.coefficients is None:
+            # Coût relatif : sommets + boîtes traversées à l'échelle la plus fine
+            return features["n_vertices"] + features["length"] / min_size
+        return max(float(np.expm1(np.dot(_design_row(features, min_size), self.coefficients))), 0.0)
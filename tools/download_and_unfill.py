@@ -1,12 +1,15 @@
-import json
-import os
-import geopandas as gpd
-import requests
-from shapely.geometry import shape, Polygon, MultiPolygon
+import numpy as np
+from shapely.geometry import Polygon, MultiPolygon
 from shapely.ops import unary_union
+from tools.geojson_stream import read_shape
+from tools.geojson_writer import GeoJSONWriter
 
 
 def download_coastlines(country_code, path):
+    # Imports locaux : les processus de conversion (tools.convert_contours) n'en ont pas besoin
+    import geopandas as gpd
+    import requests
+
     response = None
     try:
         response = requests.get(f"https://geodata.ucdavis.edu/gadm/gadm4.1/json/gadm41_{country_code}_0.json", timeout=10)
@@ -24,13 +27,15 @@ def download_coastlines(country_code, path):
     pays_contours = gpd.read_file(path)
     return pays_contours
 
-def process_geojson(input_filepath, output_filepath, country_code):
-    with open(input_filepath) as f:
-        geojson_dict = json.load(f)
+def process_geojson(input_filepath, output_filepath, country_code, precision=None):
+    """
+    Convertit un fichier GADM complet en contour : MultiLineString des contours extérieurs.
 
-    # Convertir le MultiPolygon en Polygon
-    feature = geojson_dict['features'][0]
-    geometry = shape(feature['geometry'])
+    :param precision: Décimales conservées (None, par défaut : coordonnées exactes, sortie
+                      identique à la conversion historique ; l'arrondi est à demander).
+    """
+    # Lecture en flux des polygones (les fichiers GADM de niveau 0 n'ont qu'une entité)
+    geometry = read_shape(input_filepath)
 
     # Fusionner les polygones pour obtenir le contour extérieur
     contour = unary_union(geometry)
@@ -41,51 +46,18 @@ def process_geojson(input_filepath, output_filepath, country_code):
     elif isinstance(contour, MultiPolygon):
         exterior_contours = [geom.exterior for geom in contour.geoms]
 
-    contour_geojson = {
-        "type": "FeatureCollection",
-        "name": f"{country_code}_contour",
-        "crs": {
-            "type": "name",
-            "properties": {
-                "name": "urn:ogc:def:crs:OGC:1.3:CRS84"
-            }
-        },
-        "features": [
-            {
-                "type": "Feature",
-                "properties": {
-                    "GID_0": country_code
-                },
-                "geometry": {
-                    "type": "MultiLineString",
-                    "coordinates": [list(contour.coords) for contour in exterior_contours]
-                }
-            }
-        ]
-    }
-
-    with open(output_filepath, 'w') as f:
-        json.dump(contour_geojson, f, indent=2)
+    # Écriture en flux d'un GeoJSON compact (coordonnées arrondies si `precision` est donné)
+    with GeoJSONWriter(output_filepath, precision, f"{country_code}_contour", "urn:ogc:def:crs:OGC:1.3:CRS84") as writer:
+        writer.write({"type": "Feature", "properties": {"GID_0": country_code},
+                      "geometry": {"type": "MultiLineString",
+                                   "coordinates": [np.asarray(contour.coords) for contour in exterior_contours]}})
 
 
-# Télécharger les contours de tous les pays dans la base de données
-import string
+# Télécharger les contours de tous les pays connus puis les convertir
+# (depuis la racine du dépôt : python -m tools.download_and_unfill)
+if __name__ == "__main__":
+    from tools.convert_contours import convert_all
+    from tools.gadm_download import download_all, read_country_codes
 
-existing = os.listdir("../coastlines/contour")
-existing = [a.split("_")[0] for a in existing]
-existing = [a for a in existing if len(a) == 3]
-existing.sort()
-start = existing[-1]
-code_to_pass = ["CON", "FLX"] # car bug bizarrement pour ceux là
-country_codes = [a + b + c for a in string.ascii_uppercase for b in string.ascii_uppercase for c in string.ascii_uppercase if a + b + c not in code_to_pass and a + b + c > start]
-for country_code in country_codes:
-    full_path = f"coastlines/full/{country_code}.geojson"
-    contour_path = f"coastlines/contour/{country_code}_contour.geojson"
-
-    try:
-        if not os.path.exists(full_path):
-            download_coastlines(country_code, full_path)
-        process_geojson(full_path, contour_path, country_code)
-        print(f'Téléchargement réussi pour {country_code}.')
-    except Exception as e:
-        pass
+    download_all(read_country_codes(), "coastlines/full")
+    convert_all("coastlines/full", "coastlines/contour")
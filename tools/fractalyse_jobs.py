@@ -0,0 +1,101 @@
+"""
+Construction des tâches de calcul de dimension pour `tools.scheduler`.
+
+Deux moteurs sont disponibles :
+- "java" : le jar Fractalyse, dont on lit la 6e ligne du fichier `.txt` produit ;
+- "numpy" : `python -m tools.boxcounting`, dont on lit la sortie JSON.
+
+La valeur d'une tâche est un dictionnaire contenant au moins "dimension" (et, pour le
+moteur NumPy, les tailles de boîtes et comptages par échelle), ce qui est aussi la forme
+stockée dans `tools.result_cache`. La clé de cache comprend tout ce qui change le
+résultat : moteur, tailles de boîtes, méthode de comptage, facteur d'échelle, niveau de
+pyramide réellement utilisé et `CACHE_VERSION`, à incrémenter quand l'estimateur change.
+"""
+import glob
+import json
+import os
+import sys
+
+from tools.pyramid import Pyramid, pyramid_path
+from tools.result_cache import cache_key, file_hash
+from tools.scheduler import Job
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND = "java"  # Moteur par défaut, celui des résultats publiés (les dimensions diffèrent d'un moteur à l'autre)
+BACKENDS = ("java", "numpy")
+CACHE_VERSION = 1  # À incrémenter à chaque changement de l'estimateur (invalide le cache)
+
+
+def read_fractalyse_dimension(txt_path):
+    """Lit la dimension fractale dans un fichier `.txt` de Fractalyse (6e ligne)."""
+    with open(txt_path) as f:
+        return float(f.readlines()[5].split()[2].replace(",", "."))
+
+
+def _parse_fractalyse(workdir, stdout):
+    txt_files = glob.glob(os.path.join(workdir, "*.txt"))
+    if not txt_files:
+        raise RuntimeError("Fractalyse n'a produit aucun fichier .txt")
+    return {"dimension": read_fractalyse_dimension(txt_files[0])}
+
+
+def _parse_boxcounting(workdir, stdout):
+    return json.loads(stdout)
+
+
+def pyramid_level(filepath, pyramid_dir, min_value, method="supercover", content_hash=None):
+    """
+    Niveau de pyramide que `tools.boxcounting --pyramid` utilisera réellement.
+
+    :return: Dictionnaire {"hash", "level"} (hachage du fichier de pyramide et niveau), ou
+             None si le comptage porte sur la géométrie complète (pas de pyramide, pyramide
+             périmée, niveau 0 ou méthode qui compte les sommets).
+    """
+    path = pyramid_path(filepath, pyramid_dir)
+    if method != "supercover" or not os.path.exists(path):
+        return None
+    pyramid = Pyramid.load(path)
+    if pyramid.source_hash != (content_hash or file_hash(filepath)):
+        return None
+    level = pyramid.level_for(float(min_value))
+    return {"hash": file_hash(path), "level": level} if level > 0 else None
+
+
+def dimension_job(filepath, min_value, max_value, backend=BACKEND, fractalyse_jar="fractalyse-3.0-0.9.1.jar",
+                  use_cache=True, content_hash=None, pyramid_dir=None, method="supercover", factor=2):
+    """
+    Tâche calculant la dimension fractale d'un fichier de contour.
+
+    :param filepath: Fichier GeoJSON de `coastlines/contour`.
+    :param min_value: Plus petite taille de boîte.
+    :param max_value: Plus grande taille de boîte.
+    :param backend: "java" ou "numpy".
+    :param use_cache: Calcule la clé de cache (hachage du fichier et des paramètres).
+    :param content_hash: Hachage du fichier s'il est déjà connu (voir `tools.catalog`).
+    :param pyramid_dir: Dossier des pyramides de simplification (moteur "numpy", voir `tools.pyramid`).
+    :param method: Méthode de comptage du moteur "numpy" (voir `tools.boxcounting`).
+    :param factor: Rapport entre deux tailles de boîtes successives (moteur "numpy").
+    :return: Un `Job` nommé d'après le code ISO du pays.
+    """
+    name = os.path.basename(filepath)[:3]
+    if backend == "java":
+        command = ["java", "-jar", os.path.abspath(fractalyse_jar), "--boxcounting",
+                   f"min={min_value}", f"max={max_value}", "{input0}"]
+        job = Job(name, command, [filepath], _parse_fractalyse)
+    elif backend == "numpy":
+        command = [sys.executable, "-m", "tools.boxcounting", os.path.abspath(filepath),
+                   str(min_value), str(max_value), "--json", "--method", method, "--factor", str(factor)]
+        if pyramid_dir is not None:
+            command += ["--pyramid", os.path.abspath(pyramid_dir)]
+        pythonpath = os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get("PYTHONPATH")]))
+        job = Job(name, command, [], _parse_boxcounting, {"PYTHONPATH": pythonpath})
+    else:
+        raise ValueError(f"Moteur inconnu : {backend}")
+    if use_cache:
+        params = {"version": CACHE_VERSION, "backend": backend, "min": float(min_value), "max": float(max_value)}
+        if backend == "numpy":
+            params.update(method=method, factor=float(factor))
+            if pyramid_dir is not None:
+                params["pyramid"] = pyramid_level(filepath, pyramid_dir, min_value, method, content_hash)
+        job.cache_key = cache_key(filepath, params, content_hash)
+    return job
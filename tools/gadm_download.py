@@ -0,0 +1,187 @@
+"""
+Téléchargement concurrent des contours de pays GADM (niveau 0), avec reprise et cache.
+
+Au lieu d'essayer les 17 576 codes de trois lettres un par un, on part de la liste des
+codes ISO connus (`coastlines/gadm_countries.txt`, un code par ligne) :
+- une seule session HTTP, dont les connexions sont réutilisées entre les requêtes, et au
+  plus `workers` téléchargements simultanés ;
+- un téléchargement interrompu reprend là où il s'était arrêté (fichier `.part` et en-tête
+  `Range`, avec `If-Range` pour repartir de zéro si le fichier distant a changé) ;
+- les en-têtes `ETag` et `Last-Modified` de chaque fichier sont conservés à côté de
+  celui-ci (`XXX.geojson.meta.json`) : les requêtes suivantes sont conditionnelles et un
+  fichier inchangé (réponse 304) n'est pas retéléchargé ;
+- on demande le corps sans compression (`Accept-Encoding: identity`) et on écrit les
+  octets reçus tels quels : `Content-Length` et les positions de `Range` portent ainsi sur
+  les octets du fichier partiel. Si le serveur compresse quand même (gzip), le fichier est
+  décompressé une fois complet.
+
+L'URL est un paramètre (`url_template`), ce qui permet de tester le téléchargement sur un
+serveur HTTP local (`tests/test_gadm_download.py`).
+
+Utilisation en ligne de commande (depuis la racine du dépôt) :
+    python -m tools.gadm_download [FRA BEL ...] [--workers 8]
+"""
+import argparse
+import gzip
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+
+GADM_URL = "https://geodata.ucdavis.edu/gadm/gadm4.1/json/gadm41_{code}_0.json"
+DEFAULT_COUNTRIES = "coastlines/gadm_countries.txt"
+
+
+def read_country_codes(path=DEFAULT_COUNTRIES):
+    """Codes ISO d'un fichier texte (un par ligne, lignes vides et `#` ignorées)."""
+    with open(path, encoding="utf-8") as f:
+        return [line.split("#")[0].strip() for line in f if line.split("#")[0].strip()]
+
+
+def make_session(pool_size=8):
+    """Session HTTP dont le pool de connexions accepte `pool_size` requêtes simultanées."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _read_json(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_json(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _validators(headers):
+    return {key: headers[name] for key, name in (("etag", "ETag"), ("last_modified", "Last-Modified"))
+            if name in headers}
+
+
+def download(session, code, path, url_template=GADM_URL, timeout=30, chunk_size=1 << 16):
+    """
+    Télécharge (ou met à jour) le fichier d'un pays.
+
+    :param session: Session HTTP (voir `make_session`).
+    :param code: Code ISO du pays.
+    :param path: Fichier de destination.
+    :param url_template: URL contenant `{code}`.
+    :return: "téléchargé", "inchangé" (304) ou "absent" (404).
+    """
+    url = url_template.format(code=code)
+    meta_path = f"{path}.meta.json"
+    part_path = f"{path}.part"
+    part_meta_path = f"{part_path}.meta.json"
+
+    headers = {"Accept-Encoding": "identity"}
+    meta = _read_json(meta_path) if os.path.exists(path) else {}
+    if "etag" in meta:
+        headers["If-None-Match"] = meta["etag"]
+    if "last_modified" in meta:
+        headers["If-Modified-Since"] = meta["last_modified"]
+
+    part_meta = _read_json(part_meta_path)
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    validator = part_meta.get("etag") or part_meta.get("last_modified")
+    if offset and validator:
+        # Reprise : seulement si le fichier distant est toujours celui du début du téléchargement
+        headers["Range"] = f"bytes={offset}-"
+        headers["If-Range"] = validator
+
+    with session.get(url, headers=headers, stream=True, timeout=timeout) as response:
+        if response.status_code == 304:
+            return "inchangé"
+        if response.status_code == 404:
+            return "absent"
+        if response.status_code == 416:
+            # Plage invalide : le fichier partiel ne correspond plus, on repart de zéro
+            os.remove(part_path)
+            return download(session, code, path, url_template, timeout, chunk_size)
+        response.raise_for_status()
+
+        resumed = response.status_code == 206
+        if not resumed:
+            offset = 0
+            part_meta = _validators(response.headers)
+            part_meta["encoding"] = response.headers.get("Content-Encoding", "identity")
+            _write_json(part_meta_path, part_meta)
+        expected = response.headers.get("Content-Length")
+        expected = offset + int(expected) if expected is not None else None
+
+        # Octets bruts (sans décompression) : ceux que comptent Content-Length et Range
+        with open(part_path, "ab" if resumed else "wb") as f:
+            for chunk in response.raw.stream(chunk_size, decode_content=False):
+                f.write(chunk)
+
+    size = os.path.getsize(part_path)
+    if expected is not None and size != expected:
+        raise IOError(f"{code} : {size} octets reçus sur {expected}, le téléchargement reprendra.")
+    encoding = part_meta.pop("encoding", "identity")
+    if encoding == "gzip":
+        with gzip.open(part_path, "rb") as source, open(f"{path}.tmp", "wb") as target:
+            shutil.copyfileobj(source, target, chunk_size)
+        os.replace(f"{path}.tmp", path)
+        os.remove(part_path)
+    elif encoding == "identity":
+        os.replace(part_path, path)
+    else:
+        raise IOError(f"{code} : encodage {encoding} non pris en charge.")
+    _write_json(meta_path, part_meta)
+    os.remove(part_meta_path)
+    return "téléchargé"
+
+
+def download_all(codes, directory="coastlines/full", workers=8, url_template=GADM_URL, timeout=30, session=None):
+    """
+    Télécharge les fichiers de plusieurs pays en parallèle.
+
+    :param codes: Codes ISO des pays.
+    :param directory: Dossier de destination (`XXX.geojson`).
+    :param workers: Nombre maximal de téléchargements simultanés.
+    :return: Dictionnaire code -> statut (voir `download`) ou message d'erreur.
+    """
+    os.makedirs(directory, exist_ok=True)
+    session = session or make_session(workers)
+    report = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(download, session, code, os.path.join(directory, f"{code}.geojson"),
+                                   url_template, timeout): code for code in codes}
+        for future in as_completed(futures):
+            code = futures[future]
+            try:
+                report[code] = future.result()
+            except Exception as e:
+                report[code] = f"erreur : {e}"
+            print(f"{code} : {report[code]}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Télécharge les contours GADM des pays.")
+    parser.add_argument("codes", nargs="*", help=f"Codes ISO (par défaut, ceux de {DEFAULT_COUNTRIES}).")
+    parser.add_argument("--directory", default="coastlines/full")
+    parser.add_argument("--workers", type=int, default=8, help="Téléchargements simultanés.")
+    parser.add_argument("--url", default=GADM_URL, help="Modèle d'URL contenant {code}.")
+    args = parser.parse_args()
+
+    report = download_all(args.codes or read_country_codes(), args.directory, args.workers, args.url)
+    counts = {}
+    for status in report.values():
+        status = status.split(" :")[0]
+        counts[status] = counts.get(status, 0) + 1
+    print(", ".join(f"{count} {status}" for status, count in sorted(counts.items())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Lecture en flux des coordonnées d'un fichier GeoJSON, à mémoire bornée.
+
+Au lieu de `json.load` (qui construit des millions de listes et de floats Python), le
+texte est lu par blocs et les positions `[x, y(, z)]` sont extraites par expression
+régulière puis converties en tableaux NumPy par blocs entiers. Le nombre de `]` qui
+suivent chaque position indique la structure : 1 ferme une partie (LineString, anneau),
+2 ou plus ferment aussi un polygone.
+
+Les positions sont reconnues partout dans le texte : un fichier dont les propriétés
+contiendraient des listes de nombres (ou des `bbox`) n'est pas pris en charge, ce qui
+n'est le cas d'aucun fichier produit ou téléchargé par ce dépôt.
+"""
+import re
+
+import numpy as np
+
+_NUMBER = rb"-?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+_TOKEN = re.compile(
+    rb'"type"\s*:\s*"(\w+)"'
+    rb"|\[\s*(" + _NUMBER + rb")\s*,\s*(" + _NUMBER + rb")(?:\s*,\s*" + _NUMBER + rb")*\s*\]((?:\s*\])*)")
+
+GEOMETRY_TYPES = {b"Point", b"MultiPoint", b"LineString", b"MultiLineString", b"Polygon", b"MultiPolygon"}
+_POINT_TYPES = {b"Point", b"MultiPoint"}
+
+
+def iter_chunks(filepath, block_size=1 << 20):
+    """
+    Parcourt les coordonnées d'un fichier par blocs.
+
+    :param filepath: Fichier GeoJSON.
+    :param block_size: Taille (octets) des blocs lus.
+    :return: Générateur de tuples (coords, closes) : `coords` tableau (k, 2) de float64,
+             `closes` nombre de `]` fermant après chaque position (>= 1 en fin de partie ;
+             chaque point d'un Point/MultiPoint forme sa propre partie).
+    """
+    geometry_type = None
+    carry = b""
+    with open(filepath, "rb") as f:
+        while True:
+            block = f.read(block_size)
+            text = carry + block
+            if block:
+                # Toutes les positions avant le dernier '[' sont complètes, `]` fermants compris
+                cut = text.rfind(b"[")
+                if cut <= 0:
+                    carry = text
+                    continue
+                text, carry = text[:cut], text[cut:]
+            chunk, geometry_type = _parse(text, geometry_type)
+            if chunk is not None:
+                yield chunk
+            if not block:
+                return
+
+
+def _parse(text, geometry_type):
+    matches = _TOKEN.findall(text)
+    if not matches:
+        return None, geometry_type
+    tokens = np.array(matches, dtype=bytes)
+    is_position = tokens[:, 0] == b""
+
+    # Type de géométrie courant pour chaque position
+    point_like = np.zeros(len(tokens), dtype=bool)
+    current = geometry_type in _POINT_TYPES
+    start = 0
+    for i in np.flatnonzero(~is_position):
+        point_like[start:i] = current
+        if tokens[i, 0] in GEOMETRY_TYPES:
+            geometry_type = tokens[i, 0]
+            current = geometry_type in _POINT_TYPES
+        start = i
+    point_like[start:] = current
+
+    positions = tokens[is_position]
+    if len(positions) == 0:
+        return None, geometry_type
+    coords = positions[:, 1:3].astype(np.float64)
+    closes = np.char.count(positions[:, 3], b"]")
+    closes[point_like[is_position]] = np.maximum(closes[point_like[is_position]], 1)
+    return (coords, closes), geometry_type
+
+
+def iter_parts(filepath, block_size=1 << 20):
+    """
+    Parcourt les parties (LineString, anneaux, points) d'un fichier.
+
+    :return: Générateur de tuples (coords, closes) pour chaque partie complète, `closes`
+             étant le nombre de `]` après sa dernière position. La mémoire est bornée par
+             la plus grande partie.
+    """
+    pending = []
+    for coords, closes in iter_chunks(filepath, block_size):
+        ends = np.flatnonzero(closes >= 1)
+        start = 0
+        for end in ends:
+            pending.append(coords[start:end + 1])
+            yield np.concatenate(pending) if len(pending) > 1 else pending[0], int(closes[end])
+            pending = []
+            start = end + 1
+        if start < len(coords):
+            pending.append(coords[start:])
+    if pending:
+        yield np.concatenate(pending), 0
+
+
+def iter_polygons(filepath, block_size=1 << 20):
+    """
+    Parcourt les polygones d'un fichier Polygon/MultiPolygon.
+
+    :return: Générateur de listes d'anneaux [extérieur, trou, ...] (tableaux (k, 2)).
+    """
+    rings = []
+    for coords, closes in iter_parts(filepath, block_size):
+        rings.append(coords)
+        if closes >= 2:
+            yield rings
+            rings = []
+    if rings:
+        yield rings
+
+
+def read_coordinates(filepath, block_size=1 << 20):
+    """
+    Lit toutes les coordonnées d'un fichier.
+
+    :return: Tuple (coords, offsets) : tableau (n, 2) et débuts des parties terminés par n.
+    """
+    coords_chunks, end_chunks = [], []
+    n = 0
+    for coords, closes in iter_chunks(filepath, block_size):
+        coords_chunks.append(coords)
+        end_chunks.append(np.flatnonzero(closes >= 1) + n + 1)
+        n += len(coords)
+    if not coords_chunks:
+        return np.empty((0, 2)), np.zeros(1, dtype=np.int64)
+    ends = np.concatenate(end_chunks)
+    if len(ends) == 0 or ends[-1] != n:
+        ends = np.append(ends, n)
+    return np.concatenate(coords_chunks), np.concatenate([[0], ends]).astype(np.int64)
+
+
+def read_shape(filepath, block_size=1 << 20):
+    """
+    Géométrie shapely de l'ensemble du fichier, sans `json.load`.
+
+    :return: Un MultiPolygon si le fichier contient des polygones, sinon un MultiLineString.
+    """
+    from shapely.geometry import MultiLineString, MultiPolygon, Polygon
+
+    with open(filepath, "rb") as f:
+        head = f.read(block_size)
+    if re.search(rb'"type"\s*:\s*"(Multi)?Polygon"', head):
+        return MultiPolygon([Polygon(rings[0], rings[1:]) for rings in iter_polygons(filepath, block_size)])
+    return MultiLineString([coords for coords, _ in iter_parts(filepath, block_size) if len(coords) > 1])
@@ -0,0 +1,149 @@
+"""
+Écriture en flux de fichiers GeoJSON compacts.
+
+Les entités sont écrites une à une dans le fichier (aucune chaîne géante en mémoire),
+sans indentation ni espaces (`separators=(",", ":")`), et les coordonnées peuvent être
+arrondies à `precision` décimales : 7 décimales suffisent au centimètre pour des degrés.
+Les coordonnées peuvent être des listes, des tuples ou des tableaux NumPy ; les tableaux
+de positions sont arrondis et convertis en bloc, par tranches de `CHUNK` positions.
+
+Exemple :
+    with GeoJSONWriter("simpleGEO/koch.geojson", precision=10) as writer:
+        for i, line in enumerate(lines, start=1):
+            writer.write(feature(line, {"id": i}))
+"""
+import json
+from numbers import Number
+
+import numpy as np
+
+CHUNK = 1 << 16
+_SEPARATORS = (",", ":")
+
+
+def _dumps(value):
+    return json.dumps(value, separators=_SEPARATORS, ensure_ascii=False)
+
+
+def feature(geometry, properties=None):
+    """
+    Entité GeoJSON.
+
+    :param geometry: Géométrie shapely (ou tout objet avec `__geo_interface__`) ou dictionnaire GeoJSON.
+    :param properties: Propriétés de l'entité.
+    """
+    return {"type": "Feature", "geometry": geometry, "properties": properties or {}}
+
+
+class GeoJSONWriter:
+    """FeatureCollection écrite entité par entité ; à utiliser comme gestionnaire de contexte."""
+
+    def __init__(self, path, precision=None, name=None, crs=None):
+        """
+        :param path: Fichier de sortie.
+        :param precision: Nombre de décimales conservées (None : aucune troncature).
+        :param name: Membre "name" de la collection.
+        :param crs: Nom du CRS (ex. "urn:ogc:def:crs:OGC:1.3:CRS84"), membre "crs" de la collection.
+        """
+        self.precision = precision
+        self.count = 0
+        self._file = open(path, "w", encoding="utf-8", buffering=1 << 20)
+        self._file.write('{"type":"FeatureCollection"')
+        if name is not None:
+            self._file.write(f',"name":{_dumps(name)}')
+        if crs is not None:
+            self._file.write(f',"crs":{_dumps({"type": "name", "properties": {"name": crs}})}')
+        self._file.write(',"features":[')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.write("]}\n")
+            self._file.close()
+
+    def write(self, entity):
+        """Écrit une entité (dictionnaire "Feature", voir `feature`)."""
+        write = self._file.write
+        write("," if self.count else "")
+        write("{")
+        for i, (key, value) in enumerate(entity.items()):
+            write(f'{"," if i else ""}{_dumps(key)}:')
+            if key == "geometry" and value is not None:
+                self._write_geometry(value)
+            else:
+                write(_dumps(value))
+        write("}")
+        self.count += 1
+
+    def write_all(self, entities):
+        """Écrit toutes les entités d'un itérable (liste ou générateur)."""
+        for entity in entities:
+            self.write(entity)
+        return self.count
+
+    def _write_geometry(self, geometry):
+        if hasattr(geometry, "__geo_interface__"):
+            geometry = geometry.__geo_interface__
+        write = self._file.write
+        write("{")
+        for i, (key, value) in enumerate(geometry.items()):
+            write(f'{"," if i else ""}{_dumps(key)}:')
+            if key == "coordinates":
+                self._write_coordinates(value)
+            elif key == "geometries":
+                write("[")
+                for j, child in enumerate(value):
+                    write("," if j else "")
+                    self._write_geometry(child)
+                write("]")
+            else:
+                write(_dumps(value))
+        write("}")
+
+    def _write_positions(self, positions):
+        positions = np.asarray(positions, dtype=np.float64)
+        if self.precision is not None:
+            positions = np.round(positions, self.precision)
+        if len(positions) <= CHUNK:
+            self._file.write(_dumps(positions.tolist()))
+            return
+        self._file.write("[")
+        for start in range(0, len(positions), CHUNK):
+            self._file.write(("," if start else "") + _dumps(positions[start:start + CHUNK].tolist())[1:-1])
+        self._file.write("]")
+
+    def _write_coordinates(self, coordinates):
+        if isinstance(coordinates, np.ndarray) and coordinates.ndim <= 2:
+            self._write_positions(coordinates)
+            return
+        if len(coordinates) == 0:
+            self._file.write("[]")
+            return
+        first = coordinates[0]
+        if isinstance(first, Number):
+            # Une seule position (Point)
+            self._write_positions(coordinates)
+        elif len(first) and isinstance(first[0], Number):
+            # Liste de positions (LineString, anneau, MultiPoint)
+            self._write_positions(coordinates)
+        else:
+            self._file.write("[")
+            for i, part in enumerate(coordinates):
+                self._file.write("," if i else "")
+                self._write_coordinates(part)
+            self._file.write("]")
+
+
+def write_features(path, entities, precision=None, name=None, crs=None):
+    """
+    Écrit une FeatureCollection à partir d'un itérable d'entités.
+
+    :return: Nombre d'entités écrites.
+    """
+    with GeoJSONWriter(path, precision, name, crs) as writer:
+        return writer.write_all(entities)
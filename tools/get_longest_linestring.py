@@ -1,7 +1,10 @@
-import json
-from shapely.geometry import shape, Polygon, MultiPolygon, LineString, MultiLineString
+from shapely.geometry import Polygon, MultiPolygon, LineString, MultiLineString
 from shapely.ops import unary_union
 import numpy as np
+import shapely
+from scipy.spatial import cKDTree
+from tools.geojson_stream import read_shape
+from tools.geojson_writer import GeoJSONWriter
 
 
 def is_closed(line):
@@ -9,52 +12,73 @@ def is_closed(line):
     return np.allclose(line.coords[0], line.coords[-1])
 
 
-def find_closest_line(target, lines):
-    """Trouve la ligne la plus proche de l'extrémité d'une autre ligne."""
-    target_end = target.coords[-1]  # Dernier point de la ligne cible
-    min_distance = float('inf')
-    closest_line = None
-    closest_index = None
-
-    for i, line in enumerate(lines):
-        start_distance = np.linalg.norm(np.array(line.coords[0]) - np.array(target_end))
-        end_distance = np.linalg.norm(np.array(line.coords[-1]) - np.array(target_end))
-
-        if start_distance < min_distance:
-            min_distance = start_distance
-            closest_line = line
-            closest_index = i
-
-        if end_distance < min_distance:
-            min_distance = end_distance
-            closest_line = LineString(list(reversed(line.coords)))  # Inverser la ligne
-            closest_index = i
-
-    return closest_line, closest_index
+def chain_lines(lines, start, atol=1e-8, rtol=1e-5):
+    """
+    Ordonne les lignes à enchaîner pour fermer un contour à partir de la ligne `start`.
+
+    À chaque étape, on cherche l'extrémité (début ou fin) la plus proche de la fin du
+    chaînage courant parmi les lignes non utilisées, grâce à un arbre k-d sur les
+    extrémités. L'arbre est reconstruit quand plus de la moitié de ses points ont été
+    utilisés, pour que les requêtes restent rapides.
+
+    :param lines: Liste de tableaux (k, 2) de coordonnées.
+    :param start: Indice de la ligne de départ.
+    :return: Liste de couples (indice, inversée) dans l'ordre du chaînage, départ compris.
+    """
+    endpoints = np.array([[line[0], line[-1]] for line in lines]).reshape(-1, 2)
+    used = np.zeros(len(lines), dtype=bool)
+    used[start] = True
+    chain = [(start, False)]
+    first, current = lines[start][0], lines[start][-1]
+
+    active = np.flatnonzero(~np.repeat(used, 2))
+    tree = cKDTree(endpoints[active]) if len(active) else None
+    n_removed = 0
+    while tree is not None and not np.allclose(first, current, rtol=rtol, atol=atol):
+        k = 8
+        while True:
+            distances, positions = tree.query(current, k=min(k, len(active)))
+            distances, positions = np.atleast_1d(distances), np.atleast_1d(positions)
+            candidates = active[positions]
+            free = ~used[candidates // 2]
+            if free.any() or k >= len(active):
+                break
+            k *= 4
+        if not free.any():
+            break  # Toutes les lignes sont utilisées
+        # À distance égale : plus petit indice de ligne, début avant fin (comme le parcours linéaire)
+        best = min(zip(distances[free], candidates[free]), key=lambda c: (c[0], c[1]))[1]
+        index, reverse = best // 2, bool(best % 2)
+        used[index] = True
+        chain.append((index, reverse))
+        current = lines[index][0] if reverse else lines[index][-1]
+
+        n_removed += 1
+        if n_removed * 2 > len(active) // 2:
+            active = np.flatnonzero(~np.repeat(used, 2))
+            tree = cKDTree(endpoints[active]) if len(active) else None
+            n_removed = 0
+    return chain
 
 
 def close_contour(line, remaining_lines):
-    """Ferme un contour ouvert en fusionnant récursivement les lignes les plus proches."""
-    while not is_closed(line) and remaining_lines:
-        closest, index = find_closest_line(line, remaining_lines)
-        if closest is None:
-            break  # Impossible de fermer
-
-        # Fusionner la ligne trouvée
-        line = LineString(list(line.coords) + list(closest.coords))
+    """Ferme un contour ouvert en fusionnant les lignes les plus proches, copiées une seule fois."""
+    lines = [np.asarray(line.coords)] + [np.asarray(other.coords) for other in remaining_lines]
+    chain = chain_lines(lines, 0)
+    used = {index for index, _ in chain}
+    remaining_lines[:] = [other for i, other in enumerate(remaining_lines, start=1) if i not in used]
+    return LineString(np.concatenate([lines[i][::-1] if reverse else lines[i] for i, reverse in chain]))
 
-        # Retirer la ligne utilisée
-        remaining_lines.pop(index)
 
-    return line
+def process_geojson(input_filepath, output_filepath, country_code, precision=None):
+    """
+    Convertit un contour en une seule ligne fermée, à partir de la plus longue.
 
-
-def process_geojson(input_filepath, output_filepath, country_code):
-    with open(input_filepath) as f:
-        geojson_dict = json.load(f)
-
-    feature = geojson_dict['features'][0]
-    geometry = shape(feature['geometry'])
+    :param precision: Décimales conservées (None, par défaut : coordonnées exactes, comme
+                      l'écriture historique ; l'arrondi est à demander).
+    """
+    # Lecture en flux, sans charger tout le document avec json.load
+    geometry = read_shape(input_filepath)
 
     # Fusionner les polygones pour obtenir le contour extérieur
     contour = unary_union(geometry)
@@ -70,38 +94,19 @@ def process_geojson(input_filepath, output_filepath, country_code):
         raise ValueError("La géométrie fournie n'est ni un Polygon ni un MultiPolygon.")
 
     # Sélectionner la plus longue ligne comme point de départ
-    longest_contour = sorted(exterior_contours, key=lambda c: c.length, reverse=True)[0]
+    longest_index = int(np.argmax(shapely.length(exterior_contours)))
+    longest_contour = exterior_contours[longest_index]
 
     # Vérifier et fermer le contour si nécessaire
-    remaining_lines = [line for line in exterior_contours if line != longest_contour]
+    remaining_lines = exterior_contours[:longest_index] + exterior_contours[longest_index + 1:]
     closed_contour = close_contour(longest_contour, remaining_lines)
 
-    # Conversion en GeoJSON
-    contour_geojson = {
-        "type": "FeatureCollection",
-        "name": f"{country_code}_contour",
-        "crs": {
-            "type": "name",
-            "properties": {"name": "urn:ogc:def:crs:OGC:1.3:CRS84"}
-        },
-        "features": [
-            {
-                "type": "Feature",
-                "properties": {"GID_0": country_code},
-                "geometry": {
-                    "type": "LineString",
-                    "coordinates": list(closed_contour.coords)
-                }
-            }
-        ]
-    }
-
-    # Sauvegarder dans un fichier GeoJSON
-    with open(output_filepath, 'w') as f:
-        json.dump(contour_geojson, f, indent=2)
-
-
-# Exemple d'utilisation
+    # Écriture en flux d'un GeoJSON compact (coordonnées arrondies si `precision` est donné)
+    with GeoJSONWriter(output_filepath, precision, f"{country_code}_contour", "urn:ogc:def:crs:OGC:1.3:CRS84") as writer:
+        writer.write({"type": "Feature", "properties": {"GID_0": country_code}, "geometry": closed_contour})
+
+
+# Exemple d'utilisation (depuis la racine du dépôt : python -m tools.get_longest_linestring)
 if __name__ == "__main__":
     country_code = "GBR"
     input_filepath = f'coastlines/contour/{country_code}.geojson'
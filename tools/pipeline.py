@@ -0,0 +1,243 @@
+"""
+Chaîne téléchargement → contour → dimension, avec des étages qui tournent en même temps.
+
+Chaque étage est un groupe de threads qui lit une file bornée (`queue.Queue`) et écrit
+dans la suivante : un pays passe à l'étage suivant dès que son fichier est prêt, sans
+attendre les autres pays, et une file pleine ralentit l'étage qui la remplit au lieu
+d'accumuler des fichiers en attente.
+- téléchargement : `tools.gadm_download.download`, session HTTP partagée ;
+- contour : `process_geojson` dans un pool de processus (`tools.convert_contours`),
+  sauté si le contour est à jour ;
+- dimension : une tâche `tools.fractalyse_jobs.dimension_job` par pays, lancée par
+  `tools.scheduler.run_job` (cache et journal comme dans `run_fractalyse.py`).
+
+En mode surveillance (`--watch`), seul l'étage dimension tourne : les fichiers ajoutés
+(ou modifiés) dans `coastlines/contour` après le lancement sont traités dès que leur
+taille ne change plus d'un passage à l'autre.
+
+Utilisation en ligne de commande (depuis la racine du dépôt) :
+    python -m tools.pipeline [FRA BEL ...]
+    python -m tools.pipeline --watch
+"""
+import argparse
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from tools.convert_contours import (_convert, contour_path, default_hashes_path, is_up_to_date, load_hashes,
+                                    save_hashes)
+from tools.fractalyse_jobs import BACKEND, BACKENDS, dimension_job
+from tools.gadm_download import GADM_URL, download, make_session, read_country_codes
+from tools.result_cache import ResultCache, file_hash
+from tools.results_journal import ResultsJournal
+from tools.scheduler import run_job
+
+_DONE = object()
+_print_lock = threading.Lock()
+
+
+def _log(message):
+    # Les threads des étages écrivent en même temps : une ligne à la fois
+    with _print_lock:
+        print(message, flush=True)
+
+
+def _start_stage(function, inbox, outbox, workers, name):
+    """
+    Lance `workers` threads appliquant `function` aux éléments de `inbox`.
+
+    Les résultats différents de None sont placés dans `outbox` ; quand `inbox` est
+    épuisée (sentinelle `_DONE`) et que tous les threads ont fini, `_DONE` est transmise
+    à `outbox`.
+    """
+    def work():
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                inbox.put(_DONE)  # pour les autres threads de l'étage
+                return
+            try:
+                result = function(item)
+            except Exception as e:
+                _log(f"{name} : échec pour {item} : {type(e).__name__}: {e}")
+                continue
+            if result is not None and outbox is not None:
+                outbox.put(result)
+
+    threads = [threading.Thread(target=work, name=f"{name}-{i}", daemon=True) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+
+    def close():
+        for thread in threads:
+            thread.join()
+        if outbox is not None:
+            outbox.put(_DONE)
+
+    closer = threading.Thread(target=close, name=f"{name}-close", daemon=True)
+    closer.start()
+    return closer
+
+
+class Pipeline:
+    """Étages et paramètres partagés de la chaîne."""
+
+    def __init__(self, full_dir="coastlines/full", contour_dir="coastlines/contour", min_value="1E-1",
+                 max_value="1.0", backend=BACKEND, journal_path="results/pipeline.journal.csv", resume=True,
+                 timeout=3600, retries=1, url_template=GADM_URL):
+        """
+        :param min_value: Plus petite taille de boîte.
+        :param max_value: Plus grande taille de boîte.
+        :param backend: Moteur de `dimension_job` ("java", par défaut, ou "numpy").
+        :param journal_path: Journal des dimensions (voir `tools.results_journal`).
+        :param resume: Saute les pays déjà présents dans le journal pour ces paramètres.
+        :param url_template: Modèle d'URL GADM (voir `tools.gadm_download`).
+        """
+        self.full_dir = full_dir
+        self.contour_dir = contour_dir
+        self.min_value = min_value
+        self.max_value = max_value
+        self.backend = backend
+        self.timeout = timeout
+        self.retries = retries
+        self.url_template = url_template
+        self.cache = ResultCache()
+        self.journal = ResultsJournal(journal_path, resume=resume)
+        self.results = {}
+        self._lock = threading.Lock()
+
+    def download(self, code, session):
+        full_path = os.path.join(self.full_dir, f"{code}.geojson")
+        status = download(session, code, full_path, self.url_template)
+        _log(f"{code} : {status}")
+        return None if status == "absent" else full_path
+
+    def contour(self, full_path, pool, hashes):
+        output_path = contour_path(full_path, self.contour_dir)
+        up_to_date, _ = is_up_to_date(full_path, output_path, hashes)
+        if not up_to_date:
+            duration = pool.submit(_convert, full_path, output_path).result()
+            hashes[os.path.basename(full_path)] = file_hash(full_path)
+            _log(f"{os.path.basename(output_path)} : contour en {duration:.2f} s")
+        return output_path
+
+    def dimension(self, filepath):
+        code = os.path.basename(filepath)[:3]
+        if self.journal.is_done(code, self.backend, self.min_value, self.max_value):
+            return None
+        job = dimension_job(filepath, self.min_value, self.max_value, self.backend)
+        result = run_job(job, self.timeout, self.retries, cache=self.cache)
+        with self._lock:
+            self.results[code] = result
+            if result.ok:
+                self.journal.append({"Pays": code, "Dimension fractale": round(result.value["dimension"], 3),
+                                     "durée": round(result.duration), "box_min": self.min_value,
+                                     "box_max": self.max_value, "backend": self.backend})
+        status = f"{result.value['dimension']:.3f}" if result.ok else result.error
+        _log(f"{code} : dimension {status} ({result.duration:.0f} s)")
+        return None
+
+    def run(self, codes, download_workers=8, contour_workers=None, dimension_workers=None, queue_size=4):
+        """
+        Fait passer chaque pays par les trois étages.
+
+        :param codes: Codes ISO des pays.
+        :param queue_size: Taille maximale des files entre les étages.
+        :return: Dictionnaire code -> `JobResult` des dimensions calculées.
+        """
+        contour_workers = contour_workers or os.cpu_count()
+        dimension_workers = dimension_workers or os.cpu_count()
+        os.makedirs(self.full_dir, exist_ok=True)
+        os.makedirs(self.contour_dir, exist_ok=True)
+        session = make_session(download_workers)
+        hashes_path = default_hashes_path(self.full_dir)
+        hashes = load_hashes(hashes_path)
+
+        codes_queue = queue.Queue()
+        full_queue = queue.Queue(maxsize=queue_size)
+        contour_queue = queue.Queue(maxsize=queue_size)
+        with ProcessPoolExecutor(max_workers=contour_workers) as pool:
+            _start_stage(lambda code: self.download(code, session), codes_queue, full_queue,
+                         download_workers, "téléchargement")
+            _start_stage(lambda path: self.contour(path, pool, hashes), full_queue, contour_queue,
+                         contour_workers, "contour")
+            last = _start_stage(self.dimension, contour_queue, None, dimension_workers, "dimension")
+            for code in codes:
+                codes_queue.put(code)
+            codes_queue.put(_DONE)
+            last.join()
+        save_hashes(hashes_path, hashes)
+        return self.results
+
+    def watch(self, interval=10.0, dimension_workers=None, stop=None):
+        """
+        Calcule la dimension des fichiers ajoutés ou modifiés dans le dossier des contours.
+
+        :param interval: Délai (secondes) entre deux passages.
+        :param stop: `threading.Event` optionnel pour arrêter la surveillance (sinon Ctrl+C).
+        :return: Dictionnaire code -> `JobResult` des dimensions calculées.
+        """
+        stop = stop or threading.Event()
+        contour_queue = queue.Queue(maxsize=dimension_workers or os.cpu_count())
+        last = _start_stage(self.dimension, contour_queue, None, dimension_workers or os.cpu_count(), "dimension")
+
+        def snapshot():
+            state = {}
+            for filename in os.listdir(self.contour_dir):
+                if filename.endswith(".geojson"):
+                    stat = os.stat(os.path.join(self.contour_dir, filename))
+                    state[filename] = (stat.st_mtime, stat.st_size)
+            return state
+
+        seen = snapshot()
+        pending = {}
+        try:
+            while not stop.wait(interval):
+                current = snapshot()
+                for filename, state in current.items():
+                    if seen.get(filename) == state:
+                        continue
+                    # Un fichier en cours d'écriture change encore de taille : on attend le passage suivant
+                    if pending.get(filename) == state:
+                        seen[filename] = state
+                        del pending[filename]
+                        contour_queue.put(os.path.join(self.contour_dir, filename))
+                    else:
+                        pending[filename] = state
+        except KeyboardInterrupt:
+            pass
+        contour_queue.put(_DONE)
+        last.join()
+        return self.results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Téléchargement, contour et dimension des pays, en flux.")
+    parser.add_argument("codes", nargs="*", help="Codes ISO (par défaut, ceux de coastlines/gadm_countries.txt).")
+    parser.add_argument("--watch", action="store_true",
+                        help="Surveille coastlines/contour et traite les fichiers ajoutés.")
+    parser.add_argument("--interval", type=float, default=10.0, help="Délai entre deux passages (--watch).")
+    parser.add_argument("--min", default="1E-1", help="Plus petite taille de boîte.")
+    parser.add_argument("--max", default="1.0", help="Plus grande taille de boîte.")
+    parser.add_argument("--backend", default=BACKEND, choices=BACKENDS)
+    parser.add_argument("--download-workers", type=int, default=8)
+    parser.add_argument("--contour-workers", type=int, default=None)
+    parser.add_argument("--dimension-workers", type=int, default=None)
+    args = parser.parse_args()
+
+    pipeline = Pipeline(min_value=args.min, max_value=args.max, backend=args.backend)
+    start = time.perf_counter()
+    if args.watch:
+        print(f"Surveillance de {pipeline.contour_dir} (Ctrl+C pour arrêter)")
+        results = pipeline.watch(args.interval, args.dimension_workers)
+    else:
+        results = pipeline.run(args.codes or read_country_codes(), args.download_workers,
+                               args.contour_workers, args.dimension_workers)
+    n_ok = sum(result.ok for result in results.values())
+    print(f"{n_ok} dimensions calculées, {len(results) - n_ok} échecs en {time.perf_counter() - start:.0f} s")
+
+
+if __name__ == "__main__":
+    main()
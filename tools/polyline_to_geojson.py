@@ -1,57 +1,67 @@
-import matplotlib.pyplot as plt
 import re
 import numpy as np
-from shapely.geometry import LineString, mapping
-import json
 import os
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+from tools.geojson_writer import GeoJSONWriter
 
 # Convert all files in the 'coastlines/polylines' folder
+# (depuis la racine du dépôt : python -m tools.polyline_to_geojson)
 polyline_folder = 'coastlines/polylines'
 output_folder = 'coastlines/specials'
+workers = os.cpu_count()  # Nombre de processus
+precision = None  # Décimales conservées (None : coordonnées telles quelles)
 
-for filename in os.listdir(polyline_folder):
-    if filename.endswith('.txt'):
-        with open(os.path.join(polyline_folder, filename), 'r') as file:
-            polyline_str = file.read()
-        
-        # Extract points from the polyline string
-        points_str = re.search(r'points="([^"]+)"', polyline_str).group(1)
-        points = [tuple(map(float, point.split(','))) for point in points_str.split()]
-
-        # Create a list of x and y coordinates
-        x, y = zip(*points)
-        y = -np.array(y)
-
-        points = zip(x, y)
-        line = LineString(points)
-
-        # Create a FeatureCollection with a MultiLineString
-        feature_collection = {
-            "type": "FeatureCollection",
-            "name": "Polyline",
-            "crs": {
-                "type": "name",
-                "properties": {
-                    "name": "urn:ogc:def:crs:OGC:1.3:CRS84"
-                }
+_POINTS = re.compile(r'points="([^"]+)"')
+
+
+def parse_points(polyline_str):
+    """
+    Convertit l'attribut `points="x1,y1 x2,y2 ..."` d'une polyline SVG en tableau (n, 2).
+
+    L'axe y du SVG est orienté vers le bas : il est inversé.
+    """
+    points_str = _POINTS.search(polyline_str).group(1)
+    points = np.array(points_str.replace(",", " ").split(), dtype=np.float64).reshape(-1, 2)
+    points[:, 1] *= -1
+    return points
+
+
+def convert_file(filename):
+    """Convertit un fichier de `polyline_folder` ; renvoie (fichier de sortie, nombre de sommets, durée)."""
+    start = perf_counter()
+    with open(os.path.join(polyline_folder, filename), 'r') as file:
+        points = parse_points(file.read())
+
+    # Create a FeatureCollection with a MultiLineString
+    output_filename = f'poly_{filename.replace(".txt", ".geojson")}'
+    with GeoJSONWriter(os.path.join(output_folder, output_filename), precision, "Polyline",
+                       "urn:ogc:def:crs:OGC:1.3:CRS84") as writer:
+        writer.write({
+            "type": "Feature",
+            "properties": {
+                "stroke": "#ff0000",
+                "stroke-width": 2
             },
-            "features": [
-                {
-                    "type": "Feature",
-                    "properties": {
-                        "stroke": "#ff0000",
-                        "stroke-width": 2
-                    },
-                    "geometry": {
-                        "type": "MultiLineString",
-                        "coordinates": [list(line.coords)]
-                    }
-                }
-            ]
-        }
-
-        output_filename = f'poly_{filename.replace(".txt", ".geojson")}'
-        with open(os.path.join(output_folder, output_filename), 'w') as f:
-            json.dump(feature_collection, f)
-
-        print(f"Fichier enregistré dans '{output_folder}/{output_filename}'")
+            "geometry": {
+                "type": "MultiLineString",
+                "coordinates": [points]
+            }
+        })
+    return output_filename, len(points), perf_counter() - start
+
+
+if __name__ == "__main__":
+    filenames = sorted(filename for filename in os.listdir(polyline_folder) if filename.endswith('.txt'))
+
+    start = perf_counter()
+    n_vertices = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for output_filename, count, duration in executor.map(convert_file, filenames):
+            n_vertices += count
+            print(f"Fichier enregistré dans '{output_folder}/{output_filename}' "
+                  f"({count} sommets, {count / max(duration, 1e-9):,.0f} sommets/s)")
+
+    elapsed = perf_counter() - start
+    print(f"{len(filenames)} fichiers, {n_vertices} sommets en {elapsed:.2f} s : "
+          f"{n_vertices / max(elapsed, 1e-9):,.0f} sommets/s")
@@ -0,0 +1,172 @@
+"""
+Pyramide de simplifications d'un contour, pour le box-counting multi-échelle.
+
+Aux grandes tailles de boîtes, inutile de parcourir chaque sommet d'un contour de
+100 000 points : on précalcule une fois par pays des versions simplifiées (Douglas-Peucker
+avec préservation de la topologie, `shapely.simplify(..., preserve_topology=True)`) pour
+des tolérances t, 2t, 4t... Une géométrie simplifiée avec la tolérance t reste à moins
+de t de l'originale (distance de Hausdorff), donc pour des boîtes de côté s on peut
+utiliser le niveau le plus grossier dont la tolérance est inférieure à s / 2.
+
+Les niveaux sont stockés à côté des contours, dans `coastlines/pyramid/XXX_pyramid.npz`,
+avec le hachage du fichier source pour détecter un contour modifié.
+
+Utilisation en ligne de commande (depuis la racine du dépôt) :
+    python -m tools.pyramid [--min-tolerance 5E-6]
+puis
+    python -m tools.boxcounting coastlines/contour/FRA_contour.geojson 1E-3 1E-1 --pyramid coastlines/pyramid
+"""
+import argparse
+import os
+
+import numpy as np
+import shapely
+
+from tools.boxcounting import box_counting_coordinates, load_coordinates
+from tools.result_cache import file_hash
+
+DEFAULT_DIRECTORY = "coastlines/pyramid"
+
+
+def _to_geometry(coords, offsets):
+    lengths = np.diff(offsets)
+    keep = np.repeat(lengths >= 2, lengths)
+    indices = np.repeat(np.arange(len(lengths)), lengths)[keep]
+    if len(indices) == 0:
+        return shapely.MultiLineString()
+    return shapely.multilinestrings(shapely.linestrings(coords[keep], indices=indices))
+
+
+def _from_geometry(geometry):
+    parts = shapely.get_parts(geometry)
+    counts = shapely.get_num_coordinates(parts)
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    return shapely.get_coordinates(parts), offsets
+
+
+class Pyramid:
+    """Niveaux (coords, offsets) d'un contour, du plus fin (original, tolérance 0) au plus grossier."""
+
+    def __init__(self, tolerances, levels, origin, source_hash=None):
+        self.tolerances = np.asarray(tolerances, dtype=np.float64)
+        self.levels = levels
+        self.origin = np.asarray(origin, dtype=np.float64)
+        self.source_hash = source_hash
+
+    @classmethod
+    def build(cls, coords, offsets, min_tolerance=5e-6, factor=2, max_ratio=0.9, source_hash=None):
+        """
+        Calcule les niveaux de simplification d'un contour.
+
+        :param min_tolerance: Tolérance du premier niveau simplifié (degrés).
+        :param factor: Rapport entre les tolérances de deux niveaux successifs.
+        :param max_ratio: Un niveau n'est conservé que s'il a moins de `max_ratio` fois
+                          les sommets du niveau conservé précédent.
+        :return: Une `Pyramid`.
+        """
+        origin = coords.min(axis=0) if len(coords) else np.zeros(2)
+        tolerances, levels = [0.0], [(coords, np.asarray(offsets, dtype=np.int64))]
+        if len(coords) == 0:
+            return cls(tolerances, levels, origin, source_hash)
+        geometry = _to_geometry(coords, offsets)
+        extent = float(np.max(coords.max(axis=0) - origin))
+        tolerance = min_tolerance
+        while tolerance <= extent:
+            simplified = shapely.simplify(geometry, tolerance, preserve_topology=True)
+            level_coords, level_offsets = _from_geometry(simplified)
+            if len(level_coords) < max_ratio * len(levels[-1][0]):
+                tolerances.append(tolerance)
+                levels.append((level_coords, level_offsets))
+            tolerance *= factor
+        return cls(tolerances, levels, origin, source_hash)
+
+    def save(self, path):
+        arrays = {"tolerances": self.tolerances, "origin": self.origin,
+                  "source_hash": np.array(self.source_hash or "")}
+        for i, (coords, offsets) in enumerate(self.levels):
+            arrays[f"coords_{i}"] = coords
+            arrays[f"offsets_{i}"] = offsets
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            tolerances = data["tolerances"]
+            levels = [(data[f"coords_{i}"], data[f"offsets_{i}"]) for i in range(len(tolerances))]
+            return cls(tolerances, levels, data["origin"], str(data["source_hash"]) or None)
+
+    def level_for(self, size):
+        """Indice du niveau le plus grossier dont la tolérance est inférieure à `size / 2`."""
+        return int(np.searchsorted(self.tolerances, size / 2, side="right")) - 1
+
+    def box_counting(self, min_size, max_size, factor=2, method="supercover"):
+        """
+        Box-counting sur le niveau le plus grossier admissible.
+
+        Seule la méthode "supercover" mesure la ligne elle-même, à laquelle s'applique la
+        borne d'erreur ; "morton" et "grid" comptent les sommets, que la simplification
+        retire, et utilisent donc le contour original. Les grandes boîtes se déduisant des
+        plus petites par décalage de bits, une seule passe sur le niveau admissible pour
+        la plus petite boîte (erreur < min_size / 2 <= size / 2 à toutes les échelles)
+        coûte moins qu'une passe par niveau. L'origine de la grille est celle du contour
+        original, commune à tous les niveaux.
+        :return: Un `BoxCountingResult`.
+        """
+        level = self.level_for(min_size) if method == "supercover" else 0
+        coords, offsets = self.levels[level]
+        return box_counting_coordinates(coords, min_size, max_size, factor, method, offsets, self.origin)
+
+
+def pyramid_path(filepath, directory=DEFAULT_DIRECTORY):
+    """Chemin de la pyramide d'un contour `XXX_contour.geojson` : `XXX_pyramid.npz`."""
+    return os.path.join(directory, f"{os.path.basename(filepath)[:3]}_pyramid.npz")
+
+
+def load_pyramid(filepath, directory=DEFAULT_DIRECTORY):
+    """Pyramide d'un contour si elle existe et correspond au fichier actuel, sinon None."""
+    path = pyramid_path(filepath, directory)
+    if not os.path.exists(path):
+        return None
+    pyramid = Pyramid.load(path)
+    return pyramid if pyramid.source_hash == file_hash(filepath) else None
+
+
+def build_pyramids(contour_dir="coastlines/contour", directory=DEFAULT_DIRECTORY, min_tolerance=5e-6):
+    """
+    Construit la pyramide de chaque contour, sauf si elle est déjà à jour.
+
+    :return: Dictionnaire code ISO -> nombre de niveaux (pyramides construites seulement).
+    """
+    os.makedirs(directory, exist_ok=True)
+    built = {}
+    for filename in sorted(os.listdir(contour_dir)):
+        if not filename.endswith(".geojson"):
+            continue
+        filepath = os.path.join(contour_dir, filename)
+        content_hash = file_hash(filepath)
+        path = pyramid_path(filepath, directory)
+        if os.path.exists(path) and Pyramid.load(path).source_hash == content_hash:
+            continue
+        coords, offsets = load_coordinates(filepath)
+        pyramid = Pyramid.build(coords, offsets, min_tolerance, source_hash=content_hash)
+        pyramid.save(path)
+        built[filename[:3]] = len(pyramid.levels)
+        print(f"{filename[:3]} : {' / '.join(str(len(c)) for c, _ in pyramid.levels)} sommets")
+    return built
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construit les pyramides de simplification des contours.")
+    parser.add_argument("--contour-dir", default="coastlines/contour")
+    parser.add_argument("--directory", default=DEFAULT_DIRECTORY)
+    parser.add_argument("--min-tolerance", type=float, default=5e-6, help="Tolérance du premier niveau (degrés).")
+    args = parser.parse_args()
+
+    built = build_pyramids(args.contour_dir, args.directory, args.min_tolerance)
+    print(f"{len(built)} pyramides construites dans {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
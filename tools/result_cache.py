@@ -0,0 +1,84 @@
+"""
+Cache disque des résultats de box-counting, adressé par le contenu.
+
+La clé est le hachage SHA-256 du fichier de géométrie combiné aux paramètres de
+l'estimateur (moteur, tailles de boîtes min/max...) : un fichier inchangé relancé avec
+les mêmes paramètres est servi depuis le cache. Chaque entrée est un petit fichier JSON
+(comptages par échelle, pente ajustée) ; quand la taille totale dépasse `max_bytes`,
+les entrées les moins récemment utilisées sont supprimées.
+"""
+import hashlib
+import json
+import os
+import tempfile
+
+DEFAULT_CACHE_DIR = ".cache/dimensions"
+
+
+def file_hash(filepath, chunk_size=1 << 20):
+    """Hachage SHA-256 (hexadécimal) du contenu d'un fichier."""
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(filepath, params, content_hash=None):
+    """
+    Clé de cache d'un calcul.
+
+    :param filepath: Fichier de géométrie.
+    :param params: Dictionnaire des paramètres de l'estimateur (sérialisable en JSON).
+    :param content_hash: Hachage du fichier s'il est déjà connu.
+    """
+    payload = json.dumps({"file": content_hash or file_hash(filepath), "params": params}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultCache:
+    """Cache persistant de résultats JSON avec éviction LRU bornée en taille."""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=64 * 2 ** 20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        """Renvoie la valeur en cache ou None ; une lecture rafraîchit l'entrée pour l'éviction."""
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            return None
+        os.utime(path)
+        return value
+
+    def put(self, key, value):
+        """Enregistre une valeur de façon atomique puis applique la limite de taille."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(value, f, separators=(",", ":"))
+        os.replace(tmp_path, self._path(key))
+        self.evict()
+
+    def evict(self):
+        """Supprime les entrées les moins récemment utilisées jusqu'à respecter `max_bytes`."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -0,0 +1,96 @@
+"""
+Journal des résultats, écrit au fil de l'eau pour survivre à un arrêt du lot.
+
+Chaque pays terminé est ajouté au journal CSV en une seule écriture `O_APPEND` suivie
+d'un `fsync` : une ligne est soit entièrement présente, soit absente (une éventuelle
+ligne tronquée par un arrêt brutal est ignorée à la relecture). Avec `resume=True`, les
+pays déjà présents pour les mêmes paramètres (moteur, tailles de boîtes) sont sautés.
+"""
+import csv
+import io
+import os
+
+FIELDS = ["Pays", "Dimension fractale", "durée", "box_min", "box_max", "backend"]
+
+
+def _params(row):
+    return str(row["backend"]), str(row["box_min"]), str(row["box_max"])
+
+
+class ResultsJournal:
+
+    def __init__(self, path, resume=False):
+        """
+        :param path: Chemin du journal CSV.
+        :param resume: Conserve le journal existant au lieu de repartir de zéro.
+        """
+        self.path = path
+        if not resume and os.path.exists(path):
+            os.remove(path)
+        self.rows = self._read()
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return {}
+        rows = {}
+        with open(self.path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                if None in row.values() or None in row:
+                    continue  # ligne tronquée
+                try:
+                    float(row["Dimension fractale"])
+                except ValueError:
+                    continue
+                rows[row["Pays"]] = row
+        return rows
+
+    def is_done(self, pays, backend, box_min, box_max):
+        """Vrai si le pays est déjà dans le journal pour ces paramètres."""
+        row = self.rows.get(pays)
+        return row is not None and _params(row) == (str(backend), str(box_min), str(box_max))
+
+    def append(self, row):
+        """Ajoute une ligne (dictionnaire de `FIELDS`) de façon atomique et durable."""
+        row = {field: row[field] for field in FIELDS}
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, FIELDS, lineterminator="\n")
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        if new_file:
+            writer.writeheader()
+        elif not self._ends_with_newline():
+            buffer.write("\n")  # termine une ligne tronquée, qui sera ignorée
+        writer.writerow(row)
+
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, buffer.getvalue().encode("utf-8"))
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        self.rows[row["Pays"]] = {field: str(value) for field, value in row.items()}
+
+    def _ends_with_newline(self):
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def results(self, params_of):
+        """
+        Lignes du journal dont les paramètres correspondent à ceux du lot courant.
+
+        :param params_of: Fonction pays -> (backend, box_min, box_max), ou None si le
+                          pays ne fait pas partie du lot.
+        """
+        selected = []
+        for pays, row in self.rows.items():
+            params = params_of(pays)
+            if params is not None and _params(row) == tuple(str(p) for p in params):
+                selected.append(row)
+        return selected
+
+
+def write_csv_atomic(df, path, **kwargs):
+    """Écrit un DataFrame en CSV via un fichier temporaire renommé, jamais à moitié écrit."""
+    tmp_path = f"{path}.tmp"
+    df.to_csv(tmp_path, **kwargs)
+    os.replace(tmp_path, path)
@@ -0,0 +1,198 @@
+"""
+Ordonnanceur asyncio pour lancer des calculs externes (Fractalyse, box-counting) en parallèle.
+
+Chaque tâche s'exécute dans son propre dossier de travail temporaire, dans lequel les
+fichiers d'entrée sont liés : les fichiers annexes (`box_glid*`, `.xml`, `.txt`) écrits
+par le jar ne se mélangent donc plus entre tâches et disparaissent avec le dossier.
+Une tâche qui dépasse son délai est tuée puis relancée jusqu'à `retries` fois.
+Si les tâches ont un coût prédit (`tools.cost_model`), la barre de progression affiche
+un temps restant estimé, recalé sur les durées réellement observées.
+Avec un `ResultCache` (`tools.result_cache`), les tâches dont la clé est déjà en cache
+ne sont pas relancées.
+"""
+import asyncio
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass, field
+from time import perf_counter
+
+from tqdm import tqdm
+
+
+@dataclass
+class Job:
+    """
+    Tâche à exécuter.
+
+    `command` peut contenir `{workdir}` et `{input0}`, `{input1}`... qui sont remplacés
+    par le dossier de travail et les chemins des entrées liées dans ce dossier.
+    `parse(workdir, stdout)` extrait le résultat avant la suppression du dossier.
+    `cost` est le coût prédit de la tâche, utilisé pour l'estimation du temps restant.
+    `cache_key` identifie le résultat dans un `ResultCache` (pas de cache si None).
+    """
+    name: str
+    command: list
+    inputs: list = field(default_factory=list)
+    parse: object = None
+    env: dict = None
+    cost: float = None
+    cache_key: str = None
+
+
+@dataclass
+class JobResult:
+    name: str
+    value: object = None
+    duration: float = 0.0
+    attempts: int = 0
+    error: str = None
+    cached: bool = False
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def _prepare_workdir(job, base_dir):
+    workdir = tempfile.mkdtemp(prefix=f"{job.name}_", dir=base_dir)
+    linked = []
+    for path in job.inputs:
+        target = os.path.join(workdir, os.path.basename(path))
+        try:
+            os.symlink(os.path.abspath(path), target)
+        except OSError:
+            shutil.copyfile(path, target)
+        linked.append(target)
+    return workdir, linked
+
+
+async def _run_once(job, timeout, base_dir):
+    workdir, linked = _prepare_workdir(job, base_dir)
+    try:
+        placeholders = {"workdir": workdir, **{f"input{i}": path for i, path in enumerate(linked)}}
+        command = [str(arg).format(**placeholders) for arg in job.command]
+        env = None if job.env is None else {**os.environ, **job.env}
+        process = await asyncio.create_subprocess_exec(
+            *command, cwd=workdir, env=env,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise TimeoutError(f"délai de {timeout} s dépassé")
+        if process.returncode != 0:
+            raise RuntimeError(f"code de retour {process.returncode} : {stderr.decode(errors='replace').strip()[-500:]}")
+        stdout = stdout.decode(errors="replace")
+        return job.parse(workdir, stdout) if job.parse else stdout
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+class _Progress:
+    """Barre de progression avec temps restant estimé à partir des coûts prédits."""
+
+    def __init__(self, jobs, concurrency):
+        self.bar = tqdm(total=len(jobs), desc="Calcul des dimensions")
+        self.concurrency = concurrency
+        self.remaining_cost = sum(job.cost or 0 for job in jobs)
+        self.done_cost = 0.0
+        self.done_duration = 0.0
+
+    def update(self, job, result):
+        self.bar.update(1)
+        status = "cache" if result.cached else "ok" if result.ok else "échec"
+        postfix = f"{job.name} {status} ({result.duration:.0f} s)"
+        self.remaining_cost -= job.cost or 0
+        # Les résultats servis par le cache ne renseignent pas sur la vitesse réelle
+        if job.cost and not result.cached:
+            self.done_cost += job.cost
+            self.done_duration += result.duration
+        if self.done_cost:
+            eta = self.remaining_cost * self.done_duration / self.done_cost / self.concurrency
+            postfix += f", reste ~{eta:.0f} s"
+        self.bar.set_postfix_str(postfix)
+        if not result.ok:
+            self.bar.write(f"Échec pour {job.name} après {result.attempts} tentative(s) : {result.error}")
+
+
+async def _run_job(job, semaphore, timeout, retries, base_dir, progress, cache, on_result):
+    cached = cache.get(job.cache_key) if cache is not None and job.cache_key else None
+    if cached is not None:
+        result = JobResult(job.name, cached["value"], cached["duration"], cached=True)
+        if progress is not None:
+            progress.update(job, result)
+        if on_result is not None:
+            on_result(job, result)
+        return result
+
+    async with semaphore:
+        result = JobResult(job.name)
+        start = perf_counter()
+        for attempt in range(1, retries + 2):
+            result.attempts = attempt
+            try:
+                result.value = await _run_once(job, timeout, base_dir)
+                result.error = None
+                break
+            except Exception as e:
+                result.error = f"{type(e).__name__}: {e}"
+        result.duration = perf_counter() - start
+        if cache is not None and job.cache_key and result.ok:
+            cache.put(job.cache_key, {"value": result.value, "duration": result.duration})
+        if progress is not None:
+            progress.update(job, result)
+        if on_result is not None:
+            on_result(job, result)
+        return result
+
+
+async def run_jobs_async(jobs, concurrency=os.cpu_count(), timeout=None, retries=0, base_dir=None, cache=None,
+                         on_result=None):
+    """
+    Exécute les tâches avec au plus `concurrency` processus simultanés.
+
+    :param jobs: Liste de `Job`, lancés dans l'ordre de la liste (voir `longest_first`).
+    :param concurrency: Nombre maximal de tâches simultanées.
+    :param timeout: Délai maximal (secondes) d'une tentative, None pour aucun.
+    :param retries: Nombre de relances après un échec ou un dépassement de délai.
+    :param base_dir: Dossier où créer les dossiers de travail (temporaire système par défaut).
+    :param cache: `ResultCache` optionnel, consulté avant et alimenté après chaque tâche.
+    :param on_result: Fonction (job, result) appelée dès qu'une tâche se termine.
+    :return: Liste de `JobResult`, dans l'ordre des tâches.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    progress = _Progress(jobs, concurrency)
+    try:
+        tasks = [_run_job(job, semaphore, timeout, retries, base_dir, progress, cache, on_result)
+                 for job in jobs]
+        return await asyncio.gather(*tasks)
+    finally:
+        progress.bar.close()
+
+
+def longest_first(jobs):
+    """
+    Trie les tâches par coût prédit décroissant.
+
+    Lancer d'abord les tâches les plus longues évite qu'un gros pays démarre en fin de
+    lot et allonge seul la durée totale.
+    """
+    return sorted(jobs, key=lambda job: job.cost or 0, reverse=True)
+
+
+def run_jobs(jobs, concurrency=os.cpu_count(), timeout=None, retries=0, base_dir=None, cache=None,
+             on_result=None):
+    """Version synchrone de `run_jobs_async`."""
+    return asyncio.run(run_jobs_async(jobs, concurrency, timeout, retries, base_dir, cache, on_result))
+
+
+def run_job(job, timeout=None, retries=0, base_dir=None, cache=None):
+    """
+    Exécute une seule tâche, sans barre de progression, et attend son résultat.
+
+    Utilisable depuis plusieurs threads à la fois (chaque appel a sa propre boucle
+    asyncio), par exemple par les étages de `tools.pipeline`.
+    """
+    return asyncio.run(_run_job(job, asyncio.Semaphore(1), timeout, retries, base_dir, None, cache, None))